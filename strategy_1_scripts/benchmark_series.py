@@ -0,0 +1,50 @@
+import os
+from functools import lru_cache
+from utils import (
+    read_table,
+    build_benchmark_series,
+    take_benchmark_values,
+    benchmark_daily_returns,
+    benchmark_expanding_mean,
+)
+from trading_calendar import get_trading_calendar
+
+DEFAULT_BENCHMARKS = {
+    "S&P 500": "SPY",
+    "S&P MidCap 400": "IJH",
+    "S&P SmallCap 600": "IJR",
+}
+
+class BenchmarkSeries:
+    def __init__(self, price_data_folder, benchmarks=None, max_cached_series=8):
+        self.price_data_folder = price_data_folder
+        self.benchmarks = dict(DEFAULT_BENCHMARKS if benchmarks is None else benchmarks)
+        self.calendar = get_trading_calendar()
+        self.load_series = lru_cache(maxsize=max_cached_series)(self._load_series)
+
+    def _load_series(self, ticker):
+        file_path = os.path.join(self.price_data_folder, f"{ticker}_Price_Data.csv")
+        etf_data = read_table(file_path, 'etf_prices', columns=['Date', 'Open', 'Close', 'Volume'])
+        print(f"Loaded benchmark series for {ticker} from {file_path}")
+        return build_benchmark_series(etf_data, self.calendar)
+
+    def etf_for_index(self, index_name):
+        return self.benchmarks.get(index_name)
+
+    def values(self, ticker, field, sessions):
+        return take_benchmark_values(self.load_series(ticker), field, sessions)
+
+    def daily_returns(self, ticker, sessions, start_session):
+        return benchmark_daily_returns(self.load_series(ticker), sessions, start_session)
+
+    def expanding_mean(self, ticker, sessions, start_session):
+        return benchmark_expanding_mean(self.load_series(ticker), sessions, start_session)
+
+# Usage Example:
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    benchmarks = BenchmarkSeries(os.path.join(base_dir, "price_data"))
+    calendar = get_trading_calendar()
+    sessions = calendar.session_index(["2024-09-23", "2024-09-24", "2024-09-25"])
+    print(benchmarks.daily_returns("IJH", sessions, sessions[0]))
+    print(benchmarks.expanding_mean("IJH", sessions, sessions[0]))
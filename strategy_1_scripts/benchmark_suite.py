@@ -0,0 +1,110 @@
+import os
+import time
+import argparse
+from contextlib import redirect_stdout
+import pandas as pd
+from utils import calculate_group_stats, compare_to_baseline, read_table
+from synthetic_data import SyntheticEventUniverse
+from price_data_updater import PriceDataUpdater
+from historical_data_processor import HistoricalDataProcessor
+from strategy_1_returns import DataAggregator
+from strategy_1_trade_log_creator import TradeLogCreator
+from strategy_1_backtest_engine import BacktestEngine
+
+class BenchmarkSuite:
+    """Times the pipeline hot paths on synthetic event universes of increasing size and flags regressions against a saved run.
+
+    Steps 5 and 6 rewrite the price files in place, so they are timed once per size; the read-only stages keep the best of repeat runs.
+    """
+    def __init__(self, work_dir, event_counts=(1000,), repeat=3, seed=0, baseline_path=None, tolerance=0.2):
+        self.work_dir = work_dir
+        self.event_counts = event_counts
+        self.repeat = repeat
+        self.seed = seed
+        self.baseline_path = baseline_path
+        self.tolerance = tolerance
+        self.records = []
+
+    def measure(self, func, repeat=1):
+        best, result = None, None
+        for _ in range(repeat):
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                start_time = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+    def record(self, benchmark, n_events, rows, seconds):
+        self.records.append({"Benchmark": benchmark, "N_Events": n_events, "Rows": rows, "Seconds": seconds,
+                             "Rows_Per_Second": rows / seconds if seconds else None,
+                             "Events_Per_Second": n_events / seconds if seconds else None})
+        print(f"{benchmark:<44} {n_events:>9} events {seconds:>9.3f}s")
+
+    def run_size(self, n_events):
+        universe = SyntheticEventUniverse(os.path.join(self.work_dir, f"events_{n_events}"), n_events, seed=self.seed)
+        summary, seconds = self.measure(universe.generate)
+        self.record("SyntheticEventUniverse.generate", n_events, summary["price_rows"], seconds)
+        price_rows = summary["price_rows"]
+        strategy_dir = os.path.join(universe.output_dir, "strategy_1")
+        returns_path = os.path.join(strategy_dir, "strategy_1_returns.csv")
+        trade_log_path = os.path.join(strategy_dir, "benchmark_trade_log.csv")
+
+        updater = PriceDataUpdater(universe.price_data_folder, universe.press_release_file_path,
+                                   os.path.join(universe.output_dir, "no_match_log.txt"))
+        _, seconds = self.measure(updater.update_files)
+        self.record("PriceDataUpdater.update_files", n_events, price_rows, seconds)
+
+        processor = HistoricalDataProcessor(universe.price_data_folder)
+        _, seconds = self.measure(processor.process_all_files)
+        self.record("HistoricalDataProcessor.process_all_files", n_events, price_rows, seconds)
+
+        aggregator = DataAggregator(universe.price_data_folder, returns_path)
+        _, seconds = self.measure(aggregator.aggregate_columns_for_selected_rows, self.repeat)
+        returns = read_table(returns_path, 'returns')
+        self.record("DataAggregator", n_events, price_rows, seconds)
+
+        _, seconds = self.measure(lambda: calculate_group_stats(returns), self.repeat)
+        self.record("calculate_group_stats", n_events, len(returns), seconds)
+
+        creator = TradeLogCreator(returns_path, trade_log_path, ["DJIA"])
+        _, seconds = self.measure(creator.create_trade_log, self.repeat)
+        self.record("TradeLogCreator.create_trade_log", n_events, len(returns), seconds)
+
+        def run_backtest():
+            engine = BacktestEngine(trade_log_path, universe.sofr_file_path, os.path.join(strategy_dir, "benchmark_backtest_results.csv"))
+            engine.run_backtest()
+            return engine
+        engine, seconds = self.measure(run_backtest, self.repeat)
+        self.record("BacktestEngine.run_backtest", n_events, len(engine.trade_log_df), seconds)
+
+    def run(self):
+        for n_events in self.event_counts:
+            self.run_size(n_events)
+        self.results = pd.DataFrame(self.records)
+        if self.baseline_path and os.path.exists(self.baseline_path):
+            self.results = compare_to_baseline(self.results, pd.read_csv(self.baseline_path), self.tolerance)
+            regressions = self.results[self.results['Regression']]
+            for row in regressions.itertuples(index=False):
+                print(f"Regression: {row.Benchmark} at {row.N_Events} events is {row.Slowdown:.0%} slower than baseline")
+            if regressions.empty:
+                print(f"No regressions beyond {self.tolerance:.0%} against {self.baseline_path}")
+        return self.results
+
+    def save_results(self, output_path):
+        self.results.to_csv(output_path, index=False)
+        print(f"Benchmark results saved to {output_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 10000], help="synthetic event counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per read-only stage; the fastest is kept")
+    parser.add_argument("--baseline", help="previous results CSV to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown flagged as a regression")
+    parser.add_argument("--output", default=os.path.join(base_dir, "synthetic", "benchmark_results.csv"))
+    args = parser.parse_args()
+    suite = BenchmarkSuite(os.path.join(base_dir, "synthetic"), args.events, args.repeat, baseline_path=args.baseline, tolerance=args.tolerance)
+    suite.run()
+    suite.save_results(args.output)
@@ -0,0 +1,80 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import (
+    EVENT_STUDY_COLUMNS,
+    read_table,
+    stack_event_panel,
+    market_model_fit,
+    caar_statistics,
+)
+from benchmark_series import BenchmarkSeries
+
+class EventStudy:
+    """Market-model event study over every event file at once: alpha/beta from a pre-announcement estimation window,
+    abnormal (AR) and cumulative abnormal (CAR) returns around the announcement and effective dates, and CAAR t-stats.
+
+    Windows are in sessions relative to each anchor. Price files hold TickerDataDownloader.window_sessions (21) sessions
+    before the announcement, so longer estimation windows need a longer download window.
+    """
+    def __init__(self, price_data_folder, benchmarks=None, estimation_window=(-21, -6), event_window=(-5, 10), min_estimation_sessions=10):
+        self.price_data_folder = price_data_folder
+        self.benchmarks = benchmarks or BenchmarkSeries(price_data_folder)
+        self.estimation_window = estimation_window
+        self.event_window = event_window
+        self.min_estimation_sessions = min_estimation_sessions
+
+    def load_data(self):
+        frames = [read_table(os.path.join(self.price_data_folder, file_name), 'price_data', columns=EVENT_STUDY_COLUMNS)
+                  for file_name in sorted(os.listdir(self.price_data_folder))
+                  if file_name.endswith("_Price_Data.csv")]
+        frames = [frame for frame in frames if set(EVENT_STUDY_COLUMNS) <= set(frame.columns)]
+        self.panel = stack_event_panel(frames)
+        self.market_returns = np.full(len(self.panel), np.nan)
+        sessions = self.panel['Session'].to_numpy()
+        etf_tickers = self.panel['Index_Name'].map(self.benchmarks.etf_for_index).astype(object).to_numpy()
+        for ticker in pd.unique(etf_tickers[pd.notna(etf_tickers)]):
+            rows = etf_tickers == ticker
+            self.market_returns[rows] = self.benchmarks.values(ticker, 'close_to_close', sessions[rows])
+        print(f"Loaded {self.panel['Event_Code'].max() + 1 if len(self.panel) else 0} events ({len(self.panel)} rows) from {self.price_data_folder}")
+
+    def fit(self):
+        relative_day = (self.panel['Session'] - self.panel['Announced_Session']).to_numpy()
+        estimation = (relative_day >= self.estimation_window[0]) & (relative_day <= self.estimation_window[1])
+        event_codes = self.panel['Event_Code'].to_numpy()
+        events = self.panel.drop_duplicates('Event_Code')[['Event_ID', 'Ticker', 'Index_Name', 'Event_Type']].reset_index(drop=True)
+        alpha, beta, sigma, n = market_model_fit(event_codes, self.market_returns, self.panel['Stock_Return'].to_numpy(dtype='float64'),
+                                                 estimation, len(events), self.min_estimation_sessions)
+        self.parameters = events.assign(Alpha=alpha, Beta=beta, Sigma=sigma, Estimation_Sessions=n.astype(int))
+        ar = self.panel['Stock_Return'].to_numpy(dtype='float64') - alpha[event_codes] - beta[event_codes] * self.market_returns
+        windows = []
+        for anchor in ["Announced", "Effective"]:
+            relative_day = (self.panel['Session'] - self.panel[f'{anchor}_Session']).to_numpy()
+            in_window = (relative_day >= self.event_window[0]) & (relative_day <= self.event_window[1])
+            window = self.panel.loc[in_window, ['Event_ID', 'Index_Name', 'Event_Type', 'Date']].assign(
+                Anchor=anchor, Relative_Day=relative_day[in_window], AR=ar[in_window])
+            window['CAR'] = window['AR'].fillna(0.0).groupby(window['Event_ID'], observed=True).cumsum().where(window['AR'].notna())
+            windows.append(window)
+        self.abnormal_returns = pd.concat(windows, ignore_index=True)
+        fitted = np.count_nonzero(~np.isnan(beta))
+        print(f"Fitted market model for {fitted} of {len(events)} events")
+        return self.parameters
+
+    def caar(self, group_columns=("Index_Name", "Event_Type")):
+        return caar_statistics(self.abnormal_returns, list(group_columns))
+
+    def save_results(self, parameters_path, abnormal_returns_path, caar_path):
+        self.parameters.to_csv(parameters_path, index=False)
+        self.abnormal_returns.to_csv(abnormal_returns_path, index=False)
+        self.caar().to_csv(caar_path, index=False)
+        print(f"Event study results saved to {parameters_path}, {abnormal_returns_path} and {caar_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    study = EventStudy(os.path.join(base_dir, "price_data"))
+    study.load_data()
+    study.fit()
+    study.save_results(os.path.join(base_dir, "strategy_1", "event_study_parameters.csv"),
+                       os.path.join(base_dir, "strategy_1", "event_study_abnormal_returns.csv"),
+                       os.path.join(base_dir, "strategy_1", "event_study_caar.csv"))
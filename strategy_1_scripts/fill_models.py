@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from utils import HOLDING_SESSIONS, limit_entry_fills, stop_take_profit_exits, vwap_proxy
+
+class FillModel:
+    """Fill prices for every trade-log row in one vectorised pass. The defaults reproduce the engines' reference-price entry and Close exit."""
+    def __init__(self, entry="reference", exit="close", limit_offset=0.0, stop_loss=None, take_profit=None):
+        self.entry = entry
+        self.exit = exit
+        self.limit_offset = limit_offset
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    def apply(self, trade_log_df, entry_column, side=1, holding_sessions=None):
+        holding_sessions = holding_sessions or HOLDING_SESSIONS.get(entry_column, 1)
+        if holding_sessions > 1 and (self.entry != "reference" or self.stop_loss is not None or self.take_profit is not None):
+            # Only the trade date's bar is stored, so a limit/VWAP entry or a stop/take-profit would ignore every earlier bar of the hold
+            raise ValueError(f"{entry_column} entries are held {holding_sessions} sessions; only reference entries without stop/take-profit exits are supported")
+        reference = trade_log_df[entry_column].to_numpy(dtype='float64')
+        close = trade_log_df['Close'].to_numpy(dtype='float64')
+        needs_bar = self.entry != "reference" or self.exit != "close" or self.stop_loss is not None or self.take_profit is not None
+        if needs_bar:
+            open_, high, low = (trade_log_df[column].to_numpy(dtype='float64') for column in ['Open', 'High', 'Low'])
+        filled = ~np.isnan(reference)
+        if self.entry == "reference":
+            entry_price = reference
+        elif self.entry == "limit":
+            filled, entry_price = limit_entry_fills(reference * (1 - side * self.limit_offset), open_, high, low, side)
+        elif self.entry == "vwap":
+            entry_price = vwap_proxy(high, low, close)
+        else:
+            raise ValueError(f"Unknown entry fill type: {self.entry}")
+        if self.exit == "close":
+            exit_price = close
+        elif self.exit == "vwap":
+            exit_price = vwap_proxy(high, low, close)
+        else:
+            raise ValueError(f"Unknown exit fill type: {self.exit}")
+        exit_reason = np.full(len(close), self.exit, dtype=object)
+        if self.stop_loss is not None or self.take_profit is not None:
+            exit_price, exit_reason = stop_take_profit_exits(entry_price, open_, high, low, exit_price, self.stop_loss, self.take_profit, side)
+            exit_reason = np.where(exit_reason == 'close', self.exit, exit_reason)
+        exit_reason[~filled] = 'unfilled'
+        trade_log_df['Filled'] = filled
+        trade_log_df['Entry_Price'] = np.where(filled, entry_price, np.nan)
+        trade_log_df['Exit_Price'] = np.where(filled, exit_price, np.nan)
+        trade_log_df['Exit_Reason'] = pd.Categorical(exit_reason)
+        return trade_log_df
+
+# Usage Example
+if __name__ == "__main__":
+    bars = pd.DataFrame({'Open': [100.0, 100.0, 100.0], 'High': [104.0, 101.0, 102.0], 'Low': [99.0, 96.0, 97.5], 'Close': [103.0, 97.0, 101.0]})
+    fill_model = FillModel(entry="limit", limit_offset=0.02, stop_loss=0.02, take_profit=0.03)
+    print(fill_model.apply(bars.assign(Reference=bars['Open']), 'Reference', side=1))
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils import bootstrap_summary, read_table
+
+class GroupBootstrap:
+    """Bootstrap confidence intervals and p-values for mean and net-mean returns of every (strategy_n, Index_Name, Event_Type) group.
+
+    Each group draws from its own child of one SeedSequence, so results do not depend on the number of workers or their scheduling.
+    """
+    def __init__(self, data, strategy="strategy_1", n_resamples=10000, confidence=0.95, seed=0, max_workers=None):
+        self.data = data
+        self.strategy = strategy
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.max_workers = max_workers or os.cpu_count()
+        self.group_columns = [f"{strategy}_n", "Index_Name", "Event_Type"]
+        self.value_columns = {f"{strategy}_md": ""}
+        if f"{strategy}_net" in data.columns:
+            self.value_columns[f"{strategy}_net"] = "Net_"
+        self.values = {column: data[column].to_numpy(dtype='float64', na_value=np.nan) for column in self.value_columns}
+
+    def resample_group(self, keys, rows, seed_sequence):
+        rng = np.random.default_rng(seed_sequence)
+        result = dict(zip(self.group_columns, keys))
+        for column, prefix in self.value_columns.items():
+            result.update(bootstrap_summary(self.values[column][rows], self.n_resamples, self.confidence, rng, prefix))
+        return result
+
+    def run(self):
+        groups = self.data.groupby(self.group_columns, observed=True).indices
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(len(groups))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.resample_group, groups.keys(), groups.values(), seed_sequences))
+        print(f"Bootstrapped {len(results)} groups with {self.n_resamples} resamples each")
+        return pd.DataFrame(results)
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    data = read_table(os.path.join(base_dir, "strategy_1", "strategy_1_returns.csv"), 'returns',
+                      columns=['strategy_1_n', 'Index_Name', 'Event_Type', 'strategy_1_md'])
+    bootstrap = GroupBootstrap(data, n_resamples=10000)
+    print(bootstrap.run())
@@ -0,0 +1,60 @@
+import os
+from utils import INDICATOR_COLUMNS, INDICATOR_INPUT_COLUMNS, compute_indicators, price_file_ticker, read_table, stack_price_history
+from trading_calendar import get_trading_calendar
+
+class IndicatorEngine:
+    def __init__(self, historical_data_folder, adv_window=20, volatility_window=20, atr_window=14, beta_window=20, benchmark_ticker="SPY", min_periods=10):
+        self.historical_data_folder = historical_data_folder
+        self.adv_window = adv_window
+        self.volatility_window = volatility_window
+        self.atr_window = atr_window
+        self.beta_window = beta_window
+        self.benchmark_ticker = benchmark_ticker
+        self.min_periods = min_periods
+        self.calendar = get_trading_calendar()
+        self.by_ticker = {}
+
+    def load_history(self):
+        frames = []
+        for file_name in sorted(os.listdir(self.historical_data_folder)):
+            if file_name.endswith("_Price_Data.csv"):
+                file_path = os.path.join(self.historical_data_folder, file_name)
+                df = read_table(file_path, 'price_data', columns=INDICATOR_INPUT_COLUMNS)
+                df['Ticker'] = price_file_ticker(file_name)
+                frames.append(df)
+        return stack_price_history(frames, self.calendar) if frames else None
+
+    def compute(self):
+        history = self.load_history()
+        if history is None:
+            print(f"No price data found in {self.historical_data_folder}")
+            return self.by_ticker
+        indicators = compute_indicators(history, self.adv_window, self.volatility_window, self.atr_window, self.beta_window, self.benchmark_ticker, self.min_periods)
+        self.by_ticker = {ticker: group.set_index('Session')[INDICATOR_COLUMNS] for ticker, group in indicators.groupby('Ticker', sort=False)}
+        print(f"Computed indicators for {len(self.by_ticker)} tickers over {len(indicators)} sessions")
+        self.report_coverage(indicators)
+        return self.by_ticker
+
+    def report_coverage(self, indicators):
+        coverage = indicators[INDICATOR_COLUMNS].notna().mean()
+        print("Indicator coverage: " + ", ".join(f"{column} {share:.0%}" for column, share in coverage.items()))
+        for column in coverage[coverage == 0].index:
+            print(f"Warning: {column} is never populated; its window is longer than the stored runs of sessions")
+        return coverage
+
+    def attach(self, df, file_name):
+        indicators = self.by_ticker.get(price_file_ticker(file_name))
+        if indicators is None or 'Date' not in df.columns:
+            return df
+        sessions = self.calendar.session_index(df['Date'])
+        values = indicators.reindex(sessions)
+        for column in INDICATOR_COLUMNS:
+            df[column] = values[column].to_numpy()
+        return df
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    historical_data_folder = os.path.join(base_dir, "price_data")
+    engine = IndicatorEngine(historical_data_folder)
+    engine.compute()
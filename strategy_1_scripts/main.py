@@ -1,10 +1,20 @@
 import os
+import argparse
 import pandas as pd
 from sp_global_scraper import SPGlobalScraper
+from trading_calendar import get_trading_calendar
+from utils import normalize_dates, read_table
 from ticker_data_downloader import TickerDataDownloader
 from index_data_downloader import IndexDataDownloader
 from price_data_updater import PriceDataUpdater
 from historical_data_processor import HistoricalDataProcessor
+from streaming_pipeline import StreamingPipeline
+from event_study import EventStudy
+from event_features import EventFeatureStore
+from benchmark_series import BenchmarkSeries
+from results_warehouse import ResultsWarehouse
+from pipeline_dag import PipelineDAG
+from profiler import Profiler, set_profiler
 from strategy_1_returns import DataAggregator
 from strategy_1_analysis import StrategyAnalysis
 from strategy_1_trade_log_creator import TradeLogCreator
@@ -13,111 +23,218 @@ from Submission.strategy_1_equity_curve_plot import EquityCurvePlotter
 from Submission.strategy_1_portfolio_metrics import PortfolioMetrics
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true", help="overlap ticker downloads with metadata and returns processing (steps 3, 5 and 6)")
+    parser.add_argument("--incremental", action="store_true", help="backtest only sessions after the last checkpoint and update metrics from saved state (steps 10 and 12)")
+    parser.add_argument("--warehouse", metavar="DB_PATH", help="also record each run's config, daily results and metrics in this SQLite results warehouse (step 12)")
+    parser.add_argument("--from", dest="start", type=int, metavar="STEP", help="first step to run; earlier steps are assumed done")
+    parser.add_argument("--until", type=int, metavar="STEP", help="last step to run")
+    parser.add_argument("--force", action="store_true", help="rerun the selected steps even if their inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=4, help="maximum number of independent steps to run concurrently")
+    parser.add_argument("--telemetry", action="store_true", help="record wall time, CPU time, traced memory, rows and files per step and hot function into a run report")
+    parser.add_argument("--profile", action="store_true", help="like --telemetry, and also dump a cProfile file per step")
+    parser.add_argument("--features", action="store_true", help="also build the per-event feature store as Parquet (step 7)")
+    parser.add_argument("--event-study", action="store_true", help="also run the market-model event study on the price data (step 8)")
+    parser.add_argument("--stream-stats", type=int, metavar="CHUNK_ROWS", help="compute the group statistics out of core in chunks of this many rows, without the KDE PDF (step 8)")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="RESAMPLES", help="add bootstrap confidence intervals and p-values to the group statistics (step 8)")
+    args = parser.parse_args()
     base_dir = os.path.dirname(os.path.abspath(__file__))
     historical_data_folder = os.path.join(base_dir, "price_data")
+    raw_press_release_file_path = "press_releases_2020_2024.csv"
     press_release_file_path = os.path.join(base_dir, "press_release_data.csv")
     log_file_path = os.path.join(base_dir, "no_match_log.txt")
     output_file_path = os.path.join(base_dir, "strategy_1", "strategy_1_returns.csv")
     output_pdf_path = os.path.join(base_dir, "strategy_1", "strategy_1_KDE.pdf")
     output_stats_path = os.path.join(base_dir, "strategy_1", "strategy_1_stats.csv")
-    
+    module_path = lambda module: os.path.join(base_dir, f"{module}.py")
+
     tickers = {"S&P 500": ["SPY"], "S&P 400": ["IJH"], "S&P 600": ["IJR"]}
     index_start_date = "2020-01-01"
     index_end_date = "2024-10-25"
+    etf_file_paths = [os.path.join(historical_data_folder, f"{ticker}_Price_Data.csv") for ticker_list in tickers.values() for ticker in ticker_list]
+
+    trade_log_configs = [
+        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100"]},
+        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100", "S&P SmallCap 600", "S&P MidCap 400"]},
+        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100", "S&P 500", "S&P MidCap 400"]}
+    ]
+    backtest_configs = [
+        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv")},
+        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv")},
+        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv")}
+    ]
+    equity_curve_configs = [
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_equity_curve.png"), "title": "Strategy 1 S&P 600: 1D Holding Period"},
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_equity_curve.png"), "title": "Strategy 1 Corporate Action: 1D Holding Period"},
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_equity_curve.png"), "title": "Strategy 1 - S&P 500 & Corporate Action: 1D Holding Period"}
+    ]
+    metric_configs = [
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_metrics.csv")},
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_metrics.csv")},
+        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_metrics.csv")}
+    ]
+    warehouse = ResultsWarehouse(args.warehouse) if args.warehouse else None
+    profiler = None
+    if args.telemetry or args.profile:
+        profiler = Profiler(profile_dir=os.path.join(base_dir, "strategy_1", "profiles") if args.profile else None)
+        set_profiler(profiler)
+    dag = PipelineDAG(os.path.join(base_dir, "strategy_1", "pipeline_cache.json"), args.workers, profiler)
 
     # Step 1: Scrape press releases
-    print("Step 1: Scraping press releases...")
-    scraper = SPGlobalScraper(start_date="2020-01-01", end_date="2024-12-31")
-    scraper.extract_tables_from_all_years()
+    def scrape_press_releases():
+        print("Step 1: Scraping press releases...")
+        scraper = SPGlobalScraper(start_date="2020-01-01", end_date="2024-12-31")
+        scraper.extract_tables_from_all_years()
+    dag.add_step("scrape_press_releases", 1, scrape_press_releases, [module_path("sp_global_scraper")], [raw_press_release_file_path],
+                 {"start_date": "2020-01-01", "end_date": "2024-12-31"})
 
     # Step 2: Process the scraped press release data
-    print("Step 2: Processing scraped press release data...")
-    df = pd.read_csv('press_releases_2020_2024.csv')
-    df['Effective_Date'] = pd.to_datetime(df.get('Effective_Date'), errors='coerce')
-    df['Announced'] = pd.to_datetime(df.get('Announced'), errors='coerce')
-    df['N_days'] = (df['Effective_Date'] - df['Announced']).dt.days + 1
-    df.to_csv(press_release_file_path, index=False)
-    print(f"Processed press release data saved to {press_release_file_path}")
-
-    # Step 3: Download ticker data based on press release additions
-    print("Step 3: Downloading ticker data based on press release additions...")
-    downloader = TickerDataDownloader(press_release_file_path)
-    downloader.download_all_ticker_data()
+    def process_press_releases():
+        print("Step 2: Processing scraped press release data...")
+        df = read_table(raw_press_release_file_path, 'press_release')
+        df['Effective_Date'] = normalize_dates(df.get('Effective_Date'))
+        df['Announced'] = normalize_dates(df.get('Announced'))
+        df['N_days'] = get_trading_calendar().count_sessions(df['Announced'], df['Effective_Date'])
+        df.to_csv(press_release_file_path, index=False)
+        print(f"Processed press release data saved to {press_release_file_path}")
+    dag.add_step("process_press_releases", 2, process_press_releases, [raw_press_release_file_path], [press_release_file_path])
 
     # Step 4: Download index data for specified tickers
-    print("Step 4: Downloading index data for specified tickers...")
-    index_downloader = IndexDataDownloader(tickers, index_start_date, index_end_date)
-    index_downloader.download_data()
+    def download_index_data():
+        print("Step 4: Downloading index data for specified tickers...")
+        index_downloader = IndexDataDownloader(tickers, index_start_date, index_end_date)
+        index_downloader.download_data()
+    dag.add_step("download_index_data", 4, download_index_data, [module_path("index_data_downloader")], etf_file_paths,
+                 {"tickers": tickers, "start_date": index_start_date, "end_date": index_end_date})
+
+    if args.stream:
+        # Steps 3, 5 and 6: Stream ticker downloads straight into metadata and returns processing
+        def stream_price_data():
+            print("Steps 3, 5 and 6: Streaming ticker downloads through metadata updates and metric calculation...")
+            pipeline = StreamingPipeline(TickerDataDownloader(press_release_file_path), historical_data_folder, press_release_file_path, log_file_path)
+            pipeline.run()
+        dag.add_step("stream_price_data", 3, stream_price_data,
+                     [press_release_file_path, *etf_file_paths, module_path("streaming_pipeline"), module_path("indicator_engine")],
+                     [historical_data_folder])
+    else:
+        # Step 3: Download ticker data based on press release additions
+        def download_ticker_data():
+            print("Step 3: Downloading ticker data based on press release additions...")
+            downloader = TickerDataDownloader(press_release_file_path)
+            downloader.download_all_ticker_data()
+        dag.add_step("download_ticker_data", 3, download_ticker_data, [press_release_file_path, module_path("ticker_data_downloader")], [historical_data_folder])
 
-    # Step 5: Update price data files with press release metadata
-    print("Step 5: Updating price data files with press release data...")
-    updater = PriceDataUpdater(historical_data_folder, press_release_file_path, log_file_path)
-    updater.update_files()
+        # Step 5: Update price data files with press release metadata
+        def update_price_data():
+            print("Step 5: Updating price data files with press release data...")
+            updater = PriceDataUpdater(historical_data_folder, press_release_file_path, log_file_path)
+            updater.update_files()
+        dag.add_step("update_price_data", 5, update_price_data,
+                     [historical_data_folder, press_release_file_path, module_path("price_data_updater")],
+                     [historical_data_folder])
 
-    # Step 6: Process additional metrics (ADV20, Returns, Volatility, Strategy Returns)
-    print("Step 6: Calculating ADV20, Returns, Volatility, and Strategy Returns for each file...")
-    processor = HistoricalDataProcessor(historical_data_folder)
-    processor.process_all_files()
+        # Step 6: Process additional metrics (ADV20, Returns, Volatility, ATR, Beta, Strategy Returns)
+        def process_historical_data():
+            print("Step 6: Calculating ADV20, Returns, Volatility, ATR, Beta, and Strategy Returns for each file...")
+            processor = HistoricalDataProcessor(historical_data_folder)
+            processor.process_all_files()
+        dag.add_step("process_historical_data", 6, process_historical_data,
+                     [historical_data_folder, *etf_file_paths, module_path("historical_data_processor"), module_path("indicator_engine")],
+                     [historical_data_folder])
 
     # Step 7: Aggregate columns for selected rows into a single output
-    print("Step 7: Aggregating columns for selected rows across all files...")
-    aggregator = DataAggregator(historical_data_folder, output_file_path)
-    aggregator.aggregate_columns_for_selected_rows()
+    def aggregate_returns():
+        print("Step 7: Aggregating columns for selected rows across all files...")
+        aggregator = DataAggregator(historical_data_folder, output_file_path)
+        aggregator.aggregate_columns_for_selected_rows()
+    dag.add_step("aggregate_returns", 7, aggregate_returns, [historical_data_folder, module_path("strategy_1_returns")], [output_file_path])
+
+    # Step 7b: One row of lag, run-up, liquidity, volatility, ETF and repeat-inclusion features per event, joinable by Event_ID
+    if args.features:
+        event_features_path = os.path.join(base_dir, "strategy_1", "event_features.parquet")
+        def build_event_features():
+            print("Step 7: Building the event feature store...")
+            store = EventFeatureStore(historical_data_folder, event_features_path)
+            store.build()
+            store.save()
+        dag.add_step("event_features", 7, build_event_features, [historical_data_folder, module_path("event_features")], [event_features_path])
 
     # Step 8: Generate PDF plots and calculate statistics
-    print("Step 8: Generating PDFs and calculating statistics by sector and event type...")
-    analysis = StrategyAnalysis(output_file_path, output_pdf_path, output_stats_path)
-    analysis.load_data()
-    analysis.analyze_and_save()
+    def analyze_returns():
+        print("Step 8: Generating PDFs and calculating statistics by sector and event type...")
+        analysis = StrategyAnalysis(output_file_path, output_pdf_path, output_stats_path, args.bootstrap, stream_chunksize=args.stream_stats)
+        analysis.load_data()
+        analysis.analyze_and_save()
+    dag.add_step("analyze_returns", 8, analyze_returns, [output_file_path, module_path("strategy_1_analysis"), module_path("group_bootstrap"), module_path("streaming_stats")],
+                 ([] if args.stream_stats else [output_pdf_path]) + [output_stats_path], {"bootstrap": args.bootstrap, "stream_stats": args.stream_stats}, resource="matplotlib")
+
+    # Step 8b: Market-model event study around announcement and effective dates
+    if args.event_study:
+        event_study_paths = [os.path.join(base_dir, "strategy_1", f"event_study_{name}.csv") for name in ["parameters", "abnormal_returns", "caar"]]
+        def run_event_study():
+            print("Step 8: Estimating market-model abnormal returns and CAAR by index and event type...")
+            study = EventStudy(historical_data_folder, BenchmarkSeries(historical_data_folder))
+            study.load_data()
+            study.fit()
+            study.save_results(*event_study_paths)
+        dag.add_step("event_study", 8, run_event_study, [historical_data_folder, *etf_file_paths, module_path("event_study")], event_study_paths)
 
     # Step 9: Create trade logs with different configurations
-    print("Step 9: Creating trade logs with different index exclusion configurations...")
-    trade_log_configs = [
-        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100"]},
-        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100", "S&P SmallCap 600", "S&P MidCap 400"]},
-        {"output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_trade_log.csv"), "exclude_indices": ["DJIA", "DJTA", "S&P 100", "S&P 500", "S&P MidCap 400"]}
-    ]
-    for config in trade_log_configs:
+    def create_trade_log(config):
+        print(f"Step 9: Creating trade log {config['output_file_path']}...")
         trade_log_creator = TradeLogCreator(output_file_path, config["output_file_path"], config["exclude_indices"])
         trade_log_creator.create_trade_log()
+    for config in trade_log_configs:
+        dag.add_step(f"trade_log:{os.path.basename(config['output_file_path'])}", 9, lambda config=config: create_trade_log(config),
+                     [output_file_path, module_path("strategy_1_trade_log_creator")], [config["output_file_path"]], config)
 
     # Step 10: Run backtests for each trade log configuration
-    print("Step 10: Running backtests for each trade log configuration...")
-    backtest_configs = [
-        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv")},
-        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv")},
-        {"trade_log_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_trade_log.csv"), "sofr_file_path": os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"), "output_file_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv")}
-    ]
-    for config in backtest_configs:
-        print(f"Running backtest for {config['output_file_path']}...")
+    def run_backtest(config):
+        print(f"Step 10: Running backtest for {config['output_file_path']}...")
         backtest_engine = BacktestEngine(config["trade_log_file_path"], config["sofr_file_path"], config["output_file_path"])
-        backtest_engine.run_backtest()
-        backtest_engine.save_results()
+        if args.incremental:
+            backtest_engine.run_incremental()
+        else:
+            backtest_engine.run_backtest()
+            backtest_engine.save_results()
+    for config in backtest_configs:
+        dag.add_step(f"backtest:{os.path.basename(config['output_file_path'])}", 10, lambda config=config: run_backtest(config),
+                     [config["trade_log_file_path"], config["sofr_file_path"], module_path("strategy_1_backtest_engine"),
+                      module_path("fill_models"), module_path("cost_models"), module_path("kernels")],
+                     [config["output_file_path"]], {**config, "incremental": args.incremental})
 
     # Step 11: Generate equity curves for each backtest result
-    print("Step 11: Generating equity curves for each backtest result...")
-    equity_curve_configs = [
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_equity_curve.png"), "title": "Strategy 1 S&P 600: 1D Holding Period"},
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_equity_curve.png"), "title": "Strategy 1 Corporate Action: 1D Holding Period"},
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv"), "output_image_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_equity_curve.png"), "title": "Strategy 1 - S&P 500 & Corporate Action: 1D Holding Period"}
-    ]
-    for config in equity_curve_configs:
-        print(f"Generating equity curve for {config['title']}...")
+    def plot_equity_curve(config):
+        print(f"Step 11: Generating equity curve for {config['title']}...")
         plotter = EquityCurvePlotter(config["backtest_results_path"], config["output_image_path"], config["title"])
         plotter.load_data()
         plotter.plot_equity_curve()
+    for config in equity_curve_configs:
+        dag.add_step(f"equity_curve:{os.path.basename(config['output_image_path'])}", 11, lambda config=config: plot_equity_curve(config),
+                     [config["backtest_results_path"], module_path("strategy_1_equity_curve_plot")], [config["output_image_path"]], config,
+                     resource="matplotlib")
 
     # Step 12: Calculate portfolio metrics for each backtest
-    print("Step 12: Calculating portfolio metrics for each backtest...")
-    metric_configs = [
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_SP600_1D_metrics.csv")},
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_SP500_CA1D_metrics.csv")},
-        {"backtest_results_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_backtest_results.csv"), "output_metrics_path": os.path.join(base_dir, "strategy_1", "strat_1_CA1D_metrics.csv")}
-    ]
-    for config in metric_configs:
-        print(f"Calculating metrics for {config['backtest_results_path']}...")
+    def calculate_portfolio_metrics(config):
+        print(f"Step 12: Calculating metrics for {config['backtest_results_path']}...")
         metrics_calculator = PortfolioMetrics(config["backtest_results_path"], config["output_metrics_path"])
-        metrics_calculator.load_data()
-        metrics_calculator.calculate_metrics()
+        if args.incremental:
+            metrics_calculator.calculate_incremental_metrics()
+        else:
+            metrics_calculator.load_data()
+            metrics_calculator.calculate_metrics()
         metrics_calculator.save_metrics()
+        if warehouse is not None:
+            backtest_config = next((c for c in backtest_configs if c["output_file_path"] == config["backtest_results_path"]), config)
+            warehouse.record_files(config["backtest_results_path"], config["output_metrics_path"], backtest_config)
+    for config in metric_configs:
+        dag.add_step(f"metrics:{os.path.basename(config['output_metrics_path'])}", 12, lambda config=config: calculate_portfolio_metrics(config),
+                     [config["backtest_results_path"], module_path("strategy_1_portfolio_metrics")], [config["output_metrics_path"]],
+                     {**config, "incremental": args.incremental, "warehouse": args.warehouse}, resource="warehouse" if warehouse is not None else None)
+
+    dag.run(args.start, args.until, args.force)
+    if profiler is not None:
+        profiler.save_report(os.path.join(base_dir, "strategy_1", "run_report.json"), os.path.join(base_dir, "strategy_1", "run_report.csv"))
+    if warehouse is not None:
+        warehouse.close()
     print("Process completed: All data scraped, processed, analyzed, trade logs generated, backtests run, equity curves created, and metrics calculated.")
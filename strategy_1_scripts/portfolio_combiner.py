@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import (
+    COMBINER_FIELDS,
+    read_table,
+    align_books,
+    inverse_volatility_weights,
+    apply_capital_caps,
+    calculate_information_ratio,
+    calculate_sharpe_ratio,
+    calculate_drawdown,
+    calculate_annualized_return,
+    calculate_margin,
+    calculate_turnover,
+)
+from trading_calendar import get_trading_calendar
+
+class PortfolioCombiner:
+    """Combines any number of backtest results books on a shared session index under one firm-level portfolio_cap."""
+    def __init__(self, books, output_file_path, weighting="static", weights=None, book_caps=None, portfolio_cap=None, vol_window=63):
+        self.books = books
+        self.output_file_path = output_file_path
+        self.weighting = weighting
+        self.weights = weights
+        self.book_caps = book_caps
+        self.portfolio_cap = portfolio_cap
+        self.vol_window = vol_window
+        self.calendar = get_trading_calendar()
+        self.metrics = {}
+
+    def load_data(self):
+        frames = []
+        for name, path in self.books.items():
+            frame = read_table(path, 'backtest_results', columns=['Date'] + COMBINER_FIELDS + ['Long_Overnight_Cost'])
+            if 'Overnight_Cost' not in frame.columns:
+                frame['Overnight_Cost'] = frame['Long_Overnight_Cost'] if 'Long_Overnight_Cost' in frame.columns else 0.0
+            frames.append(frame)
+        self.dates, self.arrays = align_books(frames, self.calendar)
+        self.book_pnl = self.arrays['RGL'] - self.arrays['Transaction_Costs'] - self.arrays['Slippage_Cost'] - self.arrays['Overnight_Cost']
+        print(f"Aligned {len(self.books)} books on {len(self.dates)} sessions")
+
+    def book_weights(self):
+        n_sessions, n_books = self.book_pnl.shape
+        if self.weighting == "inverse_vol":
+            weights = inverse_volatility_weights(self.book_pnl, self.vol_window)
+        elif self.weighting in ("static", "capped"):
+            static = np.array([self.weights.get(name, 1.0) if self.weights else 1.0 for name in self.books], dtype='float64')
+            weights = np.tile(static, (n_sessions, 1))
+        else:
+            raise ValueError(f"Unknown weighting: {self.weighting}")
+        book_caps = None
+        if self.book_caps is not None:
+            book_caps = np.array([self.book_caps.get(name, np.inf) for name in self.books], dtype='float64')
+        elif self.weighting == "capped":
+            raise ValueError("Capped weighting requires book_caps")
+        return apply_capital_caps(weights, self.arrays['Total_Position_Size'], book_caps, self.portfolio_cap)
+
+    def combine(self):
+        weights = self.book_weights()
+        combined = {field: (weights * self.arrays[field]).sum(axis=1) for field in COMBINER_FIELDS}
+        weighted_pnl = weights * self.book_pnl
+        self.results = pd.DataFrame({'Date': self.dates, **combined})
+        for column, name in enumerate(self.books):
+            self.results[f'{name}_Weight'] = weights[:, column]
+            self.results[f'{name}_PnL'] = weighted_pnl[:, column]
+        self.results['Daily_PnL'] = weighted_pnl.sum(axis=1)
+        self.results['Cumulative_Net_PnL'] = np.cumsum(self.results['Daily_PnL'].to_numpy())
+        self.correlation = pd.DataFrame(np.corrcoef(self.book_pnl, rowvar=False).reshape(len(self.books), len(self.books)),
+                                        index=list(self.books), columns=list(self.books))
+        return self.results
+
+    def calculate_metrics(self, trading_days_per_year=252):
+        daily_pnl = self.results['Daily_PnL']
+        total_position_size_sum = self.results['Total_Position_Size'].sum()
+        avg_position_size = self.results['Total_Position_Size'].mean()
+        daily_pnl_sum = daily_pnl.sum()
+        num_days = len(self.results)
+
+        self.metrics["Information_Ratio"] = calculate_information_ratio(daily_pnl)
+        self.metrics["Sharpe_Ratio"] = calculate_sharpe_ratio(self.metrics["Information_Ratio"], trading_days_per_year)
+        self.metrics["Max_Drawdown"] = calculate_drawdown(daily_pnl, avg_position_size)
+        self.metrics["Annualized_Return"] = calculate_annualized_return(daily_pnl_sum, total_position_size_sum, num_days, trading_days_per_year)
+        self.metrics["Margin"] = calculate_margin(daily_pnl_sum, total_position_size_sum)
+        self.metrics["Turnover"] = calculate_turnover(avg_position_size, total_position_size_sum)
+        return self.metrics
+
+    def save_results(self, output_metrics_path=None, output_correlation_path=None):
+        self.results.to_csv(self.output_file_path, index=False)
+        print(f"Combined portfolio results saved to {self.output_file_path}")
+        if output_metrics_path:
+            pd.DataFrame([self.metrics]).to_csv(output_metrics_path, index=False)
+            print(f"Combined portfolio metrics saved to {output_metrics_path}")
+        if output_correlation_path:
+            self.correlation.to_csv(output_correlation_path)
+            print(f"Book correlation matrix saved to {output_correlation_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.dirname(base_dir)
+    books = {
+        "SP600_1D": os.path.join(root_dir, "strategy_1_scripts", "strategy_1", "strat_1_SP600_1D_backtest_results.csv"),
+        "CA1D": os.path.join(root_dir, "strategy_1_scripts", "strategy_1", "strat_1_CA1D_backtest_results.csv"),
+        "SP500_CA1D": os.path.join(root_dir, "strategy_1_scripts", "strategy_1", "strat_1_SP500_CA1D_backtest_results.csv"),
+        "SP400_IR7D": os.path.join(root_dir, "strategy_2_scripts", "strategy_2", "strat_2_SP400_IR7D_backtest_results.csv"),
+        "SP400_CA2D": os.path.join(root_dir, "strategy_2_scripts", "strategy_2", "strat_2_SP400_CA2D_backtest_results.csv"),
+        "SP600_IR2D": os.path.join(root_dir, "strategy_2_scripts", "strategy_2", "strat_2_SP600_IR2D_backtest_results.csv"),
+    }
+    combiner = PortfolioCombiner(books, os.path.join(base_dir, "strategy_1", "combined_portfolio_results.csv"),
+                                 weighting="inverse_vol", portfolio_cap=5000000)
+    combiner.load_data()
+    combiner.combine()
+    print(combiner.calculate_metrics())
+    combiner.save_results(os.path.join(base_dir, "strategy_1", "combined_portfolio_metrics.csv"),
+                          os.path.join(base_dir, "strategy_1", "combined_portfolio_correlation.csv"))
@@ -1,6 +1,7 @@
 import os
 import pandas as pd
 from utils import load_press_release_data, parse_filename, update_price_data_file
+from trading_calendar import get_trading_calendar
 
 class PriceDataUpdater:
     def __init__(self, historical_data_folder, press_release_file_path, log_file_path):
@@ -8,25 +9,31 @@ class PriceDataUpdater:
         self.press_release_file_path = press_release_file_path
         self.log_file_path = log_file_path
         self.press_release_data = load_press_release_data(press_release_file_path)
+        self.calendar = get_trading_calendar()
 
     def update_files(self):
         with open(self.log_file_path, 'w') as log_file:
             for file_name in os.listdir(self.historical_data_folder):
                 if file_name.endswith("_Price_Data.csv"):
-                    file_path = os.path.join(self.historical_data_folder, file_name)
-                    file_info = parse_filename(file_name)
-                    if file_info:
-                        ticker, announced_date, effective_date = file_info
-                        match = self.find_matching_row(ticker, announced_date, effective_date)
-                        if not match.empty:
-                            update_price_data_file(file_path, match, ticker)
-                            print(f"Updated file: {file_name}")
-                        else:
-                            self.log_unmatched_file(log_file, file_name, ticker, announced_date, effective_date)
-                    else:
-                        log_file.write(f"Error parsing dates from filename: {file_name}\n")
+                    log_entry = self.update_file(file_name)
+                    if log_entry:
+                        log_file.write(log_entry)
         print(f"Process completed. Log of unmatched files saved to {self.log_file_path}")
 
+    def update_file(self, file_name):
+        """Updates one price data file; returns the log entry when it could not be matched, otherwise None."""
+        file_path = os.path.join(self.historical_data_folder, file_name)
+        file_info = parse_filename(file_name)
+        if not file_info:
+            return f"Error parsing dates from filename: {file_name}\n"
+        ticker, announced_date, effective_date = file_info
+        match = self.find_matching_row(ticker, announced_date, effective_date)
+        if match.empty:
+            return self.unmatched_log_entry(file_name, ticker, announced_date, effective_date)
+        update_price_data_file(file_path, match, ticker, self.calendar)
+        print(f"Updated file: {file_name}")
+        return None
+
     def find_matching_row(self, ticker, announced_date, effective_date):
         return self.press_release_data[
             (self.press_release_data['Ticker'] == ticker) &
@@ -34,9 +41,9 @@ class PriceDataUpdater:
             (self.press_release_data['Effective_date'] == effective_date)
         ]
 
-    def log_unmatched_file(self, log_file, file_name, ticker, announced_date, effective_date):
-        log_file.write(f"No match found for file: {file_name}\n")
-        log_file.write(f"  Ticker: {ticker}, Announced Date: {announced_date}, Effective Date: {effective_date}\n\n")
+    def unmatched_log_entry(self, file_name, ticker, announced_date, effective_date):
+        return (f"No match found for file: {file_name}\n"
+                f"  Ticker: {ticker}, Announced Date: {announced_date}, Effective Date: {effective_date}\n\n")
 
 # Usage example
 #if __name__ == "__main__":
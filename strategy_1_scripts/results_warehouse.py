@@ -0,0 +1,102 @@
+import os
+import json
+import sqlite3
+from datetime import datetime, timezone
+import pandas as pd
+from utils import (
+    WAREHOUSE_SCHEMA,
+    WAREHOUSE_DAILY_COLUMNS,
+    read_table,
+    code_version,
+    run_name,
+    daily_result_rows,
+)
+
+class ResultsWarehouse:
+    """Embedded SQLite store for backtest runs: run metadata, daily results and metrics in indexed tables."""
+    def __init__(self, db_path, repo_dir=None):
+        self.db_path = db_path
+        self.code_version = code_version(repo_dir or os.path.dirname(os.path.abspath(__file__)))
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(WAREHOUSE_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(self, name, results, metrics, config=None, started_at=None):
+        """Inserts one run in a single transaction and returns its run_id."""
+        created_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (name, config, code_version, started_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (name, json.dumps(config or {}, default=str, sort_keys=True), self.code_version, started_at, created_at),
+            )
+            run_id = cursor.lastrowid
+            placeholders = ", ".join("?" * (len(WAREHOUSE_DAILY_COLUMNS) + 1))
+            self.connection.executemany(
+                f"INSERT INTO daily_results (run_id, {', '.join(WAREHOUSE_DAILY_COLUMNS.values())}) VALUES ({placeholders})",
+                daily_result_rows(run_id, results),
+            )
+            self.connection.executemany(
+                "INSERT INTO metrics (run_id, metric, value) VALUES (?, ?, ?)",
+                [(run_id, metric, None if pd.isna(value) else float(value)) for metric, value in metrics.items()],
+            )
+        print(f"Recorded run {run_id} ({name}) in {self.db_path}")
+        return run_id
+
+    def record_files(self, backtest_results_path, output_metrics_path, config=None):
+        """Records a run from the CSVs written by BacktestEngine.save_results and PortfolioMetrics.save_metrics."""
+        results = read_table(backtest_results_path, 'backtest_results')
+        metrics = pd.read_csv(output_metrics_path).iloc[0].to_dict()
+        return self.record_run(run_name(backtest_results_path), results, metrics, config)
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def runs(self, name=None):
+        if name is None:
+            return self.query("SELECT * FROM runs ORDER BY run_id")
+        return self.query("SELECT * FROM runs WHERE name = ? ORDER BY run_id", (name,))
+
+    def latest_run_id(self, name):
+        row = self.connection.execute("SELECT MAX(run_id) FROM runs WHERE name = ?", (name,)).fetchone()
+        return row[0]
+
+    def daily_results(self, run_id):
+        return self.query("SELECT * FROM daily_results WHERE run_id = ? ORDER BY date", (run_id,))
+
+    def compare_runs(self, run_ids, metrics=None):
+        """One row per run and one column per metric."""
+        run_placeholders = ", ".join("?" * len(run_ids))
+        sql = f"SELECT r.run_id, r.name, m.metric, m.value FROM metrics m JOIN runs r USING (run_id) WHERE m.run_id IN ({run_placeholders})"
+        params = list(run_ids)
+        if metrics:
+            sql += f" AND m.metric IN ({', '.join('?' * len(metrics))})"
+            params += list(metrics)
+        long_df = self.query(sql, params)
+        return long_df.pivot_table(index=['run_id', 'name'], columns='metric', values='value').reset_index()
+
+    def leaderboard(self, metric="Sharpe_Ratio", limit=10, name=None, ascending=False):
+        """Top runs by one metric, served from the (metric, value) index."""
+        order = "ASC" if ascending else "DESC"
+        sql = ("SELECT r.run_id, r.name, r.code_version, r.created_at, m.value AS " + metric +
+               " FROM metrics m JOIN runs r USING (run_id) WHERE m.metric = ? AND m.value IS NOT NULL")
+        params = [metric]
+        if name is not None:
+            sql += " AND r.name = ?"
+            params.append(name)
+        sql += f" ORDER BY m.value {order} LIMIT ?"
+        params.append(limit)
+        return self.query(sql, params)
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    warehouse = ResultsWarehouse(os.path.join(base_dir, "strategy_1", "results_warehouse.db"))
+    for name in ["strat_1_SP600_1D", "strat_1_SP500_CA1D", "strat_1_CA1D"]:
+        warehouse.record_files(os.path.join(base_dir, "strategy_1", f"{name}_backtest_results.csv"),
+                               os.path.join(base_dir, "strategy_1", f"{name}_metrics.csv"))
+    print(warehouse.leaderboard("Sharpe_Ratio"))
+    warehouse.close()
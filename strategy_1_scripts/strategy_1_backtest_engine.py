@@ -1,28 +1,42 @@
 import pandas as pd
+import numpy as np
 import os
-from utils import calculate_slippage_cost, get_sofr_rate
+from kernels import scale_to_cap
+from fill_models import FillModel
+from cost_models import FinancingCost, PerShareCommission, PowerLawImpact, evaluate_cost_models
+from profiler import profiled, record_rows
+from utils import backtest_state_path, load_backtest_state, read_table, save_backtest_state, update_backtest_state, write_backtest_state
+
+BACKTEST_COLUMNS = ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume', 'ADV20', 'Volatility']
 
 class BacktestEngine:
-    def __init__(self, trade_log_file_path, sofr_file_path, output_file_path, portfolio_cap=5000000, alpha=0.2, beta=0.7):
+    def __init__(self, trade_log_file_path, sofr_file_path, output_file_path, portfolio_cap=5000000, alpha=0.2, beta=0.7, fill_model=None, participation_rate=0.01,
+                 transaction_cost_models=None, slippage_models=None, financing_model=None):
         self.trade_log_file_path = trade_log_file_path
         self.sofr_file_path = sofr_file_path
         self.output_file_path = output_file_path
         self.portfolio_cap = portfolio_cap
+        self.participation_rate = participation_rate
         self.alpha = alpha
         self.beta = beta
+        self.fill_model = fill_model or FillModel()
+        self.transaction_cost_models = transaction_cost_models or [PerShareCommission(0.01, sides=2)]
+        self.slippage_models = slippage_models or [PowerLawImpact(alpha, beta)]
+        self.financing_model = financing_model or FinancingCost(0.015, days_back=1)
         self.cumulative_net_pnl = 0
         self.portfolio_values = []
-        self.trade_log_df = pd.read_csv(self.trade_log_file_path)
-        self.sofr_df = pd.read_csv(self.sofr_file_path)
-        self.sofr_df['DATE'] = pd.to_datetime(self.sofr_df['DATE']).sort_values().reset_index(drop=True)
+        self.trade_log_df = read_table(self.trade_log_file_path, 'trade_log', columns=BACKTEST_COLUMNS)
+        self.side = 1
+        self.trade_log_df = self.fill_model.apply(self.trade_log_df, 'Open', side=self.side)
+        self.sofr_df = read_table(self.sofr_file_path, 'sofr')
+        self.sofr_df = self.sofr_df.dropna(subset=['DATE', 'SOFR']).sort_values(by='DATE').reset_index(drop=True)
 
+    @profiled()
     def run_backtest(self):
-        unique_dates = sorted(self.trade_log_df['Date'].unique())
-        for date in unique_dates:
-            daily_trades = self.trade_log_df[self.trade_log_df['Date'] == date].copy()
+        for date, daily_trades in self.trade_log_df.groupby('Date', sort=True):
+            daily_trades = daily_trades.copy()
             daily_trades = self.process_daily_trades(daily_trades)
-            sofr_rate = get_sofr_rate(date, self.sofr_df)
-            long_overnight_cost = self.calculate_overnight_cost(sofr_rate, daily_trades['Position_Size'].sum())
+            long_overnight_cost = self.financing_model.daily_cost(date, self.sofr_df, daily_trades['Position_Size'].sum())
             daily_net_pnl = daily_trades['RGL'].sum() - daily_trades['Transaction_Costs'].sum() - \
                             daily_trades['Slippage_Cost'].sum() - long_overnight_cost
             self.cumulative_net_pnl += daily_net_pnl
@@ -36,33 +50,50 @@ class BacktestEngine:
                 "Long_Overnight_Cost": long_overnight_cost,
                 "Cumulative_Net_PnL": self.cumulative_net_pnl
             })
+        record_rows(len(self.trade_log_df), len(self.portfolio_values))
 
     def process_daily_trades(self, daily_trades):
-        daily_trades['Size_Limit'] = daily_trades['ADV20'] * 0.01
-        daily_trades['Trade_Limit'] = daily_trades[['Size_Limit', 'Volume']].min(axis=1)
-        daily_trades['Position_Size'] = daily_trades['Trade_Limit'] * daily_trades['Open']
-        total_position_size = daily_trades['Position_Size'].sum()
-        if total_position_size > self.portfolio_cap:
-            scale_factor = self.portfolio_cap / total_position_size
-            daily_trades['Position_Size'] *= scale_factor
-            daily_trades['Trade_Limit'] *= scale_factor
-        daily_trades['Sale_Proceeds'] = daily_trades['Trade_Limit'] * daily_trades['Close']
+        daily_trades['Size_Limit'] = daily_trades['ADV20'] * self.participation_rate
+        # A NaN ADV20 (indicator still warming up) means no size is known, so the trade is skipped rather than sized at the full day's Volume
+        daily_trades['Trade_Limit'] = daily_trades[['Size_Limit', 'Volume']].min(axis=1).where(daily_trades['Filled'] & daily_trades['Size_Limit'].notna(), 0.0)
+        daily_trades['Position_Size'] = daily_trades['Trade_Limit'] * daily_trades['Entry_Price']
+        position_size = daily_trades['Position_Size'].to_numpy(dtype='float64', copy=True)
+        trade_limit = daily_trades['Trade_Limit'].to_numpy(dtype='float64', copy=True)
+        scale_to_cap(position_size, trade_limit, self.portfolio_cap)
+        daily_trades['Position_Size'] = position_size
+        daily_trades['Trade_Limit'] = trade_limit
+        daily_trades['Sale_Proceeds'] = daily_trades['Trade_Limit'] * daily_trades['Exit_Price']
         daily_trades['RGL'] = daily_trades['Sale_Proceeds'] - daily_trades['Position_Size']
-        daily_trades['Transaction_Costs'] = 2 * daily_trades['Trade_Limit'] * 0.01
-        daily_trades['Slippage_Cost'] = calculate_slippage_cost(daily_trades, self.alpha, self.beta)
+        daily_trades['Transaction_Costs'] = evaluate_cost_models(self.transaction_cost_models, daily_trades)
+        daily_trades['Slippage_Cost'] = evaluate_cost_models(self.slippage_models, daily_trades)
         return daily_trades
 
-    def calculate_overnight_cost(self, sofr_rate, total_position_size):
-        if sofr_rate is not None:
-            overnight_rate = (sofr_rate / 100 + 0.015) * (1 / 365)
-            return overnight_rate * total_position_size
-        else:
-            print("No SOFR rate found.")
-            return 0
+    def run_incremental(self):
+        """Backtests only sessions after the last checkpoint, appends them to the results file and updates the saved state."""
+        state_path = backtest_state_path(self.output_file_path)
+        state = load_backtest_state(state_path)
+        if state is not None:
+            self.cumulative_net_pnl = state['cumulative_net_pnl']
+            self.trade_log_df = self.trade_log_df[self.trade_log_df['Date'] > np.datetime64(state['last_date'])]
+        self.portfolio_values = []
+        self.run_backtest()
+        if not self.portfolio_values:
+            print(f"No new sessions since the last checkpoint for {self.output_file_path}")
+            return state
+        new_results = pd.DataFrame(self.portfolio_values)
+        daily_pnl = new_results['RGL'] - new_results['Transaction_Costs'] - new_results['Long_Overnight_Cost'] - new_results['Slippage_Cost']
+        state = update_backtest_state(state, new_results['Date'], daily_pnl, new_results['Total_Position_Size'], self.cumulative_net_pnl)
+        append = state['num_days'] > len(new_results) and os.path.exists(self.output_file_path)
+        new_results.to_csv(self.output_file_path, mode='a' if append else 'w', header=not append, index=False)
+        save_backtest_state(state_path, state)
+        print(f"Appended {len(new_results)} sessions to {self.output_file_path}")
+        return state
 
     def save_results(self):
         portfolio_values_df = pd.DataFrame(self.portfolio_values)
         portfolio_values_df.to_csv(self.output_file_path, index=False)
+        # A full run replaces the results file, so its checkpoint must be rebuilt too or --incremental would resume from the old run
+        write_backtest_state(self.output_file_path, portfolio_values_df)
         print(f"Portfolio backtest results saved to {self.output_file_path}")
 
 # Usage Example: 
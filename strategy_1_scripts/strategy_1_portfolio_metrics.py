@@ -1,6 +1,10 @@
 import pandas as pd
 import os
 from utils import (
+    read_table,
+    backtest_state_path,
+    load_backtest_state,
+    metrics_from_state,
     calculate_information_ratio,
     calculate_sharpe_ratio,
     calculate_drawdown,
@@ -16,8 +20,7 @@ class PortfolioMetrics:
         self.metrics = {}
 
     def load_data(self):
-        self.df = pd.read_csv(self.backtest_results_path)
-        self.df['Date'] = pd.to_datetime(self.df['Date'])
+        self.df = read_table(self.backtest_results_path, 'backtest_results')
         self.df = self.df.sort_values(by='Date').reset_index(drop=True)
         self.df['Daily_PnL'] = (
             self.df['RGL'] - self.df['Transaction_Costs'] -
@@ -39,6 +42,14 @@ class PortfolioMetrics:
         self.metrics["Margin"] = calculate_margin(daily_pnl_sum, total_position_size_sum)
         self.metrics["Turnover"] = calculate_turnover(avg_position_size, total_position_size_sum)
 
+    def calculate_incremental_metrics(self):
+        """Metrics from the running state saved by BacktestEngine.run_incremental, without re-reading the results file."""
+        state = load_backtest_state(backtest_state_path(self.backtest_results_path))
+        if state is None:
+            print(f"No saved backtest state for {self.backtest_results_path}")
+            return
+        self.metrics = metrics_from_state(state)
+
     def save_metrics(self):
         metrics_df = pd.DataFrame([self.metrics])
         metrics_df.to_csv(self.output_metrics_path, index=False)
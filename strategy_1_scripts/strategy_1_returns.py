@@ -1,6 +1,7 @@
 import os
 import pandas as pd
-from utils import load_and_filter_dataframes, save_dataframe
+from profiler import profiled, record_rows
+from utils import apply_schema, load_and_filter_dataframes, save_dataframe
 
 class DataAggregator:
     def __init__(self, historical_data_folder, output_file_path):
@@ -10,11 +11,13 @@ class DataAggregator:
         output_dir = os.path.dirname(self.output_file_path)
         os.makedirs(output_dir, exist_ok=True)
 
+    @profiled()
     def aggregate_columns_for_selected_rows(self):
         all_data = load_and_filter_dataframes(self.historical_data_folder, self.required_columns)
         if all_data:
-            aggregated_df = pd.concat(all_data, ignore_index=True)
+            aggregated_df = apply_schema(pd.concat(all_data, ignore_index=True), 'returns')
             save_dataframe(aggregated_df, self.output_file_path)
+            record_rows(rows_out=len(aggregated_df))
         else:
             print("No data to aggregate.")
 
@@ -1,4 +1,6 @@
 import pandas as pd
+from profiler import record_rows
+from utils import read_table
 import os
 
 class TradeLogCreator:
@@ -8,10 +10,11 @@ class TradeLogCreator:
         self.exclude_indices = exclude_indices
 
     def create_trade_log(self):
-        df = pd.read_csv(self.input_file_path)
+        df = read_table(self.input_file_path, 'returns')
         df_filtered = df[~df['Index_Name'].isin(self.exclude_indices)]
         trade_log = df_filtered[(df_filtered['strategy_1_n'] == 1) & (df_filtered['Event_Type'] == "Corporate Action")]
         trade_log.to_csv(self.output_file_path, index=False)
+        record_rows(len(df), len(trade_log))
         print(f"Trade log created and saved to {self.output_file_path}")
 
 # Usage Example:
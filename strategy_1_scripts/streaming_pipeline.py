@@ -0,0 +1,68 @@
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from price_data_updater import PriceDataUpdater
+from historical_data_processor import HistoricalDataProcessor
+
+_worker = {}
+
+def init_event_worker(historical_data_folder, press_release_file_path, log_file_path):
+    _worker['updater'] = PriceDataUpdater(historical_data_folder, press_release_file_path, log_file_path)
+    _worker['processor'] = HistoricalDataProcessor(historical_data_folder)
+
+def process_event(file_name):
+    log_entry = _worker['updater'].update_file(file_name)
+    if log_entry is None:
+        _worker['processor'].process_file(file_name)
+    return file_name, log_entry
+
+class StreamingPipeline:
+    def __init__(self, downloader, historical_data_folder, press_release_file_path, log_file_path, queue_size=32, max_workers=None):
+        self.downloader = downloader
+        self.historical_data_folder = historical_data_folder
+        self.press_release_file_path = press_release_file_path
+        self.log_file_path = log_file_path
+        self.queue_size = queue_size
+        self.max_workers = max_workers
+
+    def produce(self, events):
+        try:
+            for file_path in self.downloader.iter_downloads():
+                events.put(file_path)
+        finally:
+            events.put(None)
+
+    def run(self):
+        """Downloads events on a background thread while worker processes update and process each file as it lands."""
+        events = queue.Queue(maxsize=self.queue_size)
+        producer = threading.Thread(target=self.produce, args=(events,), daemon=True)
+        producer.start()
+        initargs = (self.historical_data_folder, self.press_release_file_path, self.log_file_path)
+        log_entries = []
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_event_worker, initargs=initargs) as executor:
+            pending = set()
+            while True:
+                file_path = events.get()
+                if file_path is None:
+                    break
+                if len(pending) >= self.queue_size:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    log_entries.extend(future.result()[1] for future in done)
+                pending.add(executor.submit(process_event, os.path.basename(file_path)))
+            log_entries.extend(future.result()[1] for future in pending)
+        producer.join()
+        with open(self.log_file_path, 'w') as log_file:
+            log_file.writelines(entry for entry in log_entries if entry)
+        print(f"Streamed {len(log_entries)} events. Log of unmatched files saved to {self.log_file_path}")
+        HistoricalDataProcessor(self.historical_data_folder).refresh_indicators()
+
+# Usage Example
+if __name__ == "__main__":
+    from ticker_data_downloader import TickerDataDownloader
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    historical_data_folder = os.path.join(base_dir, "price_data")
+    press_release_file_path = os.path.join(base_dir, "press_release_data.csv")
+    log_file_path = os.path.join(base_dir, "no_match_log.txt")
+    pipeline = StreamingPipeline(TickerDataDownloader(press_release_file_path), historical_data_folder, press_release_file_path, log_file_path)
+    pipeline.run()
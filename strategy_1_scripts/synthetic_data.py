@@ -0,0 +1,125 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils import (
+    GICS_SECTORS,
+    SYNTHETIC_INDEX_WEIGHTS,
+    SYNTHETIC_ETF_BETAS,
+    synthetic_ohlcv,
+    synthetic_sofr,
+    synthetic_event_frame,
+)
+from trading_calendar import get_trading_calendar
+
+class SyntheticEventUniverse:
+    """Deterministic synthetic inputs for steps 5-12: ETF and per-event price files, press releases and SOFR.
+
+    Event prices load on a common market factor (so Beta and the ETF leg are meaningful), drift between announcement
+    and effective date and partly revert afterwards, with volume spikes on both dates. Output layout matches main.py:
+    price_data/, press_release_data.csv and Overnight_Costs/Cleaned_SOFR.csv under output_dir.
+    """
+    def __init__(self, output_dir, n_events=1000, seed=0, start_date="2020-01-01", end_date="2024-10-25",
+                 window_sessions=21, n_tickers=None, chunk_size=5000):
+        self.output_dir = output_dir
+        self.n_events = n_events
+        self.seed = seed
+        self.start_date = start_date
+        self.end_date = end_date
+        self.window_sessions = window_sessions
+        self.n_tickers = n_tickers or n_events
+        self.chunk_size = chunk_size
+        self.calendar = get_trading_calendar()
+        self.price_data_folder = os.path.join(output_dir, "price_data")
+        self.press_release_file_path = os.path.join(output_dir, "press_release_data.csv")
+        self.sofr_file_path = os.path.join(output_dir, "Overnight_Costs", "Cleaned_SOFR.csv")
+
+    def generate(self):
+        start_time = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        os.makedirs(self.price_data_folder, exist_ok=True)
+        os.makedirs(os.path.dirname(self.sofr_file_path), exist_ok=True)
+        first = self.calendar.session_index([self.start_date], roll="forward")[0]
+        last = self.calendar.session_index([self.end_date], roll="backward")[0]
+        self.sessions = self.calendar.session_date(np.arange(first, last + 1))
+        self.session_labels = pd.DatetimeIndex(self.sessions).strftime('%Y-%m-%d').to_numpy()
+        self.market_returns = rng.normal(0.0003, 0.011, len(self.sessions))
+        self.write_etf_files(rng)
+        events = self.sample_events(rng)
+        rows = 0
+        for chunk_start in range(0, len(events), self.chunk_size):
+            rows += self.write_event_files(rng, events.iloc[chunk_start:chunk_start + self.chunk_size])
+        press_releases = events[['Announced', 'Effective_Date', 'Index_Name', 'Action', 'Ticker', 'GICS_Sector', 'Event_Type', 'N_days']]
+        press_releases.to_csv(self.press_release_file_path, index=False)
+        sofr_dates = pd.bdate_range(self.sessions[0] - np.timedelta64(30, 'D'), self.sessions[-1] + np.timedelta64(30, 'D'))
+        synthetic_sofr(rng, sofr_dates).to_csv(self.sofr_file_path, index=False)
+        summary = {"events": len(events), "price_rows": rows, "seconds": time.perf_counter() - start_time}
+        print(f"Generated {summary['events']} synthetic events ({rows} price rows) in {self.output_dir} in {summary['seconds']:.1f}s")
+        return summary
+
+    def write_etf_files(self, rng):
+        n_sessions = len(self.sessions)
+        betas = np.array(list(SYNTHETIC_ETF_BETAS.values()))
+        returns = betas[:, None] * self.market_returns + rng.normal(0.0, 0.002, (len(betas), n_sessions))
+        open_, high, low, close, volume = synthetic_ohlcv(rng, returns, np.array([300.0, 250.0, 90.0]), np.array([7e7, 1.5e6, 4e6]))
+        for row, ticker in enumerate(SYNTHETIC_ETF_BETAS):
+            etf = synthetic_event_frame(self.session_labels, open_[row], high[row], low[row], close[row], volume[row])
+            etf['Capital Gains'] = 0.0
+            etf.to_csv(os.path.join(self.price_data_folder, f"{ticker}_Price_Data.csv"), index=False)
+
+    def sample_events(self, rng):
+        n_sessions = len(self.sessions)
+        lag = rng.integers(3, 11, self.n_events)
+        effective = rng.integers(self.window_sessions + 11, n_sessions - self.window_sessions - 1, self.n_events)
+        tickers = rng.integers(0, self.n_tickers, self.n_events) if self.n_tickers < self.n_events else np.arange(self.n_events)
+        events = pd.DataFrame({
+            'Ticker': [f"SYN{ticker}" for ticker in tickers],
+            'Announced_Position': effective - lag,
+            'Effective_Position': effective,
+            'Index_Name': rng.choice(list(SYNTHETIC_INDEX_WEIGHTS), self.n_events, p=list(SYNTHETIC_INDEX_WEIGHTS.values())),
+            'GICS_Sector': rng.choice(GICS_SECTORS, self.n_events),
+            'Event_Type': rng.choice(['Index Review', 'Corporate Action'], self.n_events, p=[0.7, 0.3]),
+        })
+        events = events.drop_duplicates(['Ticker', 'Announced_Position', 'Effective_Position']).reset_index(drop=True)
+        events['Announced'] = self.session_labels[events['Announced_Position']]
+        events['Effective_Date'] = self.session_labels[events['Effective_Position']]
+        events['Action'] = 'Addition'
+        events['N_days'] = self.calendar.count_sessions(events['Announced'], events['Effective_Date'])
+        return events
+
+    def write_event_files(self, rng, events):
+        n_events = len(events)
+        window = self.window_sessions
+        starts = events['Announced_Position'].to_numpy() - window
+        lengths = events['Effective_Position'].to_numpy() + window + 1 - starts
+        max_length = lengths.max()
+        positions = np.minimum(starts[:, None] + np.arange(max_length), len(self.sessions) - 1)
+        offsets = np.arange(max_length)[None, :]
+        effective_offsets = (events['Effective_Position'].to_numpy() - starts)[:, None]
+        announced = offsets == window
+        effective = offsets == effective_offsets
+        run_up = (offsets > window) & (offsets <= effective_offsets)
+        reversal = offsets > effective_offsets
+
+        betas = rng.normal(1.0, 0.3, n_events)
+        volatility = rng.uniform(0.012, 0.035, n_events)
+        inclusion_return = rng.normal(0.05, 0.04, n_events)
+        returns = betas[:, None] * self.market_returns[positions] + rng.normal(0.0, 1.0, positions.shape) * volatility[:, None]
+        returns += run_up * (inclusion_return / (lengths - 2 * window - 1))[:, None]
+        returns -= reversal * (0.4 * inclusion_return / window)[:, None]
+        volume_spikes = 1 + 1.0 * announced + 6.0 * effective
+        open_, high, low, close, volume = synthetic_ohlcv(rng, returns, rng.lognormal(3.5, 0.6, n_events),
+                                                          rng.lognormal(13.0, 0.8, n_events), volume_spikes)
+        for row, event in enumerate(events.itertuples(index=False)):
+            length = lengths[row]
+            file_name = f"{event.Ticker}_{event.Announced.replace('-', '')}_{event.Effective_Date.replace('-', '')}_Price_Data.csv"
+            frame = synthetic_event_frame(self.session_labels[positions[row, :length]], open_[row, :length], high[row, :length],
+                                          low[row, :length], close[row, :length], volume[row, :length])
+            frame.to_csv(os.path.join(self.price_data_folder, file_name), index=False)
+        return int(lengths.sum())
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    universe = SyntheticEventUniverse(os.path.join(base_dir, "synthetic", "events_1000"), n_events=1000)
+    universe.generate()
@@ -1,16 +1,19 @@
 import pandas as pd
+import numpy as np
 import os
 import logging
-from datetime import timedelta
 from tqdm import tqdm
-from utils import fetch_ticker_data, save_to_csv
+from utils import fetch_ticker_data, save_to_csv, to_datetime64_days, read_table
+from trading_calendar import get_trading_calendar
 
 class TickerDataDownloader:
-    def __init__(self, cleaned_data_filename):
+    def __init__(self, cleaned_data_filename, window_sessions=21):
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.cleaned_data_path = os.path.join(script_dir, cleaned_data_filename)
         self.output_dir = os.path.join(script_dir, 'price_data')
         self.log_file = os.path.join(self.output_dir, 'download_log.txt')
+        self.window_sessions = window_sessions
+        self.calendar = get_trading_calendar()
         os.makedirs(self.output_dir, exist_ok=True)
         if not os.path.exists(self.log_file):
             open(self.log_file, 'a').close()
@@ -22,20 +25,31 @@ class TickerDataDownloader:
         )
     
     def get_addition_tickers(self):
-        cleaned_data = pd.read_csv(self.cleaned_data_path)
+        cleaned_data = read_table(self.cleaned_data_path, 'press_release')
         return cleaned_data[cleaned_data['Action'] == 'Addition']
 
+    def get_download_windows(self, addition_rows):
+        announced_dates = to_datetime64_days(addition_rows['Announced'])
+        effective_dates = to_datetime64_days(addition_rows['Effective_Date'])
+        start_dates = self.calendar.offset(announced_dates, -self.window_sessions, roll='backward')
+        last_dates = self.calendar.offset(effective_dates, self.window_sessions, roll='forward')
+        end_dates = np.minimum(np.datetime64('today', 'D') - 1, last_dates + 1)
+        return announced_dates, effective_dates, start_dates, end_dates
+
     def download_all_ticker_data(self):
+        for _ in self.iter_downloads():
+            pass
+
+    def iter_downloads(self):
         addition_rows = self.get_addition_tickers()
-        for _, row in tqdm(addition_rows.iterrows(), total=addition_rows.shape[0], desc="Downloading Ticker Data"):
-            ticker = row['Ticker']
-            announced_date = pd.to_datetime(row['Announced']).strftime('%Y-%m-%d')
-            effective_date = pd.to_datetime(row['Effective_Date']).strftime('%Y-%m-%d')
-            start_date = (pd.to_datetime(announced_date) - pd.DateOffset(months=1)).strftime('%Y-%m-%d')
-            end_date = min(pd.to_datetime('today') - timedelta(days=1), pd.to_datetime(effective_date) + pd.DateOffset(months=1)).strftime('%Y-%m-%d')
-            ticker_data = fetch_ticker_data(ticker, start_date, end_date)
+        windows = zip(addition_rows['Ticker'], *self.get_download_windows(addition_rows))
+        for ticker, announced_date, effective_date, start_date, end_date in tqdm(windows, total=addition_rows.shape[0], desc="Downloading Ticker Data"):
+            if np.isnat(announced_date) or np.isnat(effective_date):
+                logging.warning(f"Missing announcement or effective date for {ticker}.")
+                continue
+            ticker_data = fetch_ticker_data(ticker, str(start_date), str(end_date))
             if ticker_data is not None:
-                save_to_csv(self.output_dir, ticker, announced_date, effective_date, ticker_data)
+                yield save_to_csv(self.output_dir, ticker, str(announced_date), str(effective_date), ticker_data)
             else:
                 logging.warning(f"Data for {ticker} could not be fetched.")
 
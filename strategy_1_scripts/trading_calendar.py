@@ -0,0 +1,56 @@
+import numpy as np
+from functools import lru_cache
+from utils import nyse_holidays, build_session_array, to_datetime64_days
+
+CALENDAR_START = "1990-01-01"
+CALENDAR_END = "2035-12-31"
+
+class TradingCalendar:
+    def __init__(self, start_date=CALENDAR_START, end_date=CALENDAR_END):
+        self.start_date = np.datetime64(start_date, 'D')
+        self.end_date = np.datetime64(end_date, 'D')
+        self.holidays = nyse_holidays(self.start_date.astype(object).year, self.end_date.astype(object).year)
+        self.busdaycal = np.busdaycalendar(holidays=self.holidays)
+        self.sessions = build_session_array(self.start_date, self.end_date, self.busdaycal)
+
+    def is_session(self, dates):
+        days = to_datetime64_days(dates)
+        valid = ~np.isnat(days)
+        result = np.zeros(len(days), dtype=bool)
+        result[valid] = np.is_busday(days[valid], busdaycal=self.busdaycal)
+        return result
+
+    def session_index(self, dates, roll="forward"):
+        """Maps dates to integer session indices; non-session dates roll to the next (or previous) session and NaT maps to -1."""
+        days = to_datetime64_days(dates)
+        side = 'left' if roll == "forward" else 'right'
+        indices = np.searchsorted(self.sessions, days, side=side)
+        if roll != "forward":
+            indices -= 1
+        indices[np.isnat(days)] = -1
+        return indices.astype(np.int32)
+
+    def session_date(self, indices):
+        return self.sessions[np.asarray(indices)]
+
+    def count_sessions(self, start_dates, end_dates):
+        """Sessions from start to end inclusive, NaN where either date is missing."""
+        start_index = self.session_index(start_dates, roll="forward")
+        end_index = self.session_index(end_dates, roll="backward")
+        counts = (end_index - start_index + 1).astype(float)
+        counts[(start_index < 0) | (end_index < 0)] = np.nan
+        return counts
+
+    def offset(self, dates, n_sessions, roll="forward"):
+        return np.busday_offset(to_datetime64_days(dates), n_sessions, roll=roll, busdaycal=self.busdaycal)
+
+@lru_cache(maxsize=None)
+def get_trading_calendar(start_date=CALENDAR_START, end_date=CALENDAR_END):
+    return TradingCalendar(start_date, end_date)
+
+# Usage Example:
+if __name__ == "__main__":
+    calendar = get_trading_calendar()
+    print(f"{len(calendar.sessions)} NYSE sessions between {calendar.start_date} and {calendar.end_date}")
+    print(calendar.session_index(["2024-07-03", "2024-07-04", "2024-07-05"]))
+    print(calendar.count_sessions(["2024-11-22"], ["2024-12-02"]))
@@ -3,11 +3,166 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import yfinance as yf
 import os
+import ast
+import json
+import subprocess
+import hashlib
 import logging
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.backends.backend_pdf import PdfPages
 import numpy as np
+from functools import lru_cache
+from kernels import expanding_mean
+
+# Class: trading_calendar
+
+NYSE_SPECIAL_CLOSURES = [
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11", "2007-01-02", "2012-10-29", "2012-10-30",
+    "2018-12-05", "2025-01-09",
+]
+
+def easter_sunday(years):
+    years = np.asarray(years)
+    a = years % 19
+    b = years // 100
+    c = years % 100
+    d = (19 * a + b - b // 4 - (b - (b + 8) // 25 + 1) // 3 + 15) % 30
+    e = (32 + 2 * (b % 4) + 2 * (c // 4) - d - (c % 4)) % 7
+    f = d + e - 7 * ((a + 11 * d + 22 * e) // 451) + 114
+    months = f // 31
+    days = f % 31 + 1
+    return np.array([f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in zip(years, months, days)], dtype='datetime64[D]')
+
+def observe_weekend_holidays(dates):
+    weekday = (dates.astype('datetime64[D]').view('int64') - 4) % 7
+    observed = dates.copy()
+    observed[weekday == 5] -= np.timedelta64(1, 'D')
+    observed[weekday == 6] += np.timedelta64(1, 'D')
+    return observed
+
+def nyse_holidays(start_year, end_year):
+    years = np.arange(start_year, end_year + 1)
+    months = lambda month: np.array([f"{y:04d}-{month}" for y in years], dtype='datetime64[M]').astype('datetime64[D]')
+    fixed_date = lambda month_day: np.array([f"{y:04d}-{month_day}" for y in years], dtype='datetime64[D]')
+    new_years = fixed_date("01-01")
+    new_years = new_years[(new_years.view('int64') - 4) % 7 != 5]
+    holidays = [
+        observe_weekend_holidays(new_years),
+        np.busday_offset(months("01"), 2, roll='forward', weekmask='Mon')[years >= 1998],
+        np.busday_offset(months("02"), 2, roll='forward', weekmask='Mon'),
+        easter_sunday(years) - np.timedelta64(2, 'D'),
+        np.busday_offset(months("06"), -1, roll='forward', weekmask='Mon'),
+        observe_weekend_holidays(fixed_date("06-19"))[years >= 2022],
+        observe_weekend_holidays(fixed_date("07-04")),
+        np.busday_offset(months("09"), 0, roll='forward', weekmask='Mon'),
+        np.busday_offset(months("11"), 3, roll='forward', weekmask='Thu'),
+        observe_weekend_holidays(fixed_date("12-25")),
+        np.array(NYSE_SPECIAL_CLOSURES, dtype='datetime64[D]'),
+    ]
+    return np.unique(np.concatenate(holidays))
+
+def build_session_array(start_date, end_date, busdaycal):
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    return days[np.is_busday(days, busdaycal=busdaycal)]
+
+@lru_cache(maxsize=None)
+def parse_date_value(text):
+    if len(text) >= 10 and text[4] == '-' and text[7] == '-':
+        return np.datetime64(text[:10], 'ns')
+    parsed = pd.to_datetime(text, errors='coerce')
+    if pd.isna(parsed):
+        return np.datetime64('NaT', 'ns')
+    if parsed.tzinfo is not None:
+        parsed = parsed.tz_localize(None)
+    return parsed.normalize().to_datetime64()
+
+def normalize_dates(values):
+    values = values if isinstance(values, pd.Series) else pd.Series(np.atleast_1d(values))
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if values.dt.tz is not None:
+            values = values.dt.tz_localize(None)
+        return values.dt.normalize().astype('datetime64[ns]')
+    codes, uniques = pd.factorize(values)
+    parsed = np.array([parse_date_value(str(value)) for value in uniques] + [np.datetime64('NaT', 'ns')], dtype='datetime64[ns]')
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+def to_datetime64_days(dates):
+    return normalize_dates(dates).to_numpy(dtype='datetime64[D]')
+
+# Schema registry
+
+EVENT_PRICE_SCHEMA = {
+    'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Close': 'float64', 'Volume': 'float64',
+    'Dividends': 'float32', 'Stock Splits': 'float32',
+    'Ticker': 'category', 'Index_Name': 'category', 'GICS_Sector': 'category', 'Event_Type': 'category', 'Event_ID': 'category',
+    'Session': 'int32', 'Announced_Session': 'int32', 'Effective_Session': 'int32',
+    'ADV20': 'float64', 'Return': 'float32', 'Volatility': 'float32', 'ATR': 'float64', 'Beta': 'float32',
+    'Previous_Close': 'float64', 'Previous_Close_7D': 'float64',
+    'strategy_1_n': 'Int16', 'strategy_1': 'float32', 'strategy_1_md': 'float32',
+}
+
+STATS_SCHEMA = {
+    'strategy_1_n': 'Int16', 'Index_Name': 'category', 'Event_Type': 'category', 'GICS_Sector': 'category',
+    'count': 'Int32', 'Net_count': 'Int32',
+}
+
+TABLE_SCHEMAS = {
+    'price_data': EVENT_PRICE_SCHEMA,
+    'returns': EVENT_PRICE_SCHEMA,
+    'trade_log': EVENT_PRICE_SCHEMA,
+    'etf_prices': {'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Close': 'float64', 'Volume': 'float64',
+                   'Dividends': 'float32', 'Stock Splits': 'float32', 'Capital Gains': 'float32'},
+    'press_release': {column: 'category' for column in ['Ticker', 'Index_Name', 'GICS_Sector', 'Event_Type', 'Action']},
+    'stats': STATS_SCHEMA,
+    'backtest_results': {},
+    'metrics': {},
+    'sofr': {'SOFR': 'float64'},
+}
+
+DATE_COLUMNS = {'price_data': 'Date', 'returns': 'Date', 'trade_log': 'Date', 'etf_prices': 'Date',
+                'backtest_results': 'Date', 'sofr': 'DATE'}
+
+def apply_schema(df, table):
+    schema = TABLE_SCHEMAS[table]
+    for column, dtype in schema.items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def parse_dtypes(table):
+    """read_csv dtypes for a table; nullable integers are parsed as float64, which the C parser reads several times faster, and cast after."""
+    return {column: 'float64' if dtype.startswith('Int') else dtype for column, dtype in TABLE_SCHEMAS[table].items()}
+
+def cast_nullable_integers(df, table):
+    for column, dtype in TABLE_SCHEMAS[table].items():
+        if dtype.startswith('Int') and column in df.columns and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def table_usecols(table, columns):
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda column: column in wanted
+
+def normalize_table(df, table):
+    df = cast_nullable_integers(df, table)
+    date_column = DATE_COLUMNS.get(table)
+    if date_column in df.columns:
+        df[date_column] = normalize_dates(df[date_column])
+    return df
+
+def read_table(file_path, table, columns=None, **kwargs):
+    df = pd.read_csv(file_path, dtype=parse_dtypes(table), usecols=table_usecols(table, columns), **kwargs)
+    return normalize_table(df, table)
+
+def iter_table(file_path, table, columns=None, chunksize=100000):
+    """Yields read_table results chunksize rows at a time, so tables larger than memory can be streamed."""
+    with pd.read_csv(file_path, dtype=parse_dtypes(table), usecols=table_usecols(table, columns), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield normalize_table(chunk, table)
 
 # Class: sp_global_scraper
 
@@ -83,10 +238,12 @@ def fetch_ticker_data(ticker, start_date, end_date):
         return None
 
 def save_to_csv(output_dir, ticker, announced_date, effective_date, data):
+    data['Date'] = normalize_dates(data['Date'])
     filename = f"{ticker}_{announced_date.replace('-', '')}_{effective_date.replace('-', '')}_Price_Data.csv"
     output_path = os.path.join(output_dir, filename)
     data.to_csv(output_path, index=False)
     print(f"Data for {ticker} saved to {output_path}")
+    return output_path
 
 
 # Class: index_data_downloader
@@ -100,18 +257,70 @@ def fetch_index_data(ticker, start_date, end_date):
         return None
 
 def save_index_data_to_csv(output_dir, ticker, data):
+    data.index = pd.DatetimeIndex(normalize_dates(data.index.to_series()), name='Date')
     filename = f"{ticker}_Price_Data.csv"
     output_path = os.path.join(output_dir, filename)
     data.to_csv(output_path)
     print(f"Data for {ticker} saved to {output_path}")
 
+# Class: benchmark_series
+
+def build_benchmark_series(etf_data, calendar):
+    sessions = calendar.session_index(etf_data['Date'])
+    valid = sessions >= 0
+    first_session = int(sessions[valid].min())
+    positions = sessions[valid] - first_session
+    series = {'first_session': first_session}
+    for field in ['Open', 'Close', 'Volume']:
+        values = np.full(positions.max() + 1, np.nan)
+        values[positions] = etf_data[field].to_numpy(dtype='float64')[valid]
+        series[field] = values
+    previous_close = np.concatenate([[np.nan], series['Close'][:-1]])
+    series['open_to_close'] = series['Close'] / series['Open'] - 1
+    series['close_to_close'] = series['Close'] / previous_close - 1
+    observed = ~np.isnan(series['close_to_close'])
+    series['cumulative_return'] = np.cumsum(np.where(observed, series['close_to_close'], 0.0))
+    series['cumulative_count'] = np.cumsum(observed)
+    return series
+
+def benchmark_positions(series, sessions):
+    positions = np.asarray(sessions, dtype=np.int64) - series['first_session']
+    inside = (positions >= 0) & (positions < len(series['Close']))
+    return np.where(inside, positions, 0), inside
+
+def take_benchmark_values(series, field, sessions):
+    positions, inside = benchmark_positions(series, sessions)
+    return np.where(inside, series[field][positions], np.nan)
+
+def benchmark_daily_returns(series, sessions, start_session):
+    sessions = np.asarray(sessions)
+    daily = take_benchmark_values(series, 'close_to_close', sessions)
+    first = sessions == start_session
+    daily[first] = take_benchmark_values(series, 'open_to_close', sessions[first])
+    return daily
+
+def benchmark_expanding_mean(series, sessions, start_session):
+    sessions = np.asarray(sessions)
+    positions, inside = benchmark_positions(series, sessions)
+    start_positions, start_inside = benchmark_positions(series, [start_session])
+    if not start_inside[0]:
+        return np.full(len(sessions), np.nan)
+    start = start_positions[0]
+    first_return = series['open_to_close'][start]
+    has_first = not np.isnan(first_return)
+    cumulative = series['cumulative_return'][positions] - series['cumulative_return'][start]
+    counts = series['cumulative_count'][positions] - series['cumulative_count'][start] + has_first
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (cumulative + (first_return if has_first else 0.0)) / counts
+    return np.where(inside & (sessions >= start_session), mean, np.nan)
+
 # Class: price_data_updater
 
 def load_press_release_data(press_release_file_path):
-    press_release_data = pd.read_csv(press_release_file_path)
+    press_release_data = read_table(press_release_file_path, 'press_release')
     addition_data = press_release_data[press_release_data['Action'] == "Addition"].copy()
-    addition_data['Announced_date'] = pd.to_datetime(addition_data['Announced'], format='%m/%d/%Y').dt.date
-    addition_data['Effective_date'] = pd.to_datetime(addition_data['Effective_Date'], format='%m/%d/%Y').dt.date
+    addition_data['Announced_date'] = normalize_dates(addition_data['Announced'])
+    addition_data['Effective_date'] = normalize_dates(addition_data['Effective_Date'])
     return addition_data
 
 def parse_filename(file_name):
@@ -122,65 +331,147 @@ def parse_filename(file_name):
         return None
     try:
         ticker = parts[0]
-        announced_date = pd.to_datetime(parts[1], format='%Y%m%d').date()
-        effective_date = pd.to_datetime(parts[2], format='%Y%m%d').date()
+        announced_date = pd.to_datetime(parts[1], format='%Y%m%d')
+        effective_date = pd.to_datetime(parts[2], format='%Y%m%d')
         return ticker, announced_date, effective_date
     except (IndexError, ValueError) as e:
         print(f"Error parsing dates in filename {file_name}: {e}")
         return None
 
-def update_price_data_file(file_path, match_row, ticker):
+def update_price_data_file(file_path, match_row, ticker, calendar):
     index_name = match_row.iloc[0]['Index_Name']
     gics_sector = match_row.iloc[0]['GICS_Sector']
     event_type = match_row.iloc[0]['Event_Type']
-    price_data = pd.read_csv(file_path)
+    announced_session = calendar.session_index([match_row.iloc[0]['Announced_date']], roll="backward")[0]
+    effective_session = calendar.session_index([match_row.iloc[0]['Effective_date']], roll="forward")[0]
+    price_data = read_table(file_path, 'price_data')
     price_data['Ticker'] = ticker
     price_data['Index_Name'] = index_name
     price_data['GICS_Sector'] = gics_sector
     price_data['Event_Type'] = event_type
+    price_data['Event_ID'] = os.path.basename(file_path).replace("_Price_Data.csv", "")
+    price_data['Session'] = calendar.session_index(price_data['Date'])
+    price_data['Announced_Session'] = announced_session
+    price_data['Effective_Session'] = effective_session
     price_data.to_csv(file_path, index=False)
 
-# Class: historical_data_processor
+# Class: indicator_engine
 
-def calculate_adv20(df):
-    df['ADV20'] = df['Volume'].rolling(window=20, min_periods=1).mean()
-    return df
+INDICATOR_INPUT_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+INDICATOR_COLUMNS = ['ADV20', 'Return', 'Volatility', 'ATR', 'Beta']
 
-def calculate_returns(df):
-    df['Return'] = df['Close'].pct_change()
-    if not df.empty:
-        df.loc[0, 'Return'] = (df.loc[0, 'Close'] - df.loc[0, 'Open']) / df.loc[0, 'Open']
-    return df
+def price_file_ticker(file_name):
+    return file_name.replace("_Price_Data.csv", "").split('_')[0]
 
-def calculate_volatility(df):
-    df['Volatility'] = df['Return'].rolling(window=20, min_periods=1).std()
-    return df
+def stack_price_history(frames, calendar):
+    """Stacks per-file price frames into one (Ticker, Session)-sorted history, keeping one row per ticker and session."""
+    history = pd.concat(frames, ignore_index=True)
+    history = history[calendar.is_session(history['Date'])].copy()
+    history['Session'] = calendar.session_index(history['Date'])
+    history = history.drop_duplicates(subset=['Ticker', 'Session'], keep='last')
+    return history.sort_values(['Ticker', 'Session'], kind='mergesort').reset_index(drop=True)
+
+def segment_starts(tickers, sessions):
+    """Marks rows that start a new run of consecutive sessions for a ticker, so rolling windows never span a gap."""
+    tickers = np.asarray(tickers)
+    sessions = np.asarray(sessions)
+    starts = np.ones(len(sessions), dtype=bool)
+    starts[1:] = (tickers[1:] != tickers[:-1]) | (np.diff(sessions) != 1)
+    return starts
+
+def grouped_shift(values, starts):
+    shifted = np.concatenate([[np.nan], values[:-1]])
+    return np.where(starts, np.nan, shifted)
+
+def grouped_rolling_window(values, starts, window):
+    """Sum and count of the valid values among the last `window` rows of each segment."""
+    index = np.arange(len(values))
+    valid = ~np.isnan(values)
+    cumulative = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    segment_start = np.maximum.accumulate(np.where(starts, index, 0))
+    lower = np.maximum(index + 1 - window, segment_start)
+    return cumulative[index + 1] - cumulative[lower], counts[index + 1] - counts[lower]
+
+def grouped_rolling_sum(values, starts, window, min_periods=None):
+    """Rolling sum over the last `window` rows of each segment; NaN until the window holds `min_periods` (default `window`) valid values."""
+    total, count = grouped_rolling_window(values, starts, window)
+    return np.where(count >= (min_periods or window), total, np.nan)
+
+def grouped_rolling_mean(values, starts, window, min_periods=None):
+    total, count = grouped_rolling_window(values, starts, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count >= (min_periods or window), total / count, np.nan)
 
-def calculate_strategy_returns(df, file_name):
+def grouped_rolling_std(values, starts, window, min_periods=None):
+    total, count = grouped_rolling_window(values, starts, window)
+    total_sq, _ = grouped_rolling_window(values ** 2, starts, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (total_sq - total ** 2 / count) / (count - 1)
+    return np.where(count >= max(min_periods or window, 2), np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+def grouped_rolling_beta(returns, benchmark_returns, starts, window, min_periods=None):
+    paired = ~np.isnan(returns) & ~np.isnan(benchmark_returns)
+    x = np.where(paired, benchmark_returns, np.nan)
+    y = np.where(paired, returns, np.nan)
+    sum_x, count = grouped_rolling_window(x, starts, window)
+    sum_y, _ = grouped_rolling_window(y, starts, window)
+    sum_xy, _ = grouped_rolling_window(x * y, starts, window)
+    sum_xx, _ = grouped_rolling_window(x ** 2, starts, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = sum_xy - sum_x * sum_y / count
+        variance = sum_xx - sum_x ** 2 / count
+        return np.where((count >= max(min_periods or window, 2)) & (variance > 0), covariance / variance, np.nan)
+
+def compute_indicators(history, adv_window, volatility_window, atr_window, beta_window, benchmark_ticker, min_periods=None):
+    """Computes ADV20, Return, Volatility, ATR and Beta for every ticker in one pass; each needs min(min_periods, window) valid rows after a gap."""
+    warm_up = lambda window: min(min_periods or window, window)
+    starts = segment_starts(history['Ticker'], history['Session'])
+    open_ = history['Open'].to_numpy(dtype='float64')
+    close = history['Close'].to_numpy(dtype='float64')
+    previous_close = grouped_shift(close, starts)
+    indicators = history[['Ticker', 'Session']].copy()
+    indicators['ADV20'] = grouped_rolling_mean(history['Volume'].to_numpy(dtype='float64'), starts, adv_window, warm_up(adv_window))
+    returns = np.where(starts, close / open_ - 1, close / previous_close - 1)
+    indicators['Return'] = returns
+    indicators['Volatility'] = grouped_rolling_std(returns, starts, volatility_window, warm_up(volatility_window))
+    if 'High' in history.columns and 'Low' in history.columns:
+        high = history['High'].to_numpy(dtype='float64')
+        low = history['Low'].to_numpy(dtype='float64')
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+        indicators['ATR'] = grouped_rolling_mean(true_range, starts, atr_window, warm_up(atr_window))
+    else:
+        indicators['ATR'] = np.nan
+    benchmark = indicators[indicators['Ticker'] == benchmark_ticker]
+    benchmark_returns = pd.Series(benchmark['Return'].to_numpy(), index=benchmark['Session'].to_numpy())
+    aligned = benchmark_returns.reindex(indicators['Session'].to_numpy()).to_numpy()
+    indicators['Beta'] = grouped_rolling_beta(returns, aligned, starts, beta_window, warm_up(beta_window))
+    return indicators
+
+# Class: historical_data_processor
+
+def calculate_strategy_returns(df, file_name, calendar):
     dates = parse_filename(file_name)
     if not dates:
         print(f"Error parsing dates for {file_name}")
         return df
     ticker, announced_date, effective_date = dates
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce', utc=True).dt.tz_convert(None)
-    df['Date'] = df['Date'].dt.date
-    df.sort_values(by='Date', inplace=True)
-    period_df = df[(df['Date'] > announced_date) & (df['Date'] <= effective_date)].copy()
+    df['Date'] = normalize_dates(df['Date'])
+    if 'Session' not in df.columns:
+        df['Session'] = calendar.session_index(df['Date'])
+    df.sort_values(by='Session', inplace=True)
+    announced_session = calendar.session_index([announced_date], roll="backward")[0]
+    effective_session = calendar.session_index([effective_date], roll="backward")[0]
+    period_df = df[(df['Session'] > announced_session) & (df['Session'] <= effective_session)].copy()
     if period_df.empty:
         print(f"No data found in date range for {file_name}")
         return df
     start_price = period_df.iloc[0]['Open']
-    period_df['strategy_1_n'] = range(1, len(period_df) + 1)
+    period_df['strategy_1_n'] = period_df['Session'] - announced_session
     period_df['strategy_1'] = period_df['Close'].pct_change().fillna(0)
-    strategy_1_md_values = []
-    for idx, row in period_df.iterrows():
-        days_n = row['strategy_1_n']
-        end_price = row['Close']
-        total_return = (end_price / start_price) - 1
-        arithmetic_return = total_return / days_n
-        strategy_1_md_values.append(arithmetic_return)
-    period_df['strategy_1_md'] = strategy_1_md_values
-    df = df.merge(period_df[['Date', 'strategy_1_n', 'strategy_1', 'strategy_1_md']], on='Date', how='left')
+    period_df['strategy_1_md'] = ((period_df['Close'] / start_price) - 1) / period_df['strategy_1_n']
+    df = df.drop(columns=['strategy_1_n', 'strategy_1', 'strategy_1_md'], errors='ignore')
+    df = df.merge(period_df[['Session', 'strategy_1_n', 'strategy_1', 'strategy_1_md']], on='Session', how='left')
     return df
 
 # Class: strategy_1_returns
@@ -190,7 +481,7 @@ def load_and_filter_dataframes(folder_path, required_columns):
     for file_name in os.listdir(folder_path):
         if file_name.endswith("_Price_Data.csv"):
             file_path = os.path.join(folder_path, file_name)
-            df = pd.read_csv(file_path)
+            df = read_table(file_path, 'price_data')
             if all(column in df.columns for column in required_columns):
                 df = df.dropna(subset=required_columns)
                 all_data.append(df)
@@ -206,7 +497,7 @@ def save_dataframe(df, output_path):
 
 def calculate_group_stats(data):
     stats_summary = []
-    grouped_data = data.groupby(['strategy_1_n', 'Index_Name', 'Event_Type'])
+    grouped_data = data.groupby(['strategy_1_n', 'Index_Name', 'Event_Type'], observed=True)
     for (n_value, index_name, event_type), subset in grouped_data:
         stats = {
             "strategy_1_n": n_value,
@@ -228,7 +519,7 @@ def calculate_group_stats(data):
     return pd.DataFrame(stats_summary)
 
 def save_pdf_plots(data, output_pdf_path):
-    grouped_data = data.groupby(['strategy_1_n', 'Index_Name', 'Event_Type'])
+    grouped_data = data.groupby(['strategy_1_n', 'Index_Name', 'Event_Type'], observed=True)
     with PdfPages(output_pdf_path) as pdf:
         for (n_value, index_name, event_type), subset in grouped_data:
             if subset['strategy_1_md'].count() == 1:
@@ -247,19 +538,524 @@ def save_statistics_summary(stats_df, output_stats_path):
     stats_df.to_csv(output_stats_path, index=False)
     print(f"Summary statistics saved to {output_stats_path}")
 
-# Class: strategy_1_backtest_engine
+# Class: pipeline_dag
+
+def artifact_fingerprint(path):
+    """Size and mtime of a file, or of every file under a directory; None when the artifact does not exist."""
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    if os.path.isdir(path):
+        entries = []
+        for root, _, files in os.walk(path):
+            for file_name in sorted(files):
+                stat = os.stat(os.path.join(root, file_name))
+                entries.append([os.path.relpath(os.path.join(root, file_name), path), stat.st_size, stat.st_mtime_ns])
+        return sorted(entries)
+    return None
+
+def module_closure(module_path):
+    """Paths of a module and of every sibling module it imports, directly or transitively."""
+    folder = os.path.dirname(module_path)
+    closure, pending = set(), [module_path]
+    while pending:
+        path = pending.pop()
+        if path in closure or not os.path.isfile(path):
+            continue
+        closure.add(path)
+        with open(path, 'rb') as source:
+            tree = ast.parse(source.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            pending.extend(os.path.join(folder, f"{name.split('.')[0]}.py") for name in names)
+    return sorted(closure)
+
+def input_fingerprint(path):
+    """Python inputs are fingerprinted with every local module they import, so editing a shared helper invalidates its callers."""
+    if path.endswith(".py"):
+        return [[os.path.basename(module), artifact_fingerprint(module)] for module in module_closure(path)]
+    return artifact_fingerprint(path)
+
+def hash_parts(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+def step_dependencies(steps):
+    """Each input depends on the last step declared before the consumer that produces it, so in-place updates of a shared artifact chain in declaration order."""
+    dependencies = {}
+    for position, step in enumerate(steps):
+        dependencies[step.name] = {}
+        for artifact in step.inputs:
+            producer = next((earlier for earlier in reversed(steps[:position]) if artifact in earlier.outputs), None)
+            if producer is not None:
+                dependencies[step.name][artifact] = producer.name
+    return dependencies
+
+def load_step_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path) as cache_file:
+        return json.load(cache_file)
+
+def save_step_cache(cache_path, cache):
+    with open(cache_path, 'w') as cache_file:
+        json.dump(cache, cache_file, indent=2)
+
+# Class: profiler
+
+PROFILE_REPORT_COLUMNS = ['name', 'thread', 'started_at', 'wall_time', 'cpu_time', 'peak_traced_mb', 'rows_in', 'rows_out',
+                          'files_read', 'bytes_read', 'files_written', 'bytes_written', 'calls', 'profile_path']
+
+def artifact_size(paths):
+    """Number of files and total bytes under a list of file or directory paths; missing paths count as zero."""
+    files, size = 0, 0
+    for path in paths:
+        if os.path.isfile(path):
+            files, size = files + 1, size + os.path.getsize(path)
+        elif os.path.isdir(path):
+            for root, _, file_names in os.walk(path):
+                files += len(file_names)
+                size += sum(os.path.getsize(os.path.join(root, file_name)) for file_name in file_names)
+    return files, size
+
+def profile_file_name(name):
+    return "".join(character if character.isalnum() or character in "-_." else "_" for character in name) + ".prof"
+
+def write_profile_report(records, json_path, csv_path=None):
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w') as report_file:
+        json.dump(records, report_file, indent=2, default=str)
+    print(f"Run report saved to {json_path}")
+    if csv_path:
+        pd.DataFrame(records, columns=PROFILE_REPORT_COLUMNS).to_csv(csv_path, index=False)
+        print(f"Run report saved to {csv_path}")
+
+# Class: group_bootstrap
+
+BOOTSTRAP_CHUNK_ELEMENTS = 2 ** 22
+
+def bootstrap_means(values, n_resamples, rng, chunk_elements=BOOTSTRAP_CHUNK_ELEMENTS):
+    """Means of n_resamples resamples with replacement, drawn as (chunk x n) index matrices to bound memory."""
+    n = len(values)
+    chunk_size = max(1, chunk_elements // n)
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, chunk_size):
+        stop = min(start + chunk_size, n_resamples)
+        indices = rng.integers(0, n, (stop - start, n), dtype=np.int32 if n < 2 ** 31 else np.int64)
+        means[start:stop] = values[indices].mean(axis=1)
+    return means
+
+def bootstrap_summary(values, n_resamples, confidence, rng, prefix=""):
+    """Percentile CI for the mean and a two-sided p-value for mean == 0 from the resampled means recentred on zero."""
+    values = values[~np.isnan(values)].astype('float64')
+    summary = {f"{prefix}mean_ci_low": np.nan, f"{prefix}mean_ci_high": np.nan, f"{prefix}mean_p_value": np.nan}
+    if len(values) < 2:
+        return summary
+    means = bootstrap_means(values, n_resamples, rng)
+    observed = values.mean()
+    tail = (1 - confidence) / 2
+    summary[f"{prefix}mean_ci_low"], summary[f"{prefix}mean_ci_high"] = np.quantile(means, [tail, 1 - tail])
+    summary[f"{prefix}mean_p_value"] = (1 + np.count_nonzero(np.abs(means - observed) >= abs(observed))) / (n_resamples + 1)
+    return summary
 
-def get_sofr_rate(trade_date, sofr_df):
-    valid_sofr_dates = sofr_df[sofr_df['DATE'] <= pd.to_datetime(trade_date)]
-    return valid_sofr_dates.iloc[-1]['SOFR'] if not valid_sofr_dates.empty else None
+# Class: event_study
 
-def calculate_slippage_cost(data, alpha, beta):
-    data['Slippage_Cost'] = (
-        alpha * ((data['Trade_Limit'] / data['ADV20']) ** beta) * data['Open'] * data['Volatility'] +
-        alpha * ((data['Trade_Limit'] / data['ADV20']) ** beta) * data['Close'] * data['Volatility']
-    )
-    data = data.dropna(subset=['ADV20', 'Volatility', 'Slippage_Cost'])
-    return data['Slippage_Cost'].sum()
+EVENT_STUDY_COLUMNS = ['Event_ID', 'Ticker', 'Index_Name', 'Event_Type', 'Date', 'Session', 'Close', 'Announced_Session', 'Effective_Session']
+
+def stack_event_panel(frames):
+    """One (Event_ID, Session)-sorted panel of every event file, with integer event codes and close-to-close returns within each event."""
+    panel = pd.concat(frames, ignore_index=True)
+    panel = panel[panel['Session'] >= 0].drop_duplicates(subset=['Event_ID', 'Session'], keep='last')
+    panel = panel.sort_values(['Event_ID', 'Session'], kind='mergesort').reset_index(drop=True)
+    panel['Event_Code'] = panel.groupby('Event_ID', observed=True, sort=False).ngroup()
+    starts = segment_starts(panel['Event_Code'], panel['Session'])
+    close = panel['Close'].to_numpy(dtype='float64')
+    panel['Stock_Return'] = close / grouped_shift(close, starts) - 1
+    return panel
+
+def market_model_fit(event_codes, market_returns, stock_returns, estimation, n_events, min_observations):
+    """Per-event OLS of stock on market returns over the estimation rows, from bincount sums: alpha, beta, residual sigma and n."""
+    used = estimation & ~np.isnan(market_returns) & ~np.isnan(stock_returns)
+    codes, x, y = event_codes[used], market_returns[used], stock_returns[used]
+    total = lambda weights: np.bincount(codes, weights=weights, minlength=n_events)
+    n = np.bincount(codes, minlength=n_events).astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x, mean_y = total(x) / n, total(y) / n
+        variance = total(x * x) - n * mean_x ** 2
+        beta = (total(x * y) - n * mean_x * mean_y) / variance
+        alpha = mean_y - beta * mean_x
+        residuals = y - alpha[codes] - beta[codes] * x
+        sigma = np.sqrt(total(residuals ** 2) / (n - 2))
+    fitted = (n >= max(min_observations, 3)) & (variance > 0)
+    return np.where(fitted, alpha, np.nan), np.where(fitted, beta, np.nan), np.where(fitted, sigma, np.nan), n
+
+def caar_statistics(abnormal_returns, group_columns):
+    """Average abnormal return and CAAR per group and relative day, with cross-sectional t-statistics."""
+    grouped = abnormal_returns.groupby([*group_columns, 'Anchor', 'Relative_Day'], observed=True)
+    stats = grouped.agg(N_Events=('CAR', 'count'), AAR=('AR', 'mean'), AR_Std=('AR', 'std'), CAAR=('CAR', 'mean'), CAR_Std=('CAR', 'std')).reset_index()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats['AAR_t'] = stats['AAR'] / (stats['AR_Std'] / np.sqrt(stats['N_Events']))
+        stats['CAAR_t'] = stats['CAAR'] / (stats['CAR_Std'] / np.sqrt(stats['N_Events']))
+    return stats
+
+# Class: synthetic_data
+
+GICS_SECTORS = ['Communication Services', 'Consumer Discretionary', 'Consumer Staples', 'Energy', 'Financials', 'Health Care',
+                'Industrials', 'Information Technology', 'Materials', 'Real Estate', 'Utilities']
+SYNTHETIC_INDEX_WEIGHTS = {'S&P 500': 0.25, 'S&P MidCap 400': 0.35, 'S&P SmallCap 600': 0.35, 'DJIA': 0.05}
+SYNTHETIC_ETF_BETAS = {'SPY': 1.0, 'IJH': 1.1, 'IJR': 1.2}
+
+def synthetic_ohlcv(rng, returns, start_prices, base_volumes, volume_spikes=None):
+    """Vectorised OHLCV bars for a (series x sessions) matrix of close-to-close log returns."""
+    close = start_prices[:, None] * np.exp(np.cumsum(returns, axis=1))
+    previous_close = np.concatenate([start_prices[:, None], close[:, :-1]], axis=1)
+    gap = rng.normal(0.0, np.abs(returns) * 0.5 + 0.002)
+    open_ = previous_close * np.exp(gap)
+    range_scale = np.abs(rng.normal(0.0, 0.01, returns.shape))
+    high = np.maximum(open_, close) * (1 + range_scale)
+    low = np.minimum(open_, close) * (1 - range_scale)
+    volume = base_volumes[:, None] * rng.lognormal(0.0, 0.35, returns.shape)
+    if volume_spikes is not None:
+        volume = volume * volume_spikes
+    return open_, high, low, np.round(close, 6), np.round(volume)
+
+def synthetic_sofr(rng, dates, start_rate=0.05, end_rate=5.3):
+    """Smooth random walk in percent between two levels, as in Cleaned_SOFR.csv."""
+    drift = np.linspace(start_rate, end_rate, len(dates))
+    noise = np.cumsum(rng.normal(0.0, 0.01, len(dates)))
+    return pd.DataFrame({'DATE': pd.DatetimeIndex(dates).strftime('%Y-%m-%d'), 'SOFR': np.round(np.maximum(drift + noise - noise.mean(), 0.01), 4)})
+
+def synthetic_event_frame(dates, open_, high, low, close, volume):
+    return pd.DataFrame({'Date': dates, 'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+                         'Dividends': 0.0, 'Stock Splits': 0.0})
+
+# Class: benchmark_suite
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Joins a previous benchmark run on (Benchmark, N_Events) and flags timings more than tolerance slower."""
+    merged = results.merge(baseline[['Benchmark', 'N_Events', 'Seconds']].rename(columns={'Seconds': 'Baseline_Seconds'}),
+                           on=['Benchmark', 'N_Events'], how='left')
+    merged['Slowdown'] = merged['Seconds'] / merged['Baseline_Seconds'] - 1
+    merged['Regression'] = merged['Slowdown'] > tolerance
+    return merged
+
+# Class: streaming_stats
+
+TDIGEST_BUFFER = 10
+
+def empty_accumulator():
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf, "means": np.empty(0), "weights": np.empty(0)}
+
+def merge_moments(accumulator, count, mean, m2, minimum, maximum):
+    """Chan et al. parallel form of Welford's update: folds another batch's (count, mean, M2) into the accumulator."""
+    if count == 0:
+        return accumulator
+    total = accumulator['count'] + count
+    delta = mean - accumulator['mean']
+    accumulator['mean'] += delta * count / total
+    accumulator['m2'] += m2 + delta ** 2 * accumulator['count'] * count / total
+    accumulator['count'] = total
+    accumulator['min'] = min(accumulator['min'], minimum)
+    accumulator['max'] = max(accumulator['max'], maximum)
+    return accumulator
+
+def tdigest_compress(means, weights, compression):
+    """Merges sorted centroids whose left rank falls in the same unit of the arcsine (k1) scale: about compression / 2 centroids
+    survive, narrow in the tails and widest around the median."""
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+    q_left = (np.cumsum(weights) - weights) / weights.sum()
+    _, clusters = np.unique(np.floor(compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)), return_inverse=True)
+    merged_weights = np.bincount(clusters, weights)
+    return np.bincount(clusters, weights * means) / merged_weights, merged_weights
+
+def add_centroids(accumulator, means, weights, compression):
+    accumulator['means'] = np.concatenate([accumulator['means'], means])
+    accumulator['weights'] = np.concatenate([accumulator['weights'], weights])
+    if len(accumulator['means']) > TDIGEST_BUFFER * compression:
+        accumulator['means'], accumulator['weights'] = tdigest_compress(accumulator['means'], accumulator['weights'], compression)
+    return accumulator
+
+def accumulate(accumulator, values, compression):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return accumulator
+    mean = values.mean()
+    merge_moments(accumulator, len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+    return add_centroids(accumulator, values, np.ones(len(values)), compression)
+
+def merge_accumulators(accumulator, other, compression):
+    merge_moments(accumulator, other['count'], other['mean'], other['m2'], other['min'], other['max'])
+    return add_centroids(accumulator, other['means'], other['weights'], compression)
+
+def tdigest_percentiles(means, weights, minimum, maximum, percentiles):
+    """Percentiles with np.percentile's linear interpolation between centroid mid-ranks; exact while every centroid is a single value."""
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+    total = weights.sum()
+    positions = np.concatenate([[0.0], np.cumsum(weights) - (weights + 1) / 2, [total - 1]])
+    values = np.concatenate([[minimum], means, [maximum]])
+    return np.interp(np.asarray(percentiles) / 100 * (total - 1), positions, values)
+
+def accumulator_summary(accumulator, prefix=""):
+    """Same statistics and column names as calculate_group_stats for one return column."""
+    count = accumulator['count']
+    if count == 0:
+        return {f"{prefix}{name}": (0 if name == "count" else np.nan)
+                for name in ["count", "mean", "median", "std_dev", "min", "max", *[f"{pct}PCT" for pct in SUMMARY_PERCENTILES]]}
+    percentiles = tdigest_percentiles(accumulator['means'], accumulator['weights'], accumulator['min'], accumulator['max'], [50, *SUMMARY_PERCENTILES])
+    summary = {
+        f"{prefix}count": count,
+        f"{prefix}mean": accumulator['mean'],
+        f"{prefix}median": percentiles[0],
+        f"{prefix}std_dev": np.sqrt(accumulator['m2'] / (count - 1)) if count > 1 else np.nan,
+        f"{prefix}min": accumulator['min'],
+        f"{prefix}max": accumulator['max'],
+    }
+    summary.update({f"{prefix}{pct}PCT": value for pct, value in zip(SUMMARY_PERCENTILES, percentiles[1:])})
+    return summary
+
+# Class: event_features
+
+EVENT_FEATURE_COLUMNS = EVENT_STUDY_COLUMNS + ['GICS_Sector', 'ADV20', 'Volatility', 'Beta', 'ETF_Ticker', 'Close_ETF']
+
+def event_session_values(panel, sessions, column):
+    """Value of column at one session per event (indexed by Event_Code) from the (Event_Code, Session)-sorted panel; NaN where missing."""
+    keys = panel['Event_Code'].to_numpy(dtype='int64') * (1 << 32) + panel['Session'].to_numpy(dtype='int64')
+    targets = np.arange(len(sessions), dtype='int64') * (1 << 32) + np.asarray(sessions, dtype='int64')
+    rows = np.minimum(np.searchsorted(keys, targets), len(keys) - 1)
+    return np.where(keys[rows] == targets, panel[column].to_numpy(dtype='float64', na_value=np.nan)[rows], np.nan)
+
+def quantile_buckets(values, n_buckets):
+    """1..n_buckets quantile bucket of each value across events (ties broken by order), <NA> where the value is missing."""
+    values = pd.Series(values)
+    buckets = pd.Series(pd.NA, index=values.index, dtype='Int8')
+    valid = values.notna()
+    if valid.sum() >= n_buckets:
+        buckets[valid] = pd.qcut(values[valid].rank(method='first'), n_buckets, labels=False) + 1
+    return buckets
+
+def compute_event_features(panel, runup_sessions, n_buckets):
+    """One row per event: announce-to-effective lag, pre-announcement and announcement-day returns, pre-announcement liquidity,
+    volatility and beta with cross-event buckets, ETF context and repeat-inclusion flags."""
+    columns = [column for column in ['Event_ID', 'Ticker', 'Index_Name', 'GICS_Sector', 'Event_Type', 'Announced_Session', 'Effective_Session',
+                                     'ETF_Ticker'] if column in panel.columns]
+    features = panel.drop_duplicates('Event_Code')[columns].reset_index(drop=True)
+    announced = features['Announced_Session'].to_numpy(dtype='int64')
+    features['Lag_Sessions'] = features['Effective_Session'].to_numpy(dtype='int64') - announced
+    pre_close = event_session_values(panel, announced - 1, 'Close')
+    features['Pre_Announcement_Runup'] = pre_close / event_session_values(panel, announced - 1 - runup_sessions, 'Close') - 1
+    features['Announcement_Return'] = event_session_values(panel, announced, 'Close') / pre_close - 1
+    for column in ['ADV20', 'Volatility', 'Beta']:
+        features[f'{column}_Pre'] = event_session_values(panel, announced - 1, column) if column in panel.columns else np.nan
+    features['Liquidity_Bucket'] = quantile_buckets(features['ADV20_Pre'], n_buckets)
+    features['Volatility_Bucket'] = quantile_buckets(features['Volatility_Pre'], n_buckets)
+    if 'Close_ETF' in panel.columns:
+        etf_pre_close = event_session_values(panel, announced - 1, 'Close_ETF')
+        features['ETF_Runup'] = etf_pre_close / event_session_values(panel, announced - 1 - runup_sessions, 'Close_ETF') - 1
+        features['Excess_Runup'] = features['Pre_Announcement_Runup'] - features['ETF_Runup']
+    order = np.lexsort((announced, features['Ticker'].astype(str).to_numpy()))
+    by_ticker = features.iloc[order].groupby('Ticker', observed=True, sort=False)
+    features['Prior_Events'] = by_ticker.cumcount().reindex(features.index).astype('int16')
+    features['Sessions_Since_Prior_Event'] = by_ticker['Announced_Session'].diff().reindex(features.index).astype('Int32')
+    features['Is_Repeat'] = features['Prior_Events'] > 0
+    return features
+
+# Class: event_analytics
+
+SUMMARY_PERCENTILES = [5, 25, 50, 75, 95]
+
+def summary_stat_sql(column, prefix=""):
+    """SELECT expressions matching calculate_group_stats for one return column (np.percentile is linear, i.e. quantile_cont)."""
+    expressions = [
+        f'COUNT({column}) AS "{prefix}count"',
+        f'AVG({column}) AS "{prefix}mean"',
+        f'MEDIAN({column}) AS "{prefix}median"',
+        f'STDDEV_SAMP({column}) AS "{prefix}std_dev"',
+        f'MIN({column}) AS "{prefix}min"',
+        f'MAX({column}) AS "{prefix}max"',
+    ]
+    expressions += [f'QUANTILE_CONT({column}, {pct / 100}) AS "{prefix}{pct}PCT"' for pct in SUMMARY_PERCENTILES]
+    return expressions
+
+def group_stats_sql(strategy, has_net, group_columns=("Index_Name", "Event_Type")):
+    group_columns = [f"{strategy}_n", *group_columns]
+    expressions = summary_stat_sql(f"{strategy}_md")
+    if has_net:
+        expressions += summary_stat_sql(f"{strategy}_net", "Net_")
+    return (f"SELECT {', '.join(group_columns)}, {', '.join(expressions)} FROM returns "
+            f"GROUP BY {', '.join(group_columns)} ORDER BY {', '.join(group_columns)}")
+
+def candidates_sql(strategy, side, min_count):
+    """Same selection as MeanReversionStrategy: day-1 net mean of one sign, confirmed by later-day mean of the other."""
+    day1_sign, later_sign = ("<", ">") if side == "long" else (">", "<")
+    return (f"SELECT s.* FROM group_stats s "
+            f"JOIN (SELECT DISTINCT Index_Name, Event_Type FROM group_stats WHERE {strategy}_n = 1 AND Net_mean {day1_sign} 0) d "
+            f"USING (Index_Name, Event_Type) "
+            f"WHERE s.{strategy}_n > 1 AND s.mean {later_sign} 0 AND s.count >= {int(min_count)}")
+
+# Class: fill_models
+
+# Bars a position is held for when it enters at each reference column and exits at the trade date's Close
+HOLDING_SESSIONS = {'Open': 1}
+
+def vwap_proxy(high, low, close):
+    return (np.asarray(high, dtype='float64') + np.asarray(low, dtype='float64') + np.asarray(close, dtype='float64')) / 3
+
+def limit_entry_fills(limit_price, open_, high, low, side):
+    """Buy limits fill when Low trades through the limit, sell limits when High does; a gap through the limit fills at Open."""
+    if side > 0:
+        return low <= limit_price, np.minimum(limit_price, open_)
+    return high >= limit_price, np.maximum(limit_price, open_)
+
+def stop_take_profit_exits(entry_price, open_, high, low, exit_price, stop_loss, take_profit, side):
+    """Overlays take-profit and stop-loss levels on the default exit; when both trade in the same bar the stop is assumed to fill first."""
+    exit_reason = np.full(len(exit_price), 'close', dtype=object)
+    if take_profit is not None:
+        target = entry_price * (1 + side * take_profit)
+        hit = high >= target if side > 0 else low <= target
+        exit_price = np.where(hit, np.maximum(target, open_) if side > 0 else np.minimum(target, open_), exit_price)
+        exit_reason[hit] = 'take_profit'
+    if stop_loss is not None:
+        stop = entry_price * (1 - side * stop_loss)
+        hit = low <= stop if side > 0 else high >= stop
+        exit_price = np.where(hit, np.minimum(stop, open_) if side > 0 else np.maximum(stop, open_), exit_price)
+        exit_reason[hit] = 'stop_loss'
+    return exit_price, exit_reason
+
+# Class: cost_models
+
+def sofr_financing_rate(trade_date, sofr_df, days_back, spread):
+    """Sum of daily (SOFR + spread) / 365 over the last `days_back` SOFR fixings on or before trade_date; None when there are none."""
+    end = sofr_df['DATE'].searchsorted(trade_date, side='right')
+    sofr_rates = sofr_df['SOFR'].values[max(end - days_back, 0):end]
+    if len(sofr_rates) == 0:
+        return None
+    if len(sofr_rates) < days_back:
+        sofr_rates = np.pad(sofr_rates, (days_back - len(sofr_rates), 0), mode='edge')
+    return float(np.sum((sofr_rates / 100 + spread) * (1 / 365)))
+
+# Class: capacity_analysis
+
+def level_daily_sums(values, day_codes, n_days):
+    """Sums a (levels, trades) array into (levels, days) with a single bincount over level-offset day codes."""
+    n_levels = values.shape[0]
+    codes = (np.arange(n_levels)[:, None] * n_days + day_codes[None, :]).ravel()
+    return np.bincount(codes, weights=np.nan_to_num(values.ravel()), minlength=n_levels * n_days).reshape(n_levels, n_days)
+
+def level_sharpe_ratios(daily_pnl, trading_days_per_year=252):
+    std_dev_pnl = daily_pnl.std(axis=1, ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(std_dev_pnl != 0, np.sqrt(trading_days_per_year) * daily_pnl.mean(axis=1) / std_dev_pnl, np.nan)
+
+# Class: portfolio_combiner
+
+COMBINER_FIELDS = ['Total_Position_Size', 'RGL', 'Transaction_Costs', 'Slippage_Cost', 'Overnight_Cost']
+
+def align_books(frames, calendar):
+    """Aligns backtest results on the union of their sessions; returns the session dates and one (sessions x books) array per field, zero where a book did not trade."""
+    book_sessions = [calendar.session_index(frame['Date']) for frame in frames]
+    sessions = np.unique(np.concatenate(book_sessions))
+    arrays = {field: np.zeros((len(sessions), len(frames))) for field in COMBINER_FIELDS}
+    for column, (frame, frame_sessions) in enumerate(zip(frames, book_sessions)):
+        rows = np.searchsorted(sessions, frame_sessions)
+        for field in COMBINER_FIELDS:
+            np.add.at(arrays[field][:, column], rows, np.nan_to_num(frame[field].to_numpy(dtype='float64')))
+    return calendar.session_date(sessions), arrays
+
+def inverse_volatility_weights(daily_pnl, window):
+    """Weights proportional to 1 / trailing std of each book's daily PnL, using only sessions before the one being weighted; equal until a full window exists."""
+    n_sessions, n_books = daily_pnl.shape
+    cumulative = np.vstack([np.zeros(n_books), np.cumsum(daily_pnl, axis=0)])
+    cumulative_sq = np.vstack([np.zeros(n_books), np.cumsum(daily_pnl ** 2, axis=0)])
+    end = np.arange(n_sessions)
+    start = np.maximum(end - window, 0)
+    total = cumulative[end] - cumulative[start]
+    total_sq = cumulative_sq[end] - cumulative_sq[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (total_sq - total ** 2 / window) / (window - 1)
+        inverse_vol = 1 / np.sqrt(np.maximum(variance, 0.0))
+    inverse_vol[(end < window) | ~np.isfinite(inverse_vol).all(axis=1)] = 1.0
+    return inverse_vol / inverse_vol.sum(axis=1, keepdims=True) * n_books
+
+def apply_capital_caps(weights, positions, book_caps=None, portfolio_cap=None):
+    """Scales weights so each book's weighted position stays under its cap, then scales every book so the firm total stays under portfolio_cap."""
+    weighted = weights * positions
+    if book_caps is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = weights * np.where(weighted > book_caps, book_caps / weighted, 1.0)
+        weighted = weights * positions
+    if portfolio_cap is not None:
+        total = weighted.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = weights * np.where(total > portfolio_cap, portfolio_cap / total, 1.0)
+    return weights
+
+# Class: results_warehouse
+
+WAREHOUSE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    config TEXT,
+    code_version TEXT,
+    started_at TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    date TEXT NOT NULL,
+    total_position_size REAL,
+    total_sale_proceeds REAL,
+    rgl REAL,
+    transaction_costs REAL,
+    slippage_cost REAL,
+    overnight_cost REAL,
+    cumulative_net_pnl REAL,
+    PRIMARY KEY (run_id, date)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    metric TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_name ON runs(name, created_at);
+CREATE INDEX IF NOT EXISTS idx_metrics_metric_value ON metrics(metric, value);
+"""
+
+WAREHOUSE_DAILY_COLUMNS = {
+    'Date': 'date',
+    'Total_Position_Size': 'total_position_size',
+    'Total_Sale_Proceeds': 'total_sale_proceeds',
+    'RGL': 'rgl',
+    'Transaction_Costs': 'transaction_costs',
+    'Slippage_Cost': 'slippage_cost',
+    'Overnight_Cost': 'overnight_cost',
+    'Cumulative_Net_PnL': 'cumulative_net_pnl',
+}
+
+def code_version(repo_dir):
+    """Current git commit of repo_dir, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_dir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_name(backtest_results_path):
+    return os.path.basename(backtest_results_path).replace("_backtest_results.csv", "")
+
+def daily_result_rows(run_id, results):
+    """Backtest results as warehouse rows; the strategy 1 Long_Overnight_Cost column is stored as overnight_cost."""
+    results = results.rename(columns={'Long_Overnight_Cost': 'Overnight_Cost'})
+    frame = pd.DataFrame({column: results[column] if column in results.columns else np.nan for column in WAREHOUSE_DAILY_COLUMNS})
+    frame['Date'] = pd.to_datetime(frame['Date']).dt.strftime('%Y-%m-%d')
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [(run_id, *row) for row in frame.itertuples(index=False, name=None)]
 
 # Class: strategy_1_portfolio_metrics
 
@@ -282,3 +1078,62 @@ def calculate_margin(daily_pnl_sum, total_position_size):
 
 def calculate_turnover(avg_position_size, total_position_size):
     return avg_position_size / total_position_size
+
+def backtest_state_path(backtest_results_path):
+    return os.path.splitext(backtest_results_path)[0] + "_state.json"
+
+def load_backtest_state(state_path):
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as state_file:
+        return json.load(state_file)
+
+def save_backtest_state(state_path, state):
+    with open(state_path, 'w') as state_file:
+        json.dump(state, state_file, indent=2)
+
+def update_backtest_state(state, dates, daily_pnl, position_sizes, cumulative_net_pnl):
+    """Folds a batch of new sessions into the running metric state (Welford mean/M2 merge), in O(new days)."""
+    daily_pnl = np.asarray(daily_pnl, dtype='float64')
+    batch_count = len(daily_pnl)
+    batch_mean = daily_pnl.mean()
+    batch_m2 = ((daily_pnl - batch_mean) ** 2).sum()
+    state = dict(state or {'num_days': 0, 'daily_pnl_sum': 0.0, 'daily_pnl_mean': 0.0, 'daily_pnl_m2': 0.0,
+                           'daily_pnl_min': np.inf, 'position_size_sum': 0.0})
+    count = state['num_days'] + batch_count
+    delta = batch_mean - state['daily_pnl_mean']
+    state['daily_pnl_m2'] = float(state['daily_pnl_m2'] + batch_m2 + delta ** 2 * state['num_days'] * batch_count / count)
+    state['daily_pnl_mean'] = float(state['daily_pnl_mean'] + delta * batch_count / count)
+    state['num_days'] = count
+    state['daily_pnl_sum'] = float(state['daily_pnl_sum'] + daily_pnl.sum())
+    state['daily_pnl_min'] = float(min(state['daily_pnl_min'], daily_pnl.min()))
+    state['position_size_sum'] = float(state['position_size_sum'] + np.sum(position_sizes))
+    state['cumulative_net_pnl'] = float(cumulative_net_pnl)
+    state['last_date'] = str(np.datetime64(max(dates), 'D'))
+    return state
+
+def write_backtest_state(backtest_results_path, results):
+    """Rewrites the checkpoint of a full results file from its own rows, so a later incremental run never resumes from a stale state."""
+    state_path = backtest_state_path(backtest_results_path)
+    if results.empty:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return None
+    cumulative = results['Cumulative_Net_PnL'].to_numpy(dtype='float64')
+    state = update_backtest_state(None, results['Date'], np.diff(cumulative, prepend=0.0), results['Total_Position_Size'], cumulative[-1])
+    save_backtest_state(state_path, state)
+    return state
+
+def metrics_from_state(state, trading_days_per_year=252):
+    num_days = state['num_days']
+    std_dev_pnl = np.sqrt(state['daily_pnl_m2'] / (num_days - 1)) if num_days > 1 else np.nan
+    information_ratio = state['daily_pnl_mean'] / std_dev_pnl if std_dev_pnl != 0 else np.nan
+    avg_position_size = state['position_size_sum'] / num_days
+    return {
+        "Information_Ratio": information_ratio,
+        "Sharpe_Ratio": calculate_sharpe_ratio(information_ratio, trading_days_per_year),
+        "Max_Drawdown": state['daily_pnl_min'] / avg_position_size,
+        "Annualized_Return": calculate_annualized_return(state['daily_pnl_sum'], state['position_size_sum'], num_days, trading_days_per_year),
+        "Margin": calculate_margin(state['daily_pnl_sum'], state['position_size_sum']),
+        "Turnover": calculate_turnover(avg_position_size, state['position_size_sum']),
+    }
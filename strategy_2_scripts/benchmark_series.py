@@ -0,0 +1,62 @@
+import os
+from functools import lru_cache
+from utils import (
+    ETF_LEG_FIELDS,
+    read_table,
+    build_benchmark_series,
+    take_benchmark_values,
+    benchmark_daily_returns,
+    benchmark_expanding_mean,
+)
+from trading_calendar import get_trading_calendar
+
+DEFAULT_BENCHMARKS = {
+    "S&P 500": "SPY",
+    "S&P MidCap 400": "IJH",
+    "S&P SmallCap 600": "IJR",
+}
+
+class BenchmarkSeries:
+    def __init__(self, price_data_folder, benchmarks=None, max_cached_series=8):
+        self.price_data_folder = price_data_folder
+        self.benchmarks = dict(DEFAULT_BENCHMARKS if benchmarks is None else benchmarks)
+        self.calendar = get_trading_calendar()
+        self.load_series = lru_cache(maxsize=max_cached_series)(self._load_series)
+
+    def _load_series(self, ticker):
+        file_path = os.path.join(self.price_data_folder, f"{ticker}_Price_Data.csv")
+        etf_data = read_table(file_path, 'etf_prices', columns=['Date', 'Open', 'Close', 'Volume'])
+        print(f"Loaded benchmark series for {ticker} from {file_path}")
+        return build_benchmark_series(etf_data, self.calendar)
+
+    def etf_for_index(self, index_name):
+        return self.benchmarks.get(index_name)
+
+    def values(self, ticker, field, sessions):
+        return take_benchmark_values(self.load_series(ticker), field, sessions)
+
+    def daily_returns(self, ticker, sessions, start_session):
+        return benchmark_daily_returns(self.load_series(ticker), sessions, start_session)
+
+    def expanding_mean(self, ticker, sessions, start_session):
+        return benchmark_expanding_mean(self.load_series(ticker), sessions, start_session)
+
+    def attach_etf_leg(self, price_data):
+        price_data = price_data.drop(columns=['ETF_Ticker'] + [f'{field}_ETF' for field in ETF_LEG_FIELDS], errors='ignore')
+        ticker = self.etf_for_index(price_data['Index_Name'].iloc[0]) if len(price_data) else None
+        if ticker is None:
+            return price_data
+        sessions = price_data['Session'].to_numpy()
+        price_data['ETF_Ticker'] = ticker
+        for field in ['Open', 'Close', 'Volume']:
+            price_data[f'{field}_ETF'] = self.values(ticker, field, sessions)
+        return price_data
+
+# Usage Example:
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    benchmarks = BenchmarkSeries(os.path.join(base_dir, "price_data"))
+    calendar = get_trading_calendar()
+    sessions = calendar.session_index(["2024-09-23", "2024-09-24", "2024-09-25"])
+    print(benchmarks.daily_returns("IJH", sessions, sessions[0]))
+    print(benchmarks.expanding_mean("IJH", sessions, sessions[0]))
@@ -0,0 +1,82 @@
+import os
+import numpy as np
+import pandas as pd
+from fill_models import FillModel
+from cost_models import PerShareCommission, PowerLawImpact, evaluate_cost_models
+from utils import SCAN_CELL_COLUMNS, benjamini_hochberg, cell_moments, normal_sf, read_table
+from strategy_2_backtest_engine import BACKTEST_COLUMNS
+
+ENTRY_COLUMNS = {"long": ('Previous_Close', 1), "short": ('Previous_Close_7D', -1)}
+
+class CandidateScanner:
+    """Scores every (Index_Name, Event_Type, GICS_Sector) cell for both sides in one vectorised pass: per-trade
+    net-of-cost returns priced like BacktestEngine, one-sided t-stats, Benjamini-Hochberg q-values and expected PnL per trade.
+
+    Every post-effective row is priced at the side's fixed hold (one session long, six short), so strategy_2_n, the exit day,
+    is not a horizon and cells pool all exit days; a selected cell's trade log trades exactly the rows that were scored.
+
+    p-values use the normal approximation to the t distribution, which is tight at the min_count sample sizes the scan admits.
+    Selected cells (q-value at most fdr) are ranked first, by t-stat, and TradeLogCreator can build trade logs from them directly.
+    """
+    def __init__(self, returns_path, min_count=50, fdr=0.1, participation_rate=0.01, fill_model=None,
+                 transaction_cost_models=None, slippage_models=None):
+        self.returns_path = returns_path
+        self.min_count = min_count
+        self.fdr = fdr
+        self.participation_rate = participation_rate
+        self.fill_model = fill_model or FillModel()
+        self.transaction_cost_models = transaction_cost_models or [PerShareCommission(0.01, sides=2)]
+        self.slippage_models = slippage_models or [PowerLawImpact(0.2, 0.7)]
+
+    def load_data(self):
+        data = read_table(self.returns_path, 'returns', columns=list(dict.fromkeys(BACKTEST_COLUMNS + SCAN_CELL_COLUMNS + ['strategy_2_n'])))
+        self.data = data[data['strategy_2_n'].notna()].reset_index(drop=True)
+        grouped = self.data.groupby(SCAN_CELL_COLUMNS, observed=True)
+        self.cell_codes = grouped.ngroup().to_numpy()
+        self.cells = grouped.size().reset_index()[SCAN_CELL_COLUMNS]
+        print(f"Loaded {len(self.data)} rows in {len(self.cells)} cells from {self.returns_path}")
+
+    def trade_pnl(self, side):
+        """Per-row net PnL and net return of trading every row on one side, sized at participation_rate of ADV20."""
+        entry_column, sign = ENTRY_COLUMNS[side]
+        trades = self.fill_model.apply(self.data[BACKTEST_COLUMNS].copy(), entry_column, side=sign)
+        trades['Trade_Limit'] = np.minimum(trades['ADV20'] * self.participation_rate, trades['Volume']).where(trades['Filled'], 0.0)
+        position_size = (trades['Trade_Limit'] * trades['Entry_Price']).to_numpy(dtype='float64')
+        net_pnl = (sign * trades['Trade_Limit'] * (trades['Exit_Price'] - trades['Entry_Price'])).to_numpy(dtype='float64') \
+                  - evaluate_cost_models(self.transaction_cost_models, trades) - evaluate_cost_models(self.slippage_models, trades)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            net_return = np.where(position_size > 0, net_pnl / position_size, np.nan)
+        return np.where(position_size > 0, net_pnl, np.nan), net_return
+
+    def scan(self):
+        tables = []
+        for side in ENTRY_COLUMNS:
+            net_pnl, net_return = self.trade_pnl(side)
+            count, mean, std = cell_moments(self.cell_codes, net_return, len(self.cells))
+            _, expected_pnl, _ = cell_moments(self.cell_codes, net_pnl, len(self.cells))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                t_stat = mean / (std / np.sqrt(count))
+            tables.append(self.cells.assign(Side=side, count=count, Net_mean=mean, Net_std_dev=std, t_stat=t_stat,
+                                            p_value=np.where(count >= self.min_count, normal_sf(t_stat), np.nan),
+                                            Expected_Net_PnL=expected_pnl, Total_Net_PnL=expected_pnl * count))
+        candidates = pd.concat(tables, ignore_index=True)
+        candidates['q_value'] = benjamini_hochberg(candidates['p_value'])
+        candidates['Selected'] = candidates['q_value'] <= self.fdr
+        candidates = candidates.sort_values(['Selected', 't_stat'], ascending=False, kind='stable', na_position='last').reset_index(drop=True)
+        candidates.insert(0, 'Rank', np.arange(1, len(candidates) + 1))
+        self.candidates = candidates
+        tested = candidates['p_value'].notna().sum()
+        print(f"Scanned {tested} cells with at least {self.min_count} trades: {candidates['Selected'].sum()} selected at FDR {self.fdr:.0%}")
+        return candidates
+
+    def save_results(self, output_path):
+        self.candidates.to_csv(output_path, index=False)
+        print(f"Ranked candidates saved to {output_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    scanner = CandidateScanner(os.path.join(base_dir, "strategy_2", "strategy_2_returns.csv"))
+    scanner.load_data()
+    scanner.scan()
+    scanner.save_results(os.path.join(base_dir, "strategy_2", "scanned_candidates.csv"))
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from cost_models import evaluate_cost_models
+from utils import level_daily_sums, level_sharpe_ratios
+
+class CapacityAnalysis:
+    """Net PnL, Sharpe and cost breakdown of a backtest configuration across ADV participation rates and capital levels."""
+    def __init__(self, engine, participation_rates, capital_levels, output_file_path, output_image_path=None):
+        self.engine = engine
+        self.participation_rates = np.asarray(participation_rates, dtype='float64')
+        self.capital_levels = np.asarray(capital_levels, dtype='float64')
+        self.output_file_path = output_file_path
+        self.output_image_path = output_image_path
+        self.results = None
+
+    def run(self):
+        trades = self.engine.trade_log_df
+        day_codes, days = pd.factorize(trades['Date'], sort=True)
+        n_days, n_trades = len(days), len(trades)
+        rates, capitals = np.meshgrid(self.participation_rates, self.capital_levels, indexing='ij')
+        rates, capitals = rates.ravel(), capitals.ravel()
+        adv20 = trades['ADV20'].to_numpy(dtype='float64')
+        volume = trades['Volume'].to_numpy(dtype='float64')
+        filled = trades['Filled'].to_numpy(dtype=bool)
+        entry_price = trades['Entry_Price'].to_numpy(dtype='float64')
+        exit_price = trades['Exit_Price'].to_numpy(dtype='float64')
+        trade_limit = np.where(filled & ~np.isnan(adv20), np.fmin(adv20[None, :] * rates[:, None], volume[None, :]), 0.0)
+        position_size = level_daily_sums(trade_limit * entry_price, day_codes, n_days)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.where(position_size > capitals[:, None], capitals[:, None] / position_size, 1.0)
+        trade_limit = trade_limit * scale[:, day_codes]
+        levels = pd.DataFrame({
+            'Trade_Limit': trade_limit.ravel(),
+            'Entry_Price': np.tile(entry_price, len(rates)),
+            'Exit_Price': np.tile(exit_price, len(rates)),
+            'ADV20': np.tile(adv20, len(rates)),
+            'Volatility': np.tile(trades['Volatility'].to_numpy(dtype='float64'), len(rates)),
+        })
+        shape = (len(rates), n_trades)
+        transaction_costs = level_daily_sums(evaluate_cost_models(self.engine.transaction_cost_models, levels).reshape(shape), day_codes, n_days)
+        slippage_cost = level_daily_sums(evaluate_cost_models(self.engine.slippage_models, levels).reshape(shape), day_codes, n_days)
+        rgl = level_daily_sums(self.engine.side * trade_limit * (exit_price - entry_price), day_codes, n_days)
+        position_size = position_size * scale
+        financing_rates = np.array([self.engine.financing_model.daily_cost(day, self.engine.sofr_df, 1.0) for day in days])
+        overnight_cost = position_size * financing_rates[None, :]
+        daily_pnl = rgl - transaction_costs - slippage_cost - overnight_cost
+        self.results = pd.DataFrame({
+            'Participation_Rate': rates,
+            'Capital': capitals,
+            'Avg_Position_Size': position_size.mean(axis=1),
+            'Gross_PnL': rgl.sum(axis=1),
+            'Transaction_Costs': transaction_costs.sum(axis=1),
+            'Slippage_Cost': slippage_cost.sum(axis=1),
+            'Overnight_Cost': overnight_cost.sum(axis=1),
+            'Net_PnL': daily_pnl.sum(axis=1),
+            'Sharpe_Ratio': level_sharpe_ratios(daily_pnl),
+            'Margin': daily_pnl.sum(axis=1) / position_size.sum(axis=1),
+        })
+        return self.results
+
+    def save_results(self):
+        self.results.to_csv(self.output_file_path, index=False)
+        print(f"Capacity analysis saved to {self.output_file_path}")
+
+    def plot_capacity_curve(self, title="Capacity Curve"):
+        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+        for rate, group in self.results.groupby('Participation_Rate'):
+            axes[0].plot(group['Capital'], group['Net_PnL'], marker='o', label=f"{rate:.1%} ADV")
+            axes[1].plot(group['Capital'], group['Sharpe_Ratio'], marker='o', label=f"{rate:.1%} ADV")
+        for axis, ylabel in zip(axes, ["Net PnL", "Sharpe Ratio"]):
+            axis.set_xscale('log')
+            axis.set_xlabel("Capital")
+            axis.set_ylabel(ylabel)
+            axis.grid(True)
+            axis.legend()
+        fig.suptitle(title)
+        fig.savefig(self.output_image_path)
+        plt.close(fig)
+        print(f"Capacity curve saved as {self.output_image_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    from strategy_2_backtest_engine import BacktestEngine
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    engine = BacktestEngine(
+        os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_trade_log.csv"),
+        os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"),
+        os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_backtest_results.csv"),
+        "short"
+    )
+    capacity = CapacityAnalysis(engine, [0.005, 0.01, 0.02, 0.05, 0.1], [1e6, 5e6, 2.5e7, 1e8],
+                                os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_capacity.csv"),
+                                os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_capacity.png"))
+    capacity.run()
+    capacity.save_results()
+    capacity.plot_capacity_curve("Strategy 2 - Short S&P 400 Index Review: Capacity")
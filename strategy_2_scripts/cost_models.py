@@ -0,0 +1,80 @@
+import numpy as np
+from kernels import fused_slippage_cost
+from utils import sofr_financing_rate
+
+class CostModel:
+    """Per-trade cost over whole trade arrays: costs() returns one value per row of a frame with Trade_Limit, Entry_Price and Exit_Price."""
+    def costs(self, trades):
+        raise NotImplementedError
+
+    def total(self, trades):
+        return float(np.nansum(self.costs(trades)))
+
+class PerShareCommission(CostModel):
+    def __init__(self, rate_per_share=0.01, sides=2):
+        self.rate_per_share = rate_per_share
+        self.sides = sides
+
+    def costs(self, trades):
+        return self.sides * self.rate_per_share * trades['Trade_Limit'].to_numpy(dtype='float64')
+
+class BpsSpread(CostModel):
+    """Half the quoted spread paid on both the entry and the exit notional."""
+    def __init__(self, spread_bps):
+        self.spread_bps = spread_bps
+
+    def costs(self, trades):
+        notional = trades['Trade_Limit'].to_numpy(dtype='float64') * (
+            trades['Entry_Price'].to_numpy(dtype='float64') + trades['Exit_Price'].to_numpy(dtype='float64'))
+        return notional * self.spread_bps / 2e4
+
+class PowerLawImpact(CostModel):
+    """alpha * (Trade_Limit / ADV20) ** beta * Volatility * (entry + exit), the engines' original slippage formula."""
+    def __init__(self, alpha=0.2, beta=0.7, entry_column='Entry_Price'):
+        self.alpha = alpha
+        self.beta = beta
+        self.entry_column = entry_column
+
+    def costs(self, trades):
+        costs, _ = fused_slippage_cost(trades['Trade_Limit'], trades['ADV20'], trades['Volatility'],
+                                       trades[self.entry_column], trades['Exit_Price'], self.alpha, self.beta)
+        return costs
+
+class SquareRootImpact(CostModel):
+    """coefficient * Volatility * sqrt(Trade_Limit / ADV20) as a fraction of the entry and exit notional."""
+    def __init__(self, coefficient=0.1):
+        self.coefficient = coefficient
+
+    def costs(self, trades):
+        trade_limit = trades['Trade_Limit'].to_numpy(dtype='float64')
+        participation = trade_limit / trades['ADV20'].to_numpy(dtype='float64')
+        notional = trade_limit * (trades['Entry_Price'].to_numpy(dtype='float64') + trades['Exit_Price'].to_numpy(dtype='float64'))
+        return self.coefficient * trades['Volatility'].to_numpy(dtype='float64') * np.sqrt(participation) * notional
+
+class FinancingCost:
+    """Overnight financing at SOFR plus a spread, accrued over the last `days_back` fixings."""
+    def __init__(self, spread=0.015, days_back=1):
+        self.spread = spread
+        self.days_back = days_back
+
+    def daily_cost(self, trade_date, sofr_df, total_position_size):
+        rate = sofr_financing_rate(trade_date, sofr_df, self.days_back, self.spread)
+        if rate is None:
+            print(f"No SOFR rate found for {trade_date}.")
+            return 0
+        return rate * total_position_size
+
+def evaluate_cost_models(models, trades):
+    """Per-row sum of the given cost models' costs."""
+    total = np.zeros(len(trades))
+    for model in models:
+        total = total + model.costs(trades)
+    return total
+
+# Usage Example
+if __name__ == "__main__":
+    import pandas as pd
+    trades = pd.DataFrame({'Trade_Limit': [1000.0, 2500.0], 'ADV20': [1e5, 4e5], 'Volatility': [0.02, 0.015],
+                           'Entry_Price': [50.0, 20.0], 'Exit_Price': [51.0, 19.5]})
+    for model in [PerShareCommission(0.01), BpsSpread(5), PowerLawImpact(0.2, 0.7), SquareRootImpact(0.1)]:
+        print(type(model).__name__, model.costs(trades), model.total(trades))
@@ -0,0 +1,65 @@
+import os
+import duckdb
+from utils import read_table, group_stats_sql, candidates_sql
+
+class EventAnalytics:
+    """DuckDB views over the event-returns dataset: group stats, reversion candidates and trade-log slices, plus ad-hoc SQL."""
+    def __init__(self, returns_path, strategy="strategy_2", min_count_threshold=50, features_path=None):
+        self.returns_path = returns_path
+        self.features_path = features_path
+        self.strategy = strategy
+        self.min_count_threshold = min_count_threshold
+        self.connection = duckdb.connect()
+        self.load_data()
+
+    def load_data(self):
+        if self.returns_path.endswith(".parquet"):
+            self.connection.execute(f"CREATE OR REPLACE VIEW returns AS SELECT * FROM read_parquet('{self.returns_path}')")
+        else:
+            self.returns = read_table(self.returns_path, 'returns')
+            self.connection.register("returns_df", self.returns)
+            self.connection.execute("CREATE OR REPLACE VIEW returns AS SELECT * FROM returns_df")
+        if self.features_path:
+            # One row per Event_ID from EventFeatureStore, joinable to returns without loading it into pandas
+            self.connection.execute(f"CREATE OR REPLACE VIEW event_features AS SELECT * FROM read_parquet('{self.features_path}')")
+        columns = {row[0] for row in self.connection.execute("DESCRIBE returns").fetchall()}
+        self.has_net = f"{self.strategy}_net" in columns
+        self.connection.execute(f"CREATE OR REPLACE VIEW group_stats AS {group_stats_sql(self.strategy, self.has_net)}")
+        if self.has_net:
+            for side in ("long", "short"):
+                self.connection.execute(f"CREATE OR REPLACE VIEW {side}_candidates AS {candidates_sql(self.strategy, side, self.min_count_threshold)}")
+
+    def query(self, sql, params=None):
+        return self.connection.execute(sql, params or []).df()
+
+    def group_stats(self, group_columns=None):
+        """Per (holding period, index, event type) stats, or grouped by any other returns columns."""
+        if group_columns is None:
+            return self.query("SELECT * FROM group_stats")
+        return self.query(group_stats_sql(self.strategy, self.has_net, group_columns))
+
+    def reversion_candidates(self):
+        if not self.has_net:
+            raise ValueError(f"{self.returns_path} has no {self.strategy}_net column to select candidates on")
+        return self.query("SELECT * FROM long_candidates"), self.query("SELECT * FROM short_candidates")
+
+    def trade_log(self, exclude_indices, strategy_n, event_type):
+        """Same rows as TradeLogCreator.create_trade_log for one configuration."""
+        return self.query(
+            f"SELECT * FROM returns WHERE NOT list_contains(?, Index_Name) AND {self.strategy}_n = ? AND Event_Type = ?",
+            [list(exclude_indices), strategy_n, event_type],
+        )
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    analytics = EventAnalytics(os.path.join(base_dir, "strategy_2", "strategy_2_returns.csv"))
+    print(analytics.group_stats().head())
+    long_candidates, short_candidates = analytics.reversion_candidates()
+    print(analytics.query("""
+        SELECT GICS_Sector, strategy_2_n, AVG(strategy_2_net) AS net_mean, COUNT(*) AS count
+        FROM returns
+        WHERE Index_Name = 'S&P MidCap 400' AND Event_Type = 'Index Review'
+        GROUP BY GICS_Sector, strategy_2_n
+        ORDER BY GICS_Sector, strategy_2_n
+    """))
@@ -0,0 +1,63 @@
+import os
+import duckdb
+import numpy as np
+import pandas as pd
+from utils import EVENT_FEATURE_COLUMNS, compute_event_features, read_table, stack_event_panel
+from trading_calendar import get_trading_calendar
+
+class EventFeatureStore:
+    """Event-level features, one row per Event_ID, computed once over every price file and persisted as Parquet through DuckDB.
+
+    attach() adds feature columns to any returns or trade-log frame by Event_ID position lookup, without merging or copying the
+    frame; EventAnalytics(features_path=...) exposes the same file as an event_features view to join in SQL.
+    """
+    def __init__(self, price_data_folder, output_path, runup_sessions=20, n_buckets=5):
+        self.price_data_folder = price_data_folder
+        self.output_path = output_path
+        self.runup_sessions = runup_sessions
+        self.n_buckets = n_buckets
+        self.calendar = get_trading_calendar()
+
+    def build(self):
+        frames = [read_table(os.path.join(self.price_data_folder, file_name), 'price_data', columns=EVENT_FEATURE_COLUMNS)
+                  for file_name in sorted(os.listdir(self.price_data_folder))
+                  if file_name.endswith("_Price_Data.csv")]
+        frames = [frame for frame in frames if set(EVENT_FEATURE_COLUMNS[:9]) <= set(frame.columns)]
+        features = compute_event_features(stack_event_panel(frames), self.runup_sessions, self.n_buckets)
+        features.insert(features.columns.get_loc('Announced_Session'), 'Announced', self.calendar.session_date(features['Announced_Session']))
+        features.insert(features.columns.get_loc('Effective_Session'), 'Effective_Date', self.calendar.session_date(features['Effective_Session']))
+        self.features = features
+        print(f"Computed {len(features.columns) - 1} features for {len(features)} events")
+        return features
+
+    def save(self):
+        connection = duckdb.connect()
+        connection.register("features_df", self.features)
+        connection.execute(f"COPY (SELECT * FROM features_df) TO '{self.output_path}' (FORMAT PARQUET)")
+        connection.close()
+        print(f"Event features saved to {self.output_path}")
+
+    def load(self, columns=None):
+        """Reads the stored features, only the requested columns (plus Event_ID) when given."""
+        selected = ", ".join(f'"{column}"' for column in dict.fromkeys(["Event_ID", *columns])) if columns else "*"
+        self.features = duckdb.connect().execute(f"SELECT {selected} FROM read_parquet('{self.output_path}')").df()
+        return self.features
+
+    def attach(self, df, columns=None):
+        """Adds feature columns to a frame with an Event_ID column; rows of unknown events get missing values."""
+        columns = columns or [column for column in self.features.columns if column not in df.columns]
+        positions = pd.Index(self.features['Event_ID'].astype(str)).get_indexer(df['Event_ID'].astype(str))
+        found = positions >= 0
+        for column in columns:
+            df[column] = self.features[column].take(np.maximum(positions, 0)).where(found).array
+        return df
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    store = EventFeatureStore(os.path.join(base_dir, "price_data"), os.path.join(base_dir, "strategy_2", "event_features.parquet"))
+    store.build()
+    store.save()
+    returns = read_table(os.path.join(base_dir, "strategy_2", "strategy_2_returns.csv"), 'returns')
+    returns = store.attach(returns, ['Lag_Sessions', 'Liquidity_Bucket', 'Is_Repeat'])
+    print(returns.groupby(['Liquidity_Bucket', 'strategy_2_n'])['strategy_2_net'].mean().unstack())
@@ -1,26 +1,37 @@
 import os
 import pandas as pd
-from utils import calculate_adv20, calculate_returns, calculate_strategy_returns, calculate_volatility
+from utils import calculate_strategy_returns, read_table
+from indicator_engine import IndicatorEngine
+from profiler import profile_block, record_rows
+from trading_calendar import get_trading_calendar
+from benchmark_series import BenchmarkSeries
 
 class HistoricalDataProcessor:
-    def __init__(self, historical_data_folder):
+    def __init__(self, historical_data_folder, benchmarks=None, indicators=None):
         self.historical_data_folder = historical_data_folder
+        self.calendar = get_trading_calendar()
+        self.benchmarks = benchmarks or BenchmarkSeries(historical_data_folder)
+        self.indicators = indicators or IndicatorEngine(historical_data_folder)
 
     def process_all_files(self):
+        with profile_block("IndicatorEngine.compute"):
+            self.indicators.compute()
         for file_name in os.listdir(self.historical_data_folder):
             if file_name.endswith("_Price_Data.csv"):
-                file_path = os.path.join(self.historical_data_folder, file_name)
-                df = pd.read_csv(file_path)
-                if 'Volume' in df.columns:
-                    df = calculate_adv20(df)
-                if 'Close' in df.columns and 'Open' in df.columns:
-                    df = calculate_returns(df)
-                if 'Return' in df.columns:
-                    df = calculate_volatility(df)
-                if 'Date' in df.columns:
-                    df = calculate_strategy_returns(df, file_name)
-                df.to_csv(file_path, index=False)
-                print(f"Processed all metrics and saved to {file_path}")
+                self.process_file(file_name)
+
+    def process_file(self, file_name):
+        file_path = os.path.join(self.historical_data_folder, file_name)
+        with profile_block("read_price_data"):
+            df = read_table(file_path, 'price_data')
+        df = self.indicators.attach(df, file_name)
+        if 'Date' in df.columns:
+            with profile_block("calculate_strategy_returns"):
+                df = calculate_strategy_returns(df, file_name, self.calendar, self.benchmarks)
+        with profile_block("write_price_data"):
+            df.to_csv(file_path, index=False)
+        record_rows(len(df), len(df))
+        print(f"Processed all metrics and saved to {file_path}")
 
 # Usage Example:
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+import os
+from utils import (
+    INDICATOR_COLUMNS,
+    INDICATOR_INPUT_COLUMNS,
+    HEDGE_INPUT_COLUMNS,
+    compute_indicators,
+    compute_hedge_betas,
+    price_file_ticker,
+    read_table,
+    stack_hedge_history,
+    stack_price_history,
+)
+from trading_calendar import get_trading_calendar
+
+class IndicatorEngine:
+    def __init__(self, historical_data_folder, adv_window=20, volatility_window=20, atr_window=14, beta_window=20, benchmark_ticker="SPY", hedge_window=20, min_periods=10):
+        self.historical_data_folder = historical_data_folder
+        self.adv_window = adv_window
+        self.volatility_window = volatility_window
+        self.atr_window = atr_window
+        self.beta_window = beta_window
+        self.benchmark_ticker = benchmark_ticker
+        self.min_periods = min_periods
+        self.hedge_window = hedge_window
+        self.calendar = get_trading_calendar()
+        self.by_ticker = {}
+        self.hedge_by_pair = {}
+
+    def load_frames(self):
+        frames = []
+        for file_name in sorted(os.listdir(self.historical_data_folder)):
+            if file_name.endswith("_Price_Data.csv"):
+                file_path = os.path.join(self.historical_data_folder, file_name)
+                df = read_table(file_path, 'price_data', columns=INDICATOR_INPUT_COLUMNS + HEDGE_INPUT_COLUMNS)
+                df['Ticker'] = price_file_ticker(file_name)
+                frames.append(df)
+        return frames
+
+    def load_history(self):
+        frames = self.load_frames()
+        return stack_price_history(frames, self.calendar) if frames else None
+
+    def compute(self):
+        frames = self.load_frames()
+        if not frames:
+            print(f"No price data found in {self.historical_data_folder}")
+            return self.by_ticker
+        history = stack_price_history([frame.drop(columns=HEDGE_INPUT_COLUMNS, errors='ignore') for frame in frames], self.calendar)
+        indicators = compute_indicators(history, self.adv_window, self.volatility_window, self.atr_window, self.beta_window, self.benchmark_ticker, self.min_periods)
+        self.by_ticker = {ticker: group.set_index('Session')[INDICATOR_COLUMNS] for ticker, group in indicators.groupby('Ticker', sort=False)}
+        print(f"Computed indicators for {len(self.by_ticker)} tickers over {len(indicators)} sessions")
+        self.report_coverage(indicators)
+        hedge_history = stack_hedge_history(frames, self.calendar)
+        if hedge_history is not None:
+            hedges = compute_hedge_betas(hedge_history, self.hedge_window)
+            self.hedge_by_pair = {pair: group.set_index('Session')['Hedge_Beta'] for pair, group in hedges.groupby(['Ticker', 'ETF_Ticker'], sort=False)}
+            print(f"Computed {self.hedge_window}-session hedge betas for {len(self.hedge_by_pair)} ticker/ETF pairs")
+        return self.by_ticker
+
+    def report_coverage(self, indicators):
+        coverage = indicators[INDICATOR_COLUMNS].notna().mean()
+        print("Indicator coverage: " + ", ".join(f"{column} {share:.0%}" for column, share in coverage.items()))
+        for column in coverage[coverage == 0].index:
+            print(f"Warning: {column} is never populated; its window is longer than the stored runs of sessions")
+        return coverage
+
+    def attach(self, df, file_name):
+        indicators = self.by_ticker.get(price_file_ticker(file_name))
+        if indicators is None or 'Date' not in df.columns:
+            return df
+        sessions = self.calendar.session_index(df['Date'])
+        values = indicators.reindex(sessions)
+        for column in INDICATOR_COLUMNS:
+            df[column] = values[column].to_numpy()
+        if 'ETF_Ticker' in df.columns and df['ETF_Ticker'].notna().any():
+            etf_ticker = df['ETF_Ticker'].dropna().iloc[0]
+            hedge_betas = self.hedge_by_pair.get((price_file_ticker(file_name), etf_ticker))
+            if hedge_betas is not None:
+                df['Hedge_Beta'] = hedge_betas.reindex(sessions).to_numpy()
+            etf_indicators = self.by_ticker.get(etf_ticker)
+            if etf_indicators is not None:
+                # The ETF's own liquidity and volatility, so a hedge leg can be costed like the stock leg
+                etf_values = etf_indicators.reindex(sessions)
+                df['ADV20_ETF'] = etf_values['ADV20'].to_numpy()
+                df['Volatility_ETF'] = etf_values['Volatility'].to_numpy()
+        return df
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    historical_data_folder = os.path.join(base_dir, "price_data")
+    engine = IndicatorEngine(historical_data_folder)
+    engine.compute()
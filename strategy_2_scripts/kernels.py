@@ -0,0 +1,127 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+def _slippage_loop(trade_limit, adv20, volatility, entry_price, exit_price, alpha, beta, out):
+    total = 0.0
+    for i in range(trade_limit.shape[0]):
+        cost = alpha * (trade_limit[i] / adv20[i]) ** beta * volatility[i] * (entry_price[i] + exit_price[i])
+        out[i] = cost
+        if cost == cost:
+            total += cost
+    return total
+
+def _slippage_numpy(trade_limit, adv20, volatility, entry_price, exit_price, alpha, beta, out):
+    np.divide(trade_limit, adv20, out=out)
+    np.power(out, beta, out=out)
+    np.multiply(out, volatility, out=out)
+    np.multiply(out, alpha, out=out)
+    np.multiply(out, entry_price + exit_price, out=out)
+    return np.nansum(out)
+
+def _scale_to_cap_loop(position_size, trade_limit, cap):
+    total = 0.0
+    for i in range(position_size.shape[0]):
+        if position_size[i] == position_size[i]:
+            total += position_size[i]
+    if total > cap:
+        scale = cap / total
+        for i in range(position_size.shape[0]):
+            position_size[i] *= scale
+            trade_limit[i] *= scale
+    return total
+
+def _scale_to_cap_numpy(position_size, trade_limit, cap):
+    total = np.nansum(position_size)
+    if total > cap:
+        scale = cap / total
+        position_size *= scale
+        trade_limit *= scale
+    return total
+
+def _expanding_mean_loop(values, starts, out):
+    total = 0.0
+    count = 0
+    for i in range(values.shape[0]):
+        if starts[i]:
+            total = 0.0
+            count = 0
+        if values[i] == values[i]:
+            total += values[i]
+            count += 1
+        out[i] = total / count if count > 0 else np.nan
+
+def _expanding_mean_numpy(values, starts, out):
+    index = np.arange(values.shape[0])
+    valid = ~np.isnan(values)
+    cumulative = np.cumsum(np.where(valid, values, 0.0))
+    counts = np.cumsum(valid)
+    segment_start = np.maximum.accumulate(np.where(starts, index, 0))
+    offset_total = np.concatenate([[0.0], cumulative])[segment_start]
+    offset_count = np.concatenate([[0], counts])[segment_start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(cumulative - offset_total, counts - offset_count, out=out)
+
+if HAVE_NUMBA:
+    _slippage_kernel = njit(cache=True)(_slippage_loop)
+    _scale_to_cap_kernel = njit(cache=True)(_scale_to_cap_loop)
+    _expanding_mean_kernel = njit(cache=True)(_expanding_mean_loop)
+else:
+    _slippage_kernel = _slippage_numpy
+    _scale_to_cap_kernel = _scale_to_cap_numpy
+    _expanding_mean_kernel = _expanding_mean_numpy
+
+def as_float_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def fused_slippage_cost(trade_limit, adv20, volatility, entry_price, exit_price, alpha, beta):
+    """Per-row alpha * (Trade_Limit / ADV20) ** beta * Volatility * (entry + exit) and its NaN-skipping total, in one pass."""
+    trade_limit = as_float_array(trade_limit)
+    out = np.empty_like(trade_limit)
+    total = _slippage_kernel(trade_limit, as_float_array(adv20), as_float_array(volatility),
+                             as_float_array(entry_price), as_float_array(exit_price), float(alpha), float(beta), out)
+    return out, float(total)
+
+def scale_to_cap(position_size, trade_limit, cap):
+    """Scales both float64 arrays in place so position_size sums to at most cap; returns the unscaled total."""
+    return float(_scale_to_cap_kernel(position_size, trade_limit, float(cap)))
+
+def expanding_mean(values, starts=None):
+    """NaN-skipping expanding mean that restarts wherever starts is True."""
+    values = as_float_array(values)
+    if starts is None:
+        starts = np.zeros(values.shape[0], dtype=np.bool_)
+    out = np.empty_like(values)
+    _expanding_mean_kernel(values, np.ascontiguousarray(starts, dtype=np.bool_), out)
+    return out
+
+# Usage Example
+if __name__ == "__main__":
+    import pandas as pd
+    rng = np.random.default_rng(0)
+    n = 10000
+    data = pd.DataFrame({
+        'Trade_Limit': rng.uniform(100, 5000, n), 'ADV20': rng.uniform(1e4, 1e6, n),
+        'Volatility': rng.uniform(0.005, 0.05, n), 'Previous_Close': rng.uniform(10, 200, n), 'Close': rng.uniform(10, 200, n),
+    })
+    data.loc[rng.choice(n, 50, replace=False), 'Volatility'] = np.nan
+    reference = (
+        0.2 * ((data['Trade_Limit'] / data['ADV20']) ** 0.7) * data['Previous_Close'] * data['Volatility'] +
+        0.2 * ((data['Trade_Limit'] / data['ADV20']) ** 0.7) * data['Close'] * data['Volatility']
+    )
+    costs, total = fused_slippage_cost(data['Trade_Limit'], data['ADV20'], data['Volatility'], data['Previous_Close'], data['Close'], 0.2, 0.7)
+    assert np.allclose(costs, reference, rtol=1e-12, equal_nan=True) and np.isclose(total, reference.sum(), rtol=1e-12)
+    position_size = (data['Trade_Limit'] * data['Close']).to_numpy(copy=True)
+    trade_limit = data['Trade_Limit'].to_numpy(copy=True)
+    scale_to_cap(position_size, trade_limit, 5000000)
+    scale_factor = 5000000 / (data['Trade_Limit'] * data['Close']).sum()
+    assert np.allclose(position_size, data['Trade_Limit'] * data['Close'] * scale_factor) and np.allclose(trade_limit, data['Trade_Limit'] * scale_factor)
+    groups = np.repeat(np.arange(n // 10), 10)
+    starts = np.r_[True, groups[1:] != groups[:-1]]
+    reference = data.groupby(groups)['Volatility'].transform(lambda s: s.expanding(min_periods=1).mean())
+    assert np.allclose(expanding_mean(data['Volatility'], starts), reference, rtol=1e-12, equal_nan=True)
+    print(f"Kernels match pandas reference ({'numba' if HAVE_NUMBA else 'numpy'} backend)")
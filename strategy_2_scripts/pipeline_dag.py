@@ -0,0 +1,102 @@
+import os
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils import artifact_fingerprint, input_fingerprint, hash_parts, step_dependencies, load_step_cache, save_step_cache
+
+class PipelineStep:
+    def __init__(self, name, number, func, inputs=(), outputs=(), params=None, resource=None):
+        self.name = name
+        self.number = number
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.resource = resource
+
+class PipelineDAG:
+    """Runs pipeline steps as a DAG: skips steps whose fingerprinted inputs are unchanged and runs independent steps concurrently.
+
+    Artifacts produced by an earlier step are fingerprinted by that step's last run stamp; all other inputs by file size and mtime,
+    with Python modules also covering every local module they import.
+    Steps sharing a resource name (e.g. matplotlib, which is not thread-safe) never run at the same time.
+    """
+    def __init__(self, cache_path, max_workers=4, profiler=None):
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.profiler = profiler
+        self.steps = []
+        self.resource_locks = {}
+
+    def add_step(self, name, number, func, inputs=(), outputs=(), params=None, resource=None):
+        self.steps.append(PipelineStep(name, number, func, inputs, outputs, params, resource))
+        if resource is not None:
+            self.resource_locks.setdefault(resource, threading.Lock())
+
+    def step_key(self, step, dependencies, cache):
+        inputs = {}
+        for artifact in step.inputs:
+            producer = dependencies[step.name].get(artifact)
+            inputs[artifact] = cache.get(producer, {}).get("stamp") if producer else input_fingerprint(artifact)
+        return hash_parts(step.params, inputs)
+
+    def is_current(self, step, key, cache):
+        cached = cache.get(step.name)
+        return cached is not None and cached.get("key") == key and all(os.path.exists(path) for path in step.outputs)
+
+    def execute(self, step):
+        with self.resource_locks[step.resource] if step.resource is not None else nullcontext():
+            if self.profiler is None:
+                step.func()
+            else:
+                with self.profiler.step(step.name, step.inputs, step.outputs):
+                    step.func()
+
+    def run(self, start=None, until=None, force=False):
+        """Runs steps numbered start..until (inclusive); steps outside the range are treated as already done."""
+        cache = load_step_cache(self.cache_path)
+        dependencies = step_dependencies(self.steps)
+        selected = {step.name for step in self.steps
+                    if (start is None or step.number >= start) and (until is None or step.number <= until)}
+        done = {step.name for step in self.steps if step.name not in selected}
+        pending = [step for step in self.steps if step.name in selected]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [step for step in pending if set(dependencies[step.name].values()) <= done]
+                while ready:
+                    step = ready.pop(0)
+                    pending.remove(step)
+                    key = self.step_key(step, dependencies, cache)
+                    if not force and self.is_current(step, key, cache):
+                        print(f"Step {step.number} ({step.name}) is up to date, skipping.")
+                        done.add(step.name)
+                        ready = [step for step in pending if set(dependencies[step.name].values()) <= done]
+                        continue
+                    running[executor.submit(self.execute, step)] = (step, key)
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Unresolvable step dependencies: {[step.name for step in pending]}")
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step, key = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        save_step_cache(self.cache_path, cache)
+                        raise
+                    stamp = hash_parts(key, [artifact_fingerprint(path) for path in step.outputs])
+                    cache[step.name] = {"key": key, "stamp": stamp}
+                    save_step_cache(self.cache_path, cache)
+                    done.add(step.name)
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    dag = PipelineDAG(os.path.join(base_dir, "strategy_2", "pipeline_cache.json"))
+    dag.add_step("a", 1, lambda: print("step a"), outputs=[os.path.join(base_dir, "strategy_2")])
+    dag.add_step("b", 2, lambda: print("step b"), inputs=[os.path.join(base_dir, "strategy_2")])
+    dag.run()
@@ -0,0 +1,136 @@
+import os
+import time
+import cProfile
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from utils import artifact_size, profile_file_name, write_profile_report
+
+class Profiler:
+    """Collects per-step and per-function telemetry: wall and CPU time, traced memory peak, rows and files in/out, and optional cProfile dumps.
+
+    Steps get one record each; functions wrapped with profiled/profile_block are aggregated by name.
+    tracemalloc peaks are process-wide, so steps running concurrently share them.
+    """
+    def __init__(self, enabled=True, profile_dir=None, trace_memory=True):
+        self.enabled = enabled
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory and enabled
+        self.records = []
+        self.functions = {}
+        self.lock = threading.Lock()
+        self.profile_lock = threading.Lock()
+        self.local = threading.local()
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def current_record(self):
+        stack = getattr(self.local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def step(self, name, files_read=(), files_written=()):
+        if not self.enabled:
+            yield None
+            return
+        record = {"name": name, "thread": threading.current_thread().name,
+                  "started_at": datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                  "rows_in": 0, "rows_out": 0, "calls": 1, "profile_path": None}
+        record["files_read"], record["bytes_read"] = artifact_size(files_read)
+        self.local.stack = getattr(self.local, "stack", []) + [record]
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile() if self.profile_dir else None
+        with self.profile_lock if profile else nullcontext():
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            if profile:
+                profile.enable()
+            try:
+                yield record
+            finally:
+                if profile:
+                    profile.disable()
+                record["wall_time"] = time.perf_counter() - wall_start
+                record["cpu_time"] = time.thread_time() - cpu_start
+                if profile:
+                    record["profile_path"] = os.path.join(self.profile_dir, profile_file_name(name))
+                    profile.dump_stats(record["profile_path"])
+        record["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20 if self.trace_memory else None
+        record["files_written"], record["bytes_written"] = artifact_size(files_written)
+        self.local.stack = self.local.stack[:-1]
+        with self.lock:
+            self.records.append(record)
+
+    @contextmanager
+    def function(self, name):
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            with self.lock:
+                totals = self.functions.setdefault(name, {"name": name, "calls": 0, "wall_time": 0.0, "cpu_time": 0.0})
+                totals["calls"] += 1
+                totals["wall_time"] += wall_time
+                totals["cpu_time"] += cpu_time
+
+    def record_rows(self, rows_in=0, rows_out=0):
+        record = self.current_record()
+        if record is not None:
+            record["rows_in"] += rows_in
+            record["rows_out"] += rows_out
+
+    def report(self):
+        return self.records + sorted(self.functions.values(), key=lambda totals: -totals["wall_time"])
+
+    def save_report(self, json_path, csv_path=None):
+        write_profile_report(self.report(), json_path, csv_path)
+
+_profiler = Profiler(enabled=False)
+_disabled_block = nullcontext()
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
+
+def get_profiler():
+    return _profiler
+
+def profile_block(name):
+    return _profiler.function(name) if _profiler.enabled else _disabled_block
+
+def profiled(name=None):
+    """Decorator timing every call of a hot function under the active profiler; a single attribute check when profiling is off."""
+    def decorator(func):
+        label = name or func.__qualname__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with _profiler.function(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_rows(rows_in=0, rows_out=0):
+    if _profiler.enabled:
+        _profiler.record_rows(rows_in, rows_out)
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    profiler = Profiler(profile_dir=os.path.join(base_dir, "strategy_2", "profiles"))
+    set_profiler(profiler)
+
+    @profiled()
+    def build_rows(n):
+        return [i * i for i in range(n)]
+
+    with profiler.step("example"):
+        rows = build_rows(100000)
+        record_rows(rows_out=len(rows))
+    profiler.save_report(os.path.join(base_dir, "strategy_2", "run_report.json"), os.path.join(base_dir, "strategy_2", "run_report.csv"))
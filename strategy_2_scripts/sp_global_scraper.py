@@ -1,5 +1,6 @@
 import pandas as pd
 from datetime import datetime
+from profiler import profiled
 from utils import search_press_website, extract_table_from_url
 
 class SPGlobalScraper:
@@ -11,6 +12,7 @@ class SPGlobalScraper:
     def _get_years_in_period(self):
         return list(range(self.start_date.year, self.end_date.year + 1))
     
+    @profiled()
     def extract_tables_from_all_years(self):
         combined_df = pd.DataFrame() 
         for year in self.years:
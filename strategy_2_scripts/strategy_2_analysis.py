@@ -1,20 +1,46 @@
 import pandas as pd
 import os
-from utils import calculate_group_stats, save_pdf_plots, save_statistics_summary
+from profiler import profile_block, record_rows
+from group_bootstrap import GroupBootstrap
+from streaming_stats import StreamingGroupStats
+from utils import calculate_group_stats, save_pdf_plots, save_statistics_summary, read_table
+
+ANALYSIS_COLUMNS = ['strategy_2_n', 'Index_Name', 'Event_Type', 'strategy_2_md', 'strategy_2_net']
 
 class StrategyAnalysis:
-    def __init__(self, data_path, output_pdf_path, output_stats_path):
+    def __init__(self, data_path, output_pdf_path, output_stats_path, bootstrap_resamples=0, bootstrap_seed=0, stream_chunksize=None):
         self.data_path = data_path
         self.output_pdf_path = output_pdf_path
         self.output_stats_path = output_stats_path
+        self.bootstrap_resamples = bootstrap_resamples
+        self.bootstrap_seed = bootstrap_seed
+        self.stream_chunksize = stream_chunksize
 
     def load_data(self):
-        self.data = pd.read_csv(self.data_path)
+        # Streamed statistics never hold the whole table, so it is only loaded when the bootstrap needs it
+        if self.stream_chunksize and not self.bootstrap_resamples:
+            self.data = None
+            return
+        self.data = read_table(self.data_path, 'returns', columns=ANALYSIS_COLUMNS)
     
     def analyze_and_save(self):
-        stats_summary = calculate_group_stats(self.data)
-        save_pdf_plots(self.data, self.output_pdf_path)
+        if self.stream_chunksize:
+            with profile_block("streaming_group_stats"):
+                stats_summary = StreamingGroupStats("strategy_2", chunksize=self.stream_chunksize).run([self.data_path])
+        else:
+            with profile_block("calculate_group_stats"):
+                stats_summary = calculate_group_stats(self.data)
+        if self.bootstrap_resamples:
+            with profile_block("bootstrap"):
+                intervals = GroupBootstrap(self.data, "strategy_2", self.bootstrap_resamples, seed=self.bootstrap_seed).run()
+            stats_summary = stats_summary.merge(intervals, on=['strategy_2_n', 'Index_Name', 'Event_Type'], how='left')
+        if self.data is None:
+            print(f"Skipping KDE plots for streamed statistics; {self.output_pdf_path} was not updated")
+        else:
+            with profile_block("save_pdf_plots"):
+                save_pdf_plots(self.data, self.output_pdf_path)
         save_statistics_summary(stats_summary, self.output_stats_path)
+        record_rows(len(self.data) if self.data is not None else 0, len(stats_summary))
 
 # Usage Example:
 if __name__ == "__main__":
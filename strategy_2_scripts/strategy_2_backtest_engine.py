@@ -1,34 +1,51 @@
 import os
 import pandas as pd
 import numpy as np
-from utils import calculate_slippage_cost, get_sofr_rate, get_sofr_rates
+from kernels import scale_to_cap
+from fill_models import FillModel
+from cost_models import FinancingCost, PerShareCommission, PowerLawImpact, evaluate_cost_models
+from profiler import profiled, record_rows
+from utils import backtest_state_path, load_backtest_state, read_table, save_backtest_state, update_backtest_state, write_backtest_state
+
+BACKTEST_COLUMNS = ['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume', 'ADV20', 'Volatility', 'Previous_Close', 'Previous_Close_7D']
+HEDGE_COLUMNS = ['Close_ETF', 'Previous_Close_ETF', 'Previous_Close_7D_ETF', 'ADV20_ETF', 'Volatility_ETF', 'Hedge_Ratio']
 
 class BacktestEngine:
-    def __init__(self, trade_log_file_path, sofr_file_path, output_file_path, strategy_type, portfolio_cap=5000000, alpha=0.2, beta=0.7):
+    def __init__(self, trade_log_file_path, sofr_file_path, output_file_path, strategy_type, portfolio_cap=5000000, alpha=0.2, beta=0.7, fill_model=None, participation_rate=0.01,
+                 transaction_cost_models=None, slippage_models=None, financing_model=None, hedge=False):
         self.trade_log_file_path = trade_log_file_path
         self.sofr_file_path = sofr_file_path
         self.output_file_path = output_file_path
         self.strategy_type = strategy_type
         self.portfolio_cap = portfolio_cap
+        self.participation_rate = participation_rate
         self.alpha = alpha
         self.beta = beta
+        self.fill_model = fill_model or FillModel()
+        self.transaction_cost_models = transaction_cost_models or [PerShareCommission(0.01, sides=2)]
+        self.slippage_models = slippage_models or [PowerLawImpact(alpha, beta)]
+        self.financing_model = financing_model or (FinancingCost(0.015, days_back=1) if strategy_type == "long" else FinancingCost(0.01, days_back=6))
+        self.hedge = hedge
         self.cumulative_net_pnl = 0
         self.portfolio_values = []
-        self.trade_log_df = pd.read_csv(self.trade_log_file_path)
-        self.sofr_df = pd.read_csv(self.sofr_file_path)
-        self.sofr_df['DATE'] = pd.to_datetime(self.sofr_df['DATE']).sort_values().reset_index(drop=True)
+        self.trade_log_df = read_table(self.trade_log_file_path, 'trade_log', columns=BACKTEST_COLUMNS + (HEDGE_COLUMNS if hedge else []))
+        entry_column = 'Previous_Close' if self.strategy_type == "long" else 'Previous_Close_7D'
+        self.side = 1 if self.strategy_type == "long" else -1
+        self.trade_log_df = self.fill_model.apply(self.trade_log_df, entry_column, side=self.side)
+        if self.hedge:
+            self.prepare_hedge(entry_column)
+        self.sofr_df = read_table(self.sofr_file_path, 'sofr')
+        self.sofr_df = self.sofr_df.dropna(subset=['DATE', 'SOFR']).sort_values(by='DATE').reset_index(drop=True)
 
+    @profiled()
     def run_backtest(self):
-        unique_dates = sorted(self.trade_log_df['Date'].unique())
-        for date in unique_dates:
-            daily_trades = self.trade_log_df[self.trade_log_df['Date'] == date].copy()
+        for date, daily_trades in self.trade_log_df.groupby('Date', sort=True):
+            daily_trades = daily_trades.copy()
             daily_trades = self.process_daily_trades(daily_trades) 
-            if self.strategy_type == "long":
-                sofr_rate = get_sofr_rate(date, self.sofr_df)
-                overnight_cost = self.calculate_long_overnight_cost(sofr_rate, daily_trades['Position_Size'].sum())
-            elif self.strategy_type == "short":
-                sofr_rates = get_sofr_rates(date, self.sofr_df, days_back=6)
-                overnight_cost = self.calculate_short_overnight_cost(sofr_rates, daily_trades['Position_Size'].sum())
+            overnight_cost = self.financing_model.daily_cost(date, self.sofr_df, daily_trades['Position_Size'].sum())
+            if self.hedge:
+                hedge_overnight_cost = self.financing_model.daily_cost(date, self.sofr_df, daily_trades['Hedge_Notional'].abs().sum())
+                overnight_cost += hedge_overnight_cost
             daily_net_pnl = daily_trades['RGL'].sum() - daily_trades['Transaction_Costs'].sum() - \
                             daily_trades['Slippage_Cost'].sum() - overnight_cost
             self.cumulative_net_pnl += daily_net_pnl
@@ -42,46 +59,100 @@ class BacktestEngine:
                 "Overnight_Cost": overnight_cost,
                 "Cumulative_Net_PnL": self.cumulative_net_pnl
             })
+            if self.hedge:
+                self.portfolio_values[-1].update({
+                    "Hedge_Notional": daily_trades['Hedge_Notional'].sum(),
+                    "Hedge_PnL": daily_trades['Hedge_PnL'].sum(),
+                    "Hedge_Transaction_Costs": daily_trades['Hedge_Transaction_Costs'].sum(),
+                    "Hedge_Slippage_Cost": daily_trades['Hedge_Slippage_Cost'].sum(),
+                    "Hedge_Overnight_Cost": hedge_overnight_cost,
+                    "Unhedged_Skipped": int(daily_trades['Unhedged_Skipped'].sum())
+                })
+        record_rows(len(self.trade_log_df), len(self.portfolio_values))
 
     def process_daily_trades(self, daily_trades):
-        daily_trades['Size_Limit'] = daily_trades['ADV20'] * 0.01
-        daily_trades['Trade_Limit'] = daily_trades[['Size_Limit', 'Volume']].min(axis=1)
-        daily_trades['Position_Size'] = daily_trades['Trade_Limit'] * (daily_trades['Previous_Close'] if self.strategy_type == "long" else daily_trades['Previous_Close_7D'])
+        daily_trades['Size_Limit'] = daily_trades['ADV20'] * self.participation_rate
+        # A NaN ADV20 (indicator still warming up) means no size is known, so the trade is skipped rather than sized at the full day's Volume
+        daily_trades['Trade_Limit'] = daily_trades[['Size_Limit', 'Volume']].min(axis=1).where(daily_trades['Filled'] & daily_trades['Size_Limit'].notna(), 0.0)
+        daily_trades['Position_Size'] = daily_trades['Trade_Limit'] * daily_trades['Entry_Price']
         
-        total_position_size = daily_trades['Position_Size'].sum()
-        if total_position_size > self.portfolio_cap:
-            scale_factor = self.portfolio_cap / total_position_size
-            daily_trades['Position_Size'] *= scale_factor
-            daily_trades['Trade_Limit'] *= scale_factor
+        position_size = daily_trades['Position_Size'].to_numpy(dtype='float64', copy=True)
+        trade_limit = daily_trades['Trade_Limit'].to_numpy(dtype='float64', copy=True)
+        scale_to_cap(position_size, trade_limit, self.portfolio_cap)
+        daily_trades['Position_Size'] = position_size
+        daily_trades['Trade_Limit'] = trade_limit
 
-        daily_trades['Sale_Proceeds'] = daily_trades['Trade_Limit'] * daily_trades['Close']
+        daily_trades['Sale_Proceeds'] = daily_trades['Trade_Limit'] * daily_trades['Exit_Price']
         if self.strategy_type == "short":
             daily_trades['RGL'] = daily_trades['Position_Size'] - daily_trades['Sale_Proceeds']
         else:
             daily_trades['RGL'] = daily_trades['Sale_Proceeds'] - daily_trades['Position_Size']
 
-        daily_trades['Transaction_Costs'] = 2 * daily_trades['Trade_Limit'] * 0.01
-        daily_trades['Slippage_Cost'] = calculate_slippage_cost(daily_trades, self.alpha, self.beta)
+        daily_trades['Transaction_Costs'] = evaluate_cost_models(self.transaction_cost_models, daily_trades)
+        daily_trades['Slippage_Cost'] = evaluate_cost_models(self.slippage_models, daily_trades)
+        if self.hedge:
+            daily_trades = self.add_hedge_leg(daily_trades)
         return daily_trades
 
-    def calculate_long_overnight_cost(self, sofr_rate, total_position_size):
-        if sofr_rate is not None:
-            long_overnight_rate = (sofr_rate / 100 + 0.015) * (1 / 365)
-            return long_overnight_rate * total_position_size
-        else:
-            print("No SOFR rate found.")
-            return 0
+    def prepare_hedge(self, entry_column):
+        """Enters each hedge at the ETF close of the stock's entry session; rows with no hedge ratio or ETF data are not traded."""
+        if self.fill_model.entry != "reference" or self.fill_model.exit != "close" or self.fill_model.stop_loss is not None or self.fill_model.take_profit is not None:
+            raise ValueError("Hedged backtests need reference entries and Close exits; only ETF closes are stored, so the hedge cannot follow an intraday stock fill")
+        missing = [column for column in HEDGE_COLUMNS if column not in self.trade_log_df.columns]
+        if missing:
+            raise ValueError(f"{self.trade_log_file_path} has no {', '.join(missing)}; rerun steps 6 and 9 before a hedged backtest")
+        self.trade_log_df['Hedge_Entry_Price'] = self.trade_log_df[f'{entry_column}_ETF']
+        self.trade_log_df['Hedge_Ratio'] = self.trade_log_df['Hedge_Ratio'].astype('float64')
+        hedge_inputs = self.trade_log_df[['Hedge_Ratio', 'Hedge_Entry_Price', 'Close_ETF', 'ADV20_ETF', 'Volatility_ETF']]
+        self.trade_log_df['Unhedged_Skipped'] = self.trade_log_df['Filled'] & hedge_inputs.isna().any(axis=1)
+        self.trade_log_df['Filled'] &= ~self.trade_log_df['Unhedged_Skipped']
+        print(f"Skipping {int(self.trade_log_df['Unhedged_Skipped'].sum())} of {len(self.trade_log_df)} trades with no hedge ratio or ETF data in {self.trade_log_file_path}")
 
-    def calculate_short_overnight_cost(self, sofr_rates, total_position_size):
-        if sofr_rates:
-            return sofr_rates * total_position_size
-        else:
-            print("No SOFR rates found for the past 7 days.")
-            return 0
+    def add_hedge_leg(self, daily_trades):
+        """Offsets each position with Hedge_Ratio times its notional in the event's ETF, costed with the stock leg's cost models."""
+        daily_trades['Hedge_Notional'] = daily_trades['Hedge_Ratio'].fillna(0.0) * daily_trades['Position_Size']
+        hedge_trades = pd.DataFrame({
+            'Trade_Limit': (daily_trades['Hedge_Notional'] / daily_trades['Hedge_Entry_Price']).abs().fillna(0.0),
+            'Entry_Price': daily_trades['Hedge_Entry_Price'],
+            'Exit_Price': daily_trades['Close_ETF'],
+            'ADV20': daily_trades['ADV20_ETF'],
+            'Volatility': daily_trades['Volatility_ETF'],
+        }, index=daily_trades.index)
+        traded = hedge_trades['Trade_Limit'] > 0
+        daily_trades['Hedge_PnL'] = (-self.side * daily_trades['Hedge_Notional'] * (daily_trades['Close_ETF'] / daily_trades['Hedge_Entry_Price'] - 1)).where(traded, 0.0)
+        daily_trades['Hedge_Transaction_Costs'] = np.where(traded, evaluate_cost_models(self.transaction_cost_models, hedge_trades), 0.0)
+        daily_trades['Hedge_Slippage_Cost'] = np.where(traded, evaluate_cost_models(self.slippage_models, hedge_trades), 0.0)
+        daily_trades['RGL'] += daily_trades['Hedge_PnL']
+        daily_trades['Transaction_Costs'] += daily_trades['Hedge_Transaction_Costs']
+        daily_trades['Slippage_Cost'] += daily_trades['Hedge_Slippage_Cost']
+        return daily_trades
+
+    def run_incremental(self):
+        """Backtests only sessions after the last checkpoint, appends them to the results file and updates the saved state."""
+        state_path = backtest_state_path(self.output_file_path)
+        state = load_backtest_state(state_path)
+        if state is not None:
+            self.cumulative_net_pnl = state['cumulative_net_pnl']
+            self.trade_log_df = self.trade_log_df[self.trade_log_df['Date'] > np.datetime64(state['last_date'])]
+        self.portfolio_values = []
+        self.run_backtest()
+        if not self.portfolio_values:
+            print(f"No new sessions since the last checkpoint for {self.output_file_path}")
+            return state
+        new_results = pd.DataFrame(self.portfolio_values)
+        daily_pnl = new_results['RGL'] - new_results['Transaction_Costs'] - new_results['Overnight_Cost'] - new_results['Slippage_Cost']
+        state = update_backtest_state(state, new_results['Date'], daily_pnl, new_results['Total_Position_Size'], self.cumulative_net_pnl)
+        append = state['num_days'] > len(new_results) and os.path.exists(self.output_file_path)
+        new_results.to_csv(self.output_file_path, mode='a' if append else 'w', header=not append, index=False)
+        save_backtest_state(state_path, state)
+        print(f"Appended {len(new_results)} sessions to {self.output_file_path}")
+        return state
 
     def save_results(self):
         portfolio_values_df = pd.DataFrame(self.portfolio_values)
         portfolio_values_df.to_csv(self.output_file_path, index=False)
+        # A full run replaces the results file, so its checkpoint must be rebuilt too or --incremental would resume from the old run
+        write_backtest_state(self.output_file_path, portfolio_values_df)
         print(f"Portfolio backtest results saved to {self.output_file_path}")
 
 # Usage Example
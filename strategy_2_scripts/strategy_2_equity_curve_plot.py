@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from utils import read_table
 
 class EquityCurvePlotter:
     def __init__(self, backtest_results_path, output_image_path, title="Equity Curve"):
@@ -9,8 +10,7 @@ class EquityCurvePlotter:
         self.title = title
 
     def load_data(self):
-        self.df = pd.read_csv(self.backtest_results_path)
-        self.df['Date'] = pd.to_datetime(self.df['Date'])
+        self.df = read_table(self.backtest_results_path, 'backtest_results', columns=['Date', 'Cumulative_Net_PnL'])
         self.df = self.df.sort_values(by='Date')
         print(f"Data loaded and sorted by date from {self.backtest_results_path}")
 
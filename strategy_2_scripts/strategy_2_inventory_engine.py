@@ -0,0 +1,146 @@
+import os
+import heapq
+import pandas as pd
+import numpy as np
+from cost_models import FinancingCost, PerShareCommission, PowerLawImpact, evaluate_cost_models
+from utils import read_table, session_financing_factors, write_backtest_state
+from trading_calendar import get_trading_calendar
+
+INVENTORY_COLUMNS = ['Date', 'Ticker', 'Close', 'ADV20', 'Volatility', 'Previous_Close', 'Previous_Close_7D',
+                     'Previous_ADV20', 'Previous_ADV20_7D', 'Previous_Volume', 'Previous_Volume_7D']
+# Entry price, entry-session ADV20 and Volume, and sessions held for each side
+ENTRY_COLUMNS = {"long": ("Previous_Close", "Previous_ADV20", "Previous_Volume", 1), "short": ("Previous_Close_7D", "Previous_ADV20_7D", "Previous_Volume_7D", 6)}
+
+class InventoryEngine:
+    def __init__(self, trade_log_file_path, sofr_file_path, output_file_path, strategy_type, portfolio_cap=5000000, alpha=0.2, beta=0.7, participation_rate=0.01,
+                 transaction_cost_models=None, slippage_models=None, financing_model=None):
+        self.trade_log_file_path = trade_log_file_path
+        self.sofr_file_path = sofr_file_path
+        self.output_file_path = output_file_path
+        self.strategy_type = strategy_type
+        self.portfolio_cap = portfolio_cap
+        self.participation_rate = participation_rate
+        self.alpha = alpha
+        self.beta = beta
+        self.transaction_cost_models = transaction_cost_models or [PerShareCommission(0.01, sides=2)]
+        self.slippage_models = slippage_models or [PowerLawImpact(alpha, beta)]
+        self.financing_model = financing_model or FinancingCost(0.015 if strategy_type == "long" else 0.01)
+        if self.financing_model.days_back != 1:
+            # Financing already accrues on every session a position is open, so charging days_back fixings per session would double count
+            raise ValueError(f"InventoryEngine accrues financing per held session; days_back must be 1, not {self.financing_model.days_back}")
+        self.calendar = get_trading_calendar()
+        self.cumulative_net_pnl = 0
+        self.portfolio_values = []
+        self.trade_log_df = read_table(self.trade_log_file_path, 'trade_log', columns=INVENTORY_COLUMNS)
+        self.sofr_df = read_table(self.sofr_file_path, 'sofr')
+        self.sofr_df = self.sofr_df.dropna(subset=['DATE', 'SOFR']).sort_values(by='DATE').reset_index(drop=True)
+
+    def build_positions(self):
+        """One position per trade-log row, entered at the close `holding_sessions` before its session and sized from that entry session's ADV20 and Volume."""
+        entry_column, adv20_column, volume_column, holding_sessions = ENTRY_COLUMNS[self.strategy_type]
+        trades = self.trade_log_df.dropna(subset=[entry_column, 'Close'])
+        unfillable = trades[adv20_column].isna()
+        if unfillable.any():
+            print(f"Skipping {int(unfillable.sum())} trades with no {adv20_column} in {self.trade_log_file_path}")
+            trades = trades[~unfillable]
+        exit_session = self.calendar.session_index(trades['Date'])
+        return {
+            'entry_session': exit_session - holding_sessions,
+            'exit_session': exit_session,
+            'quantity': np.fmin(trades[adv20_column].to_numpy(dtype='float64') * self.participation_rate, trades[volume_column].to_numpy(dtype='float64')),
+            'entry_price': trades[entry_column].to_numpy(dtype='float64'),
+            'exit_price': trades['Close'].to_numpy(dtype='float64'),
+            'adv20': trades['ADV20'].to_numpy(dtype='float64'),
+            'volatility': trades['Volatility'].to_numpy(dtype='float64'),
+            'scale': np.zeros(len(trades)),
+        }
+
+    def run_backtest(self):
+        positions = self.build_positions()
+        schedule = [(session, 1, i) for i, session in enumerate(positions['entry_session'])]
+        schedule += [(session, 0, i) for i, session in enumerate(positions['exit_session'])]
+        heapq.heapify(schedule)
+        if not schedule:
+            print(f"No positions to backtest in {self.trade_log_file_path}")
+            return
+        sessions = np.arange(schedule[0][0], positions['exit_session'].max() + 1)
+        dates = self.calendar.session_date(sessions)
+        financing = session_financing_factors(dates, self.sofr_df, self.financing_model.spread)
+        gross_exposure = 0.0
+        open_positions = 0
+        for offset, session in enumerate(sessions):
+            overnight_cost = gross_exposure * financing[offset]
+            entries, exits = [], []
+            while schedule and schedule[0][0] == session:
+                _, is_entry, i = heapq.heappop(schedule)
+                (entries if is_entry else exits).append(i)
+            daily = self.close_positions(positions, np.array(exits, dtype=np.int64))
+            gross_exposure -= daily['Released_Exposure']
+            open_positions -= daily['Closed_Positions']
+            opened_exposure, opened = self.open_positions(positions, np.array(entries, dtype=np.int64), gross_exposure)
+            gross_exposure += opened_exposure
+            open_positions += opened
+            if open_positions == 0 and not entries and not exits:
+                continue
+            daily_net_pnl = daily['RGL'] - daily['Transaction_Costs'] - daily['Slippage_Cost'] - overnight_cost
+            self.cumulative_net_pnl += daily_net_pnl
+            self.portfolio_values.append({
+                "Date": dates[offset],
+                "Open_Positions": open_positions,
+                "Total_Position_Size": gross_exposure,
+                "Total_Sale_Proceeds": daily['Sale_Proceeds'],
+                "RGL": daily['RGL'],
+                "Transaction_Costs": daily['Transaction_Costs'],
+                "Slippage_Cost": daily['Slippage_Cost'],
+                "Overnight_Cost": overnight_cost,
+                "Cumulative_Net_PnL": self.cumulative_net_pnl
+            })
+
+    def open_positions(self, positions, entries, gross_exposure):
+        """Scales the session's new entries pro rata so concurrent gross exposure stays within portfolio_cap."""
+        requested = positions['quantity'][entries] * positions['entry_price'][entries]
+        total_requested = np.nansum(requested)
+        if total_requested <= 0:
+            return 0.0, 0
+        scale = min(1.0, max(self.portfolio_cap - gross_exposure, 0.0) / total_requested)
+        positions['scale'][entries] = scale
+        return total_requested * scale, int((requested > 0).sum()) if scale > 0 else 0
+
+    def close_positions(self, positions, exits):
+        held = exits[positions['scale'][exits] * positions['quantity'][exits] > 0]
+        trades = pd.DataFrame({
+            'Trade_Limit': positions['quantity'][held] * positions['scale'][held],
+            'Entry_Price': positions['entry_price'][held],
+            'Exit_Price': positions['exit_price'][held],
+            'ADV20': positions['adv20'][held],
+            'Volatility': positions['volatility'][held],
+        })
+        position_size = trades['Trade_Limit'] * trades['Entry_Price']
+        sale_proceeds = trades['Trade_Limit'] * trades['Exit_Price']
+        rgl = sale_proceeds - position_size if self.strategy_type == "long" else position_size - sale_proceeds
+        return {
+            "Released_Exposure": np.nansum(position_size),
+            "Closed_Positions": len(held),
+            "Sale_Proceeds": np.nansum(sale_proceeds),
+            "RGL": np.nansum(rgl),
+            "Transaction_Costs": np.nansum(evaluate_cost_models(self.transaction_cost_models, trades)),
+            "Slippage_Cost": np.nansum(evaluate_cost_models(self.slippage_models, trades)),
+        }
+
+    def save_results(self):
+        portfolio_values_df = pd.DataFrame(self.portfolio_values)
+        portfolio_values_df.to_csv(self.output_file_path, index=False)
+        write_backtest_state(self.output_file_path, portfolio_values_df)
+        print(f"Inventory backtest results saved to {self.output_file_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    inventory_engine = InventoryEngine(
+        os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_trade_log.csv"),
+        os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"),
+        os.path.join(base_dir, "strategy_2", "strat_2_SP400_IR7D_inventory_results.csv"),
+        "short"
+    )
+    inventory_engine.run_backtest()
+    inventory_engine.save_results()
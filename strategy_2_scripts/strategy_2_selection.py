@@ -1,27 +1,15 @@
 import os
-from utils import load_data, filter_candidates
+from utils import load_data, select_reversion_candidates
 
 class MeanReversionStrategy:
-    def __init__(self, data_path, min_count_threshold=50):
-        self.data = load_data(output_stats_path)
+    def __init__(self, data_path, min_count_threshold=50, max_p_value=None):
+        self.data = load_data(data_path)
         self.min_count_threshold = min_count_threshold
+        self.max_p_value = max_p_value
 
     def identify_reversion_candidates(self):
         """Identifies both long and short reversion candidates."""
-        long_day1_candidates = filter_candidates(self.data, strategy_n=1, net_mean_sign='negative')
-        short_day1_candidates = filter_candidates(self.data, strategy_n=1, net_mean_sign='positive')
-        long_reversion_confirmed = self._confirm_reversion(long_day1_candidates, self.data, positive=True)
-        short_reversion_confirmed = self._confirm_reversion(short_day1_candidates, self.data, positive=False)
-        long_reversion_confirmed = long_reversion_confirmed[long_reversion_confirmed['count'] >= self.min_count_threshold]
-        short_reversion_confirmed = short_reversion_confirmed[short_reversion_confirmed['count'] >= self.min_count_threshold]
-        return long_reversion_confirmed, short_reversion_confirmed
-
-    def _confirm_reversion(self, initial_candidates, data, positive=True):
-        """Confirms mean reversion by checking subsequent day performance."""
-        condition = data['mean'] > 0 if positive else data['mean'] < 0
-        confirmed = data[(data['strategy_2_n'] > 1) & condition]
-        return confirmed.merge(initial_candidates[['Index_Name', 'Event_Type']].drop_duplicates(), 
-                               on=['Index_Name', 'Event_Type'])
+        return select_reversion_candidates(self.data, self.min_count_threshold, self.max_p_value)
 
     def save_results(self, long_candidates, short_candidates, long_output_path, short_output_path):
         """Saves confirmed long and short candidates to CSV files."""
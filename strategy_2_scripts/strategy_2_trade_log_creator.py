@@ -1,22 +1,35 @@
 import os
 import pandas as pd
+from profiler import record_rows
+from utils import SCAN_CELL_COLUMNS, read_table
 
 class TradeLogCreator:
-    def __init__(self, input_file_path, output_file_path, exclude_indices, strategy_n, event_type):
+    def __init__(self, input_file_path, output_file_path, exclude_indices, strategy_n=None, event_type=None, candidates_path=None, side=None):
         self.input_file_path = input_file_path
         self.output_file_path = output_file_path
         self.exclude_indices = exclude_indices
         self.strategy_n = strategy_n
         self.event_type = event_type
+        self.candidates_path = candidates_path
+        self.side = side
 
     def create_trade_log(self):
-        df = pd.read_csv(self.input_file_path)
+        df = read_table(self.input_file_path, 'returns')
         df_filtered = df[~df['Index_Name'].isin(self.exclude_indices)]
-        trade_log = df_filtered[
-            (df_filtered['strategy_2_n'] == self.strategy_n) & 
-            (df_filtered['Event_Type'] == self.event_type)
-        ]
+        if self.candidates_path:
+            # Rows of every cell the scanner selected for this side instead of one hand-picked (strategy_n, Event_Type)
+            candidates = read_table(self.candidates_path, 'candidates')
+            cells = candidates.loc[candidates['Selected'] & (candidates['Side'] == self.side), SCAN_CELL_COLUMNS]
+            in_cells = pd.MultiIndex.from_frame(df_filtered[SCAN_CELL_COLUMNS].astype(object)).isin(
+                pd.MultiIndex.from_frame(cells.astype(object)))
+            trade_log = df_filtered[in_cells & df_filtered['strategy_2_n'].notna()]
+        else:
+            trade_log = df_filtered[
+                (df_filtered['strategy_2_n'] == self.strategy_n) & 
+                (df_filtered['Event_Type'] == self.event_type)
+            ]
         trade_log.to_csv(self.output_file_path, index=False)
+        record_rows(len(df), len(trade_log))
         print(f"Trade log created and saved to {self.output_file_path}")
 
 # Example Usage
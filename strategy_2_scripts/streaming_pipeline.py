@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from benchmark_series import BenchmarkSeries
+from price_data_updater import PriceDataUpdater
+from historical_data_processor import HistoricalDataProcessor
+
+_worker = {}
+
+def init_event_worker(historical_data_folder, press_release_file_path, log_file_path, benchmark_map):
+    _worker['updater'] = PriceDataUpdater(historical_data_folder, press_release_file_path, log_file_path, BenchmarkSeries(historical_data_folder, benchmark_map))
+
+def process_event(file_name):
+    return file_name, _worker['updater'].update_file(file_name)
+
+def init_returns_worker(historical_data_folder, benchmark_map, indicators):
+    _worker['processor'] = HistoricalDataProcessor(historical_data_folder, BenchmarkSeries(historical_data_folder, benchmark_map), indicators)
+
+def process_returns(file_name):
+    _worker['processor'].process_file(file_name)
+    return file_name
+
+class StreamingPipeline:
+    def __init__(self, downloader, historical_data_folder, press_release_file_path, log_file_path, benchmarks=None, queue_size=32, max_workers=None):
+        self.downloader = downloader
+        self.historical_data_folder = historical_data_folder
+        self.press_release_file_path = press_release_file_path
+        self.log_file_path = log_file_path
+        self.benchmarks = benchmarks or BenchmarkSeries(historical_data_folder)
+        self.queue_size = queue_size
+        self.max_workers = max_workers
+
+    def produce(self, events):
+        try:
+            for file_path in self.downloader.iter_downloads():
+                events.put(file_path)
+        finally:
+            events.put(None)
+
+    def run(self):
+        """Downloads events on a background thread while worker processes add press release metadata to each file as it lands, then computes metrics."""
+        events = queue.Queue(maxsize=self.queue_size)
+        producer = threading.Thread(target=self.produce, args=(events,), daemon=True)
+        producer.start()
+        initargs = (self.historical_data_folder, self.press_release_file_path, self.log_file_path, self.benchmarks.benchmarks)
+        log_entries = []
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_event_worker, initargs=initargs) as executor:
+            pending = set()
+            while True:
+                file_path = events.get()
+                if file_path is None:
+                    break
+                if len(pending) >= self.queue_size:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    log_entries.extend(future.result()[1] for future in done)
+                pending.add(executor.submit(process_event, os.path.basename(file_path)))
+            log_entries.extend(future.result()[1] for future in pending)
+        producer.join()
+        with open(self.log_file_path, 'w') as log_file:
+            log_file.writelines(entry for entry in log_entries if entry)
+        print(f"Streamed {len(log_entries)} events. Log of unmatched files saved to {self.log_file_path}")
+        self.process_returns()
+
+    def process_returns(self):
+        """Step 6 once every file has landed: indicators need the whole cross-section (benchmark and ETF histories), and strategy returns need the indicators."""
+        processor = HistoricalDataProcessor(self.historical_data_folder, self.benchmarks)
+        processor.indicators.compute()
+        file_names = sorted(file_name for file_name in os.listdir(self.historical_data_folder) if file_name.endswith("_Price_Data.csv"))
+        # Benchmark files are rewritten here first so no worker reads an ETF series while another is writing it
+        benchmark_files = {f"{ticker}_Price_Data.csv" for ticker in self.benchmarks.benchmarks.values()}
+        for file_name in file_names:
+            if file_name in benchmark_files:
+                processor.process_file(file_name)
+        event_files = [file_name for file_name in file_names if file_name not in benchmark_files]
+        initargs = (self.historical_data_folder, self.benchmarks.benchmarks, processor.indicators)
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_returns_worker, initargs=initargs) as executor:
+            processed = sum(1 for _ in executor.map(process_returns, event_files, chunksize=16))
+        print(f"Processed metrics for {processed} event files in {self.historical_data_folder}")
+
+# Usage Example
+if __name__ == "__main__":
+    from ticker_data_downloader import TickerDataDownloader
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    historical_data_folder = os.path.join(base_dir, "price_data")
+    press_release_file_path = os.path.join(base_dir, "press_release_data.csv")
+    log_file_path = os.path.join(base_dir, "no_match_log.txt")
+    pipeline = StreamingPipeline(TickerDataDownloader(press_release_file_path), historical_data_folder, press_release_file_path, log_file_path)
+    pipeline.run()
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# The strategy scripts import each other as top-level modules, as they do when run from their own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Compiled kernels are cached per test session, not in the scripts' __pycache__ shared with real runs
+os.environ.setdefault("NUMBA_CACHE_DIR", tempfile.mkdtemp(prefix="numba_cache_"))
@@ -0,0 +1,36 @@
+import os
+import pandas as pd
+import pytest
+from strategy_2_backtest_engine import BACKTEST_COLUMNS, BacktestEngine
+from utils import backtest_state_path, load_backtest_state, save_backtest_state
+
+@pytest.fixture
+def paths(tmp_path):
+    trade_log = pd.DataFrame({column: [100.0] * 4 for column in BACKTEST_COLUMNS})
+    trade_log['Date'] = ['2023-06-12', '2023-06-13', '2023-06-14', '2023-06-15']
+    trade_log['Ticker'] = 'AAA'
+    trade_log['Volume'] = 1e6
+    trade_log['ADV20'] = 1e6
+    trade_log['Volatility'] = 0.02
+    trade_log['Close'] = [101.0, 99.0, 104.0, 100.5]
+    trade_log_path = os.path.join(tmp_path, "trade_log.csv")
+    trade_log.to_csv(trade_log_path, index=False)
+    sofr_path = os.path.join(tmp_path, "sofr.csv")
+    pd.DataFrame({'DATE': pd.bdate_range("2023-05-01", "2023-06-30").strftime('%Y-%m-%d'), 'SOFR': 5.0}).to_csv(sofr_path, index=False)
+    return trade_log_path, sofr_path, tmp_path
+
+def test_full_run_replaces_stale_checkpoint(paths):
+    trade_log_path, sofr_path, tmp_path = paths
+    results_path = os.path.join(tmp_path, "results.csv")
+    save_backtest_state(backtest_state_path(results_path), {'num_days': 1, 'last_date': '2023-06-12', 'cumulative_net_pnl': -1e9})
+    engine = BacktestEngine(trade_log_path, sofr_path, results_path, "long")
+    engine.run_backtest()
+    engine.save_results()
+    state = load_backtest_state(backtest_state_path(results_path))
+    incremental_path = os.path.join(tmp_path, "incremental_results.csv")
+    incremental_state = BacktestEngine(trade_log_path, sofr_path, incremental_path, "long").run_incremental()
+    assert state['last_date'] == '2023-06-15'
+    assert state == pytest.approx(incremental_state)
+    # Nothing is new since the full run, so an incremental run must not append the old sessions again
+    assert BacktestEngine(trade_log_path, sofr_path, results_path, "long").run_incremental() == pytest.approx(state)
+    assert len(pd.read_csv(results_path)) == 4
@@ -0,0 +1,15 @@
+import os
+import pandas as pd
+from benchmark_suite import BenchmarkSuite
+
+def test_benchmark_suite_smoke(tmp_path):
+    suite = BenchmarkSuite(str(tmp_path), event_counts=(60,), repeat=1)
+    results = suite.run()
+    assert len(results) == 8 and (results['Seconds'] > 0).all()
+    trade_log = pd.read_csv(os.path.join(tmp_path, "events_60", "strategy_2", "benchmark_trade_log.csv"))
+    assert len(trade_log) and (trade_log['Index_Name'] == "S&P MidCap 400").all()
+    assert trade_log['Close_ETF'].notna().all() and (trade_log['ETF_Ticker'] == "IJH").all()
+    output_path = os.path.join(tmp_path, "benchmark_results.csv")
+    suite.save_results(output_path)
+    rerun = BenchmarkSuite(str(tmp_path / "rerun"), event_counts=(60,), repeat=1, baseline_path=output_path, tolerance=100.0).run()
+    assert rerun['Baseline_Seconds'].notna().all() and not rerun['Regression'].any()
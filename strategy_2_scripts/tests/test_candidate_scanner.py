@@ -0,0 +1,42 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from utils import normal_sf
+from candidate_scanner import CandidateScanner
+from strategy_2_backtest_engine import BACKTEST_COLUMNS
+from strategy_2_trade_log_creator import TradeLogCreator
+
+def test_normal_sf_matches_erfc():
+    z = np.linspace(-8.0, 8.0, 321)
+    expected = np.array([0.5 * math.erfc(value / math.sqrt(2)) for value in z])
+    np.testing.assert_allclose(normal_sf(z), expected, rtol=2e-7)
+    assert np.isnan(normal_sf([np.nan])).all()
+
+def test_selected_cells_trade_the_scored_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    returns = pd.DataFrame({column: 100.0 for column in BACKTEST_COLUMNS}, index=range(120))
+    returns['Date'] = np.tile(pd.bdate_range("2023-06-01", periods=60).strftime('%Y-%m-%d'), 2)
+    returns['Ticker'] = np.repeat(['AAA', 'BBB'], 60)
+    returns['Close'] = 100.0 * (1 + rng.normal(0.002, 0.01, 120))
+    returns['ADV20'] = 1e6
+    returns['Volatility'] = 0.02
+    returns['Index_Name'] = 'S&P 500'
+    returns['Event_Type'] = 'Index Review'
+    returns['GICS_Sector'] = np.repeat(['Energy', 'Utilities'], 60)
+    # The first ten rows of each event precede the effective date and carry no strategy_2_n
+    returns['strategy_2_n'] = np.tile(np.r_[np.full(10, np.nan), np.arange(1, 51)], 2)
+    returns_path = os.path.join(tmp_path, "returns.csv")
+    returns.to_csv(returns_path, index=False)
+    scanner = CandidateScanner(returns_path, min_count=20, fdr=1.0)
+    scanner.load_data()
+    candidates = scanner.scan()
+    assert len(candidates) == 4 and 'strategy_2_n' not in candidates.columns
+    candidates_path = os.path.join(tmp_path, "candidates.csv")
+    scanner.save_results(candidates_path)
+    trade_log_path = os.path.join(tmp_path, "trade_log.csv")
+    TradeLogCreator(returns_path, trade_log_path, [], candidates_path=candidates_path, side="long").create_trade_log()
+    trade_log = pd.read_csv(trade_log_path)
+    assert len(trade_log) == 100 and trade_log['strategy_2_n'].notna().all()
+    assert candidates.loc[candidates['Side'] == "long", 'count'].sum() == pytest.approx(100)
@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+from fill_models import FillModel
+
+@pytest.fixture
+def bars():
+    return pd.DataFrame({'Open': [100.0, 100.0], 'High': [104.0, 101.0], 'Low': [99.0, 96.0], 'Close': [103.0, 97.0],
+                         'Previous_Close': [99.5, 101.0], 'Previous_Close_7D': [95.0, 104.0]})
+
+@pytest.mark.parametrize("fill_model", [FillModel(entry="limit", limit_offset=0.01), FillModel(entry="vwap"), FillModel(stop_loss=0.02), FillModel(take_profit=0.03)])
+def test_bar_fills_rejected_on_multi_session_holds(bars, fill_model):
+    with pytest.raises(ValueError, match="held 6 sessions"):
+        fill_model.apply(bars.copy(), 'Previous_Close_7D', side=-1)
+    assert fill_model.apply(bars.copy(), 'Previous_Close', side=1)['Filled'].any()
+
+def test_reference_entry_allowed_on_multi_session_holds(bars):
+    fills = FillModel(exit="vwap").apply(bars.copy(), 'Previous_Close_7D', side=-1)
+    assert fills['Entry_Price'].tolist() == [95.0, 104.0]
+    assert fills['Exit_Price'].tolist() == pytest.approx([(104.0 + 99.0 + 103.0) / 3, (101.0 + 96.0 + 97.0) / 3])
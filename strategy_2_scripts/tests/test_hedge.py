@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from fill_models import FillModel
+from strategy_2_backtest_engine import BACKTEST_COLUMNS, HEDGE_COLUMNS, BacktestEngine
+
+@pytest.fixture
+def paths(tmp_path):
+    trade_log = pd.DataFrame({column: [100.0] * 3 for column in BACKTEST_COLUMNS + HEDGE_COLUMNS})
+    trade_log['Date'] = '2023-06-12'
+    trade_log['Ticker'] = ['AAA', 'BBB', 'CCC']
+    trade_log['Volume'] = 1e6
+    trade_log['ADV20'] = 1e6
+    trade_log['Volatility'] = 0.02
+    trade_log['Close'] = 90.0
+    # The short enters at the close six sessions back, so its hedge must too: the ETF rose 10% since then, 5% since yesterday
+    trade_log['Previous_Close_7D_ETF'] = 400.0
+    trade_log['Previous_Close_ETF'] = 419.0
+    trade_log['Close_ETF'] = 440.0
+    trade_log['ADV20_ETF'] = 5e7
+    trade_log['Volatility_ETF'] = 0.01
+    trade_log['Hedge_Ratio'] = [1.5, np.nan, 0.5]
+    trade_log_path = os.path.join(tmp_path, "trade_log.csv")
+    trade_log.to_csv(trade_log_path, index=False)
+    sofr_path = os.path.join(tmp_path, "sofr.csv")
+    pd.DataFrame({'DATE': pd.bdate_range("2023-05-01", "2023-06-30").strftime('%Y-%m-%d'), 'SOFR': 5.0}).to_csv(sofr_path, index=False)
+    return trade_log_path, sofr_path, os.path.join(tmp_path, "results.csv")
+
+def test_hedge_leg_entered_with_stock_and_costed(paths):
+    unhedged = BacktestEngine(*paths, "short")
+    unhedged.run_backtest()
+    engine = BacktestEngine(*paths, "short", hedge=True)
+    engine.run_backtest()
+    daily_trades = engine.process_daily_trades(engine.trade_log_df[engine.trade_log_df['Date'] == engine.trade_log_df['Date'].iloc[0]].copy())
+    assert daily_trades['Unhedged_Skipped'].tolist() == [False, True, False]
+    assert daily_trades['Trade_Limit'].tolist() == [10000.0, 0.0, 10000.0]
+    # A short stock position is hedged long the ETF, from the same six-sessions-back entry
+    assert daily_trades['Hedge_PnL'].tolist() == pytest.approx([1.5e6 * 0.1, 0.0, 0.5e6 * 0.1])
+    hedge_shares = np.array([1.5e6, 0.0, 0.5e6]) / 400.0
+    assert daily_trades['Hedge_Transaction_Costs'].tolist() == pytest.approx(list(2 * 0.01 * hedge_shares))
+    assert (daily_trades['Hedge_Slippage_Cost'].iloc[[0, 2]] > 0).all()
+    day, base = engine.portfolio_values[0], unhedged.portfolio_values[0]
+    assert day['Unhedged_Skipped'] == 1
+    assert day['Hedge_Overnight_Cost'] > 0
+    assert day['Transaction_Costs'] == pytest.approx(day['Hedge_Transaction_Costs'] + 2 * 0.01 * 20000.0)
+    assert day['Overnight_Cost'] == pytest.approx(base['Overnight_Cost'] * 2 / 3 + day['Hedge_Overnight_Cost'])
+
+def test_hedge_rejects_intraday_fills(paths):
+    with pytest.raises(ValueError, match="reference entries and Close exits"):
+        BacktestEngine(*paths, "long", fill_model=FillModel(exit="vwap"), hedge=True)
@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from utils import INDICATOR_COLUMNS, grouped_rolling_mean, grouped_rolling_std, segment_starts
+from indicator_engine import IndicatorEngine
+from synthetic_data import SyntheticEventUniverse
+from strategy_2_backtest_engine import BACKTEST_COLUMNS, BacktestEngine
+
+@pytest.fixture(scope="module")
+def universe(tmp_path_factory):
+    universe = SyntheticEventUniverse(str(tmp_path_factory.mktemp("universe")), n_events=60, seed=1, start_date="2023-01-01", end_date="2023-12-29")
+    universe.generate()
+    return universe
+
+def test_rolling_helpers_match_pandas_min_periods():
+    rng = np.random.default_rng(0)
+    tickers = np.repeat(['A', 'B'], 40)
+    sessions = np.concatenate([np.arange(40), np.r_[np.arange(15), np.arange(30, 55)]])
+    values = rng.normal(size=80)
+    values[[3, 50]] = np.nan
+    starts = segment_starts(tickers, sessions)
+    segments = pd.Series(values).groupby(np.cumsum(starts))
+    expected_mean = segments.transform(lambda s: s.rolling(20, min_periods=10).mean())
+    expected_std = segments.transform(lambda s: s.rolling(20, min_periods=10).std())
+    np.testing.assert_allclose(grouped_rolling_mean(values, starts, 20, 10), expected_mean, rtol=1e-9)
+    np.testing.assert_allclose(grouped_rolling_std(values, starts, 20, 10), expected_std, rtol=1e-9)
+
+def test_indicators_populated_on_event_windows(universe):
+    engine = IndicatorEngine(universe.price_data_folder)
+    engine.compute()
+    coverage = engine.report_coverage(pd.concat(engine.by_ticker.values()))
+    assert set(coverage.index) == set(INDICATOR_COLUMNS)
+    # Event files hold about 43 sessions, so every indicator (Beta included) must fill for most rows
+    assert (coverage > 0.5).all(), coverage
+
+def test_nan_adv20_is_not_traded(tmp_path):
+    trade_log = pd.DataFrame({column: [100.0, 100.0] for column in BACKTEST_COLUMNS})
+    trade_log['Date'] = '2023-06-01'
+    trade_log['Ticker'] = ['AAA', 'BBB']
+    trade_log['Volume'] = 50000.0
+    trade_log['ADV20'] = [np.nan, 1e6]
+    trade_log['Volatility'] = 0.02
+    trade_log_path = os.path.join(tmp_path, "trade_log.csv")
+    trade_log.to_csv(trade_log_path, index=False)
+    sofr_path = os.path.join(tmp_path, "sofr.csv")
+    pd.DataFrame({'DATE': pd.bdate_range("2023-05-01", "2023-06-30").strftime('%Y-%m-%d'), 'SOFR': 5.0}).to_csv(sofr_path, index=False)
+    engine = BacktestEngine(trade_log_path, sofr_path, os.path.join(tmp_path, "results.csv"), "long")
+    daily_trades = engine.process_daily_trades(engine.trade_log_df.copy())
+    assert daily_trades['Trade_Limit'].tolist() == [0.0, 10000.0]
+    assert daily_trades.loc[0, ['Position_Size', 'Transaction_Costs']].eq(0).all()
+    assert daily_trades['Slippage_Cost'].sum() == pytest.approx(daily_trades.loc[1, 'Slippage_Cost'])
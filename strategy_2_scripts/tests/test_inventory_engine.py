@@ -0,0 +1,43 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from cost_models import FinancingCost
+from utils import backtest_state_path, load_backtest_state
+from strategy_2_inventory_engine import INVENTORY_COLUMNS, InventoryEngine
+
+@pytest.fixture
+def paths(tmp_path):
+    trade_log = pd.DataFrame({column: [50.0, 50.0, 50.0] for column in INVENTORY_COLUMNS})
+    trade_log['Date'] = ['2023-06-12', '2023-06-13', '2023-06-14']
+    trade_log['Ticker'] = ['AAA', 'BBB', 'CCC']
+    # Exit-day liquidity is huge; only the entry session's ADV20 and Volume may size the trade
+    trade_log['ADV20'] = 1e9
+    trade_log['Volatility'] = 0.02
+    trade_log['Previous_ADV20_7D'] = [1e5, np.nan, 1e7]
+    trade_log['Previous_Volume_7D'] = [5e5, 5e5, 2e4]
+    trade_log_path = os.path.join(tmp_path, "trade_log.csv")
+    trade_log.to_csv(trade_log_path, index=False)
+    sofr_path = os.path.join(tmp_path, "sofr.csv")
+    pd.DataFrame({'DATE': pd.bdate_range("2023-05-01", "2023-06-30").strftime('%Y-%m-%d'), 'SOFR': 5.0}).to_csv(sofr_path, index=False)
+    return trade_log_path, sofr_path, os.path.join(tmp_path, "inventory_results.csv")
+
+def test_positions_sized_from_entry_session(paths):
+    engine = InventoryEngine(*paths, "short")
+    positions = engine.build_positions()
+    assert positions['quantity'].tolist() == [1000.0, 20000.0]
+    assert (positions['exit_session'] - positions['entry_session']).tolist() == [6, 6]
+
+def test_multi_fixing_financing_rejected(paths):
+    with pytest.raises(ValueError, match="days_back"):
+        InventoryEngine(*paths, "short", financing_model=FinancingCost(0.01, days_back=6))
+
+def test_save_results_writes_state(paths):
+    engine = InventoryEngine(*paths, "short")
+    engine.run_backtest()
+    engine.save_results()
+    results = pd.read_csv(paths[2])
+    state = load_backtest_state(backtest_state_path(paths[2]))
+    assert state['num_days'] == len(results)
+    assert state['cumulative_net_pnl'] == pytest.approx(results['Cumulative_Net_PnL'].iloc[-1])
+    assert state['daily_pnl_sum'] == pytest.approx(results['Cumulative_Net_PnL'].iloc[-1])
@@ -0,0 +1,87 @@
+import importlib.util
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def load_kernels(strategy_dir):
+    spec = importlib.util.spec_from_file_location(f"{strategy_dir}_kernels", os.path.join(REPO_DIR, strategy_dir, "kernels.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+KERNEL_MODULES = {strategy_dir: load_kernels(strategy_dir) for strategy_dir in ["strategy_1_scripts", "strategy_2_scripts"]}
+
+@pytest.fixture(params=[(strategy_dir, backend) for strategy_dir in KERNEL_MODULES for backend in ["numpy", "numba"]],
+                ids=lambda param: f"{param[0]}-{param[1]}")
+def backend(request):
+    """Raw kernels of one backend: the NumPy fallback always, the numba-compiled loops only when numba is installed."""
+    strategy_dir, name = request.param
+    kernels = KERNEL_MODULES[strategy_dir]
+    if name == "numpy":
+        return {"slippage": kernels._slippage_numpy, "scale_to_cap": kernels._scale_to_cap_numpy, "expanding_mean": kernels._expanding_mean_numpy}
+    if not kernels.HAVE_NUMBA:
+        pytest.skip("numba is not installed")
+    return {"slippage": kernels.njit(kernels._slippage_loop), "scale_to_cap": kernels.njit(kernels._scale_to_cap_loop),
+            "expanding_mean": kernels.njit(kernels._expanding_mean_loop)}
+
+@pytest.fixture
+def trades():
+    rng = np.random.default_rng(0)
+    n = 2000
+    data = pd.DataFrame({
+        'Trade_Limit': rng.uniform(100, 5000, n), 'ADV20': rng.uniform(1e4, 1e6, n),
+        'Volatility': rng.uniform(0.005, 0.05, n), 'Previous_Close': rng.uniform(10, 200, n), 'Close': rng.uniform(10, 200, n),
+    })
+    data.loc[rng.choice(n, 50, replace=False), 'Volatility'] = np.nan
+    data.loc[rng.choice(n, 20, replace=False), 'ADV20'] = np.nan
+    return data
+
+def reference_slippage(data, alpha, beta):
+    """The engines' original pandas slippage formula."""
+    return (alpha * ((data['Trade_Limit'] / data['ADV20']) ** beta) * data['Previous_Close'] * data['Volatility'] +
+            alpha * ((data['Trade_Limit'] / data['ADV20']) ** beta) * data['Close'] * data['Volatility'])
+
+def test_slippage_matches_pandas(backend, trades):
+    reference = reference_slippage(trades, 0.2, 0.7)
+    out = np.empty(len(trades))
+    total = backend["slippage"](*(trades[column].to_numpy(dtype='float64') for column in
+                                  ['Trade_Limit', 'ADV20', 'Volatility', 'Previous_Close', 'Close']), 0.2, 0.7, out)
+    np.testing.assert_allclose(out, reference, rtol=1e-12, equal_nan=True)
+    assert total == pytest.approx(reference.sum(), rel=1e-12)
+
+@pytest.mark.parametrize("cap", [5e6, 1e12])
+def test_scale_to_cap_matches_pandas(backend, trades, cap):
+    position_reference = trades['Trade_Limit'] * trades['Close']
+    scale = min(1.0, cap / position_reference.sum())
+    position_size = position_reference.to_numpy(dtype='float64', copy=True)
+    trade_limit = trades['Trade_Limit'].to_numpy(dtype='float64', copy=True)
+    total = backend["scale_to_cap"](position_size, trade_limit, cap)
+    assert total == pytest.approx(position_reference.sum(), rel=1e-12)
+    np.testing.assert_allclose(position_size, position_reference * scale, rtol=1e-12)
+    np.testing.assert_allclose(trade_limit, trades['Trade_Limit'] * scale, rtol=1e-12)
+
+def test_expanding_mean_matches_pandas(backend, trades):
+    groups = np.repeat(np.arange(len(trades) // 10), 10)
+    starts = np.r_[True, groups[1:] != groups[:-1]]
+    values = trades['Volatility'].to_numpy(dtype='float64')
+    values[:3] = np.nan
+    reference = pd.Series(values).groupby(groups).transform(lambda s: s.expanding(min_periods=1).mean())
+    out = np.empty(len(values))
+    backend["expanding_mean"](values, starts, out)
+    np.testing.assert_allclose(out, reference, rtol=1e-12, equal_nan=True)
+
+@pytest.mark.parametrize("strategy_dir", KERNEL_MODULES)
+def test_public_wrappers_match_pandas(strategy_dir, trades):
+    kernels = KERNEL_MODULES[strategy_dir]
+    reference = reference_slippage(trades, 0.2, 0.7)
+    costs, total = kernels.fused_slippage_cost(trades['Trade_Limit'], trades['ADV20'], trades['Volatility'],
+                                               trades['Previous_Close'], trades['Close'], 0.2, 0.7)
+    np.testing.assert_allclose(costs, reference, rtol=1e-12, equal_nan=True)
+    assert total == pytest.approx(reference.sum(), rel=1e-12)
+    reference = trades['Volatility'].expanding(min_periods=1).mean()
+    np.testing.assert_allclose(kernels.expanding_mean(trades['Volatility']), reference, rtol=1e-12, equal_nan=True)
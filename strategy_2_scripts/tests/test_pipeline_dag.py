@@ -0,0 +1,19 @@
+import os
+from pipeline_dag import PipelineDAG
+from utils import module_closure
+
+def test_step_key_covers_imported_modules(tmp_path):
+    for name, source in [("step.py", "from helper import run\n"), ("helper.py", "import os\nfrom utils import read_table\n"), ("utils.py", "read_table = None\n")]:
+        (tmp_path / name).write_text(source)
+    step_path = os.path.join(tmp_path, "step.py")
+    assert [os.path.basename(path) for path in module_closure(step_path)] == ["helper.py", "step.py", "utils.py"]
+    dag = PipelineDAG(os.path.join(tmp_path, "cache.json"))
+    dag.add_step("step", 1, lambda: None, [step_path])
+    key = dag.step_key(dag.steps[0], {"step": {}}, {})
+    (tmp_path / "utils.py").write_text("read_table = print\n")
+    assert dag.step_key(dag.steps[0], {"step": {}}, {}) != key
+
+def test_stream_step_covers_every_stage():
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    closure = {os.path.basename(path) for path in module_closure(os.path.join(base_dir, "streaming_pipeline.py"))}
+    assert {"utils.py", "price_data_updater.py", "historical_data_processor.py", "benchmark_series.py", "indicator_engine.py"} <= closure
@@ -0,0 +1,46 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from synthetic_data import SYNTHETIC_ETF_BETAS, SyntheticEventUniverse
+from benchmark_series import BenchmarkSeries
+from price_data_updater import PriceDataUpdater
+from historical_data_processor import HistoricalDataProcessor
+from streaming_pipeline import StreamingPipeline
+from strategy_2_returns import DataAggregator
+
+class ReplayDownloader:
+    def __init__(self, price_data_folder):
+        self.price_data_folder = price_data_folder
+
+    def iter_downloads(self):
+        etf_files = {f"{ticker}_Price_Data.csv" for ticker in SYNTHETIC_ETF_BETAS}
+        for file_name in sorted(os.listdir(self.price_data_folder)):
+            if file_name.endswith("_Price_Data.csv") and file_name not in etf_files:
+                yield os.path.join(self.price_data_folder, file_name)
+
+@pytest.fixture
+def universe(tmp_path):
+    universe = SyntheticEventUniverse(os.path.join(tmp_path, "universe"), n_events=40, seed=3, start_date="2023-01-01", end_date="2023-12-29")
+    universe.generate()
+    return universe
+
+def copy_universe(universe, name):
+    folder = os.path.join(os.path.dirname(universe.output_dir), name)
+    shutil.copytree(universe.price_data_folder, folder)
+    return folder
+
+def test_stream_matches_batch_returns(universe):
+    batch_folder, stream_folder = copy_universe(universe, "batch"), copy_universe(universe, "stream")
+    batch_log, stream_log = batch_folder + ".log", stream_folder + ".log"
+    PriceDataUpdater(batch_folder, universe.press_release_file_path, batch_log, BenchmarkSeries(batch_folder)).update_files()
+    HistoricalDataProcessor(batch_folder, BenchmarkSeries(batch_folder)).process_all_files()
+    StreamingPipeline(ReplayDownloader(stream_folder), stream_folder, universe.press_release_file_path, stream_log, max_workers=2).run()
+    returns = []
+    for folder in [batch_folder, stream_folder]:
+        output_path = os.path.join(folder + "_results", "strategy_2_returns.csv")
+        DataAggregator(folder, output_path).aggregate_columns_for_selected_rows()
+        returns.append(pd.read_csv(output_path).sort_values(['Ticker', 'Date']).reset_index(drop=True))
+    batch, stream = returns
+    assert batch['Previous_ADV20_7D'].notna().any() and batch['Hedge_Ratio'].notna().any()
+    pd.testing.assert_frame_equal(batch, stream)
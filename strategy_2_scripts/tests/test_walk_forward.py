@@ -0,0 +1,38 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from utils import HOLDING_SESSIONS
+from trading_calendar import get_trading_calendar
+from walk_forward import ENTRY_COLUMNS, WalkForwardEngine
+
+@pytest.fixture
+def engine(tmp_path):
+    calendar = get_trading_calendar()
+    first_session = calendar.session_index(["2023-01-03"])[0]
+    rows = []
+    # S&P 500 reverts up after day 1 (long), S&P MidCap 400 reverts down (short), on every session
+    for index_name, day1, later in [("S&P 500", -0.01, 0.02), ("S&P MidCap 400", 0.01, -0.02)]:
+        for strategy_n, value in [(1, day1), (3, later)]:
+            rows.append(pd.DataFrame({'Date': pd.DatetimeIndex(calendar.session_date(first_session + np.arange(60))).strftime('%Y-%m-%d'),
+                                      'Ticker': 'AAA', 'Index_Name': index_name, 'Event_Type': 'Index Review', 'strategy_2_n': strategy_n,
+                                      'strategy_2_md': value, 'strategy_2_net': value}))
+    returns_path = os.path.join(tmp_path, "returns.csv")
+    pd.concat(rows).to_csv(returns_path, index=False)
+    engine = WalkForwardEngine(returns_path, None, os.path.join(tmp_path, "walk_forward"), min_count_threshold=5)
+    engine.load_data()
+    return engine
+
+@pytest.mark.parametrize("side", ["long", "short"])
+def test_out_of_sample_entries_follow_their_rebalance(engine, side):
+    train_sessions, test_sessions = 20, 10
+    rebalances, selected, _ = engine.select(train_sessions, test_sessions)
+    trades = engine.out_of_sample_trades(selected[side], side, train_sessions, test_sessions)
+    holding_sessions = HOLDING_SESSIONS[ENTRY_COLUMNS[side]]
+    entries = engine.session_offsets[trades.index] - holding_sessions
+    assert len(trades) and (trades['strategy_2_n'] == 3).all()
+    # Every entry falls at or after the rebalance whose selection admitted it, never in the training window
+    assert entries.min() == train_sessions
+    windows = (entries - train_sessions) // test_sessions
+    assert (entries >= rebalances[windows]).all()
+    assert len(trades) == engine.n_sessions - train_sessions - holding_sessions
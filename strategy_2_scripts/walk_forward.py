@@ -0,0 +1,125 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import (
+    HOLDING_SESSIONS,
+    read_table,
+    group_session_cumsums,
+    window_group_means,
+    reversion_selection_masks,
+    walk_forward_rebalances,
+)
+from trading_calendar import get_trading_calendar
+from strategy_2_backtest_engine import BacktestEngine
+from portfolio_combiner import PortfolioCombiner
+
+GROUP_COLUMNS = ['strategy_2_n', 'Index_Name', 'Event_Type']
+ENTRY_COLUMNS = {"long": 'Previous_Close', "short": 'Previous_Close_7D'}
+
+class WalkForwardEngine:
+    """Out-of-sample version of steps 8-10: every test_sessions sessions, re-selects reversion groups from the trailing train_sessions
+    and trades only positions entered before the next rebalance.
+
+    Window stats come from per-group prefix sums over sessions and selection is vectorised over all rebalances, so a
+    configuration costs O(rebalances x groups) regardless of window length; the rules match select_reversion_candidates.
+    """
+    def __init__(self, returns_path, sofr_file_path, output_dir, min_count_threshold=50, exclude_indices=None, portfolio_cap=5000000):
+        self.returns_path = returns_path
+        self.sofr_file_path = sofr_file_path
+        self.output_dir = output_dir
+        self.min_count_threshold = min_count_threshold
+        self.exclude_indices = exclude_indices or []
+        self.portfolio_cap = portfolio_cap
+        self.calendar = get_trading_calendar()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def load_data(self):
+        data = read_table(self.returns_path, 'returns')
+        data = data[data['strategy_2_n'].notna() & ~data['Index_Name'].isin(self.exclude_indices)].reset_index(drop=True)
+        sessions = data['Session'].to_numpy(dtype='int64') if 'Session' in data.columns else self.calendar.session_index(data['Date'])
+        self.first_session = sessions.min()
+        self.session_offsets = sessions - self.first_session
+        self.n_sessions = int(self.session_offsets.max()) + 1
+        grouped = data.groupby(GROUP_COLUMNS, observed=True)
+        self.group_codes = grouped.ngroup().to_numpy()
+        self.groups = grouped.size().reset_index()[GROUP_COLUMNS]
+        self.pair_codes = self.groups.groupby(['Index_Name', 'Event_Type'], observed=True).ngroup().to_numpy()
+        self.cumsums = {
+            "": group_session_cumsums(self.group_codes, self.session_offsets, data['strategy_2_md'].to_numpy(dtype='float64', na_value=np.nan),
+                                      len(self.groups), self.n_sessions),
+            "Net_": group_session_cumsums(self.group_codes, self.session_offsets, data['strategy_2_net'].to_numpy(dtype='float64', na_value=np.nan),
+                                          len(self.groups), self.n_sessions),
+        }
+        self.data = data
+        print(f"Loaded {len(data)} rows in {len(self.groups)} groups over {self.n_sessions} sessions")
+
+    def select(self, train_sessions, test_sessions):
+        """Selected groups per rebalance as (rebalances x groups) masks for each side, plus the selections as a table."""
+        rebalances = walk_forward_rebalances(self.n_sessions, train_sessions, test_sessions)
+        count, mean = window_group_means(*self.cumsums[""], rebalances - train_sessions, rebalances)
+        _, net_mean = window_group_means(*self.cumsums["Net_"], rebalances - train_sessions, rebalances)
+        selected = dict(zip(["long", "short"], reversion_selection_masks(self.groups['strategy_2_n'].to_numpy(dtype='int64'), self.pair_codes,
+                                                                         count, mean, net_mean, self.min_count_threshold)))
+        selections = []
+        for side, mask in selected.items():
+            windows, groups = np.nonzero(mask)
+            selections.append(self.groups.iloc[groups].assign(
+                Rebalance_Date=self.calendar.session_date(self.first_session + rebalances[windows]), Side=side,
+                count=count[windows, groups], mean=mean[windows, groups], Net_mean=net_mean[windows, groups]))
+        selections = pd.concat(selections, ignore_index=True).sort_values(['Rebalance_Date', 'Side'], kind='stable')
+        return rebalances, selected, selections
+
+    def out_of_sample_trades(self, selected, side, train_sessions, test_sessions):
+        """Rows are dated at exit, so each trade is placed in the test window of its entry session and taken only if that window's selection holds its group."""
+        entry_offsets = self.session_offsets - HOLDING_SESSIONS[ENTRY_COLUMNS[side]]
+        window = np.maximum((entry_offsets - train_sessions) // test_sessions, 0)
+        in_test = entry_offsets >= train_sessions
+        return self.data[in_test & selected[window, self.group_codes]]
+
+    def run(self, train_sessions=504, test_sessions=63):
+        label = f"wf_T{train_sessions}_R{test_sessions}"
+        rebalances, selected, selections = self.select(train_sessions, test_sessions)
+        selections.to_csv(os.path.join(self.output_dir, f"{label}_selections.csv"), index=False)
+        summary = {"Train_Sessions": train_sessions, "Rebalance_Sessions": test_sessions, "Rebalances": len(rebalances)}
+        books = {}
+        for side in ["long", "short"]:
+            trades = self.out_of_sample_trades(selected[side], side, train_sessions, test_sessions)
+            summary[f"Avg_{side.capitalize()}_Groups"] = selected[side].sum(axis=1).mean() if len(rebalances) else 0.0
+            summary[f"{side.capitalize()}_Trades"] = len(trades)
+            if trades.empty:
+                print(f"No out-of-sample {side} trades for {label}")
+                continue
+            trade_log_path = os.path.join(self.output_dir, f"{label}_{side}_trade_log.csv")
+            trades.to_csv(trade_log_path, index=False)
+            books[side] = os.path.join(self.output_dir, f"{label}_{side}_backtest_results.csv")
+            backtest_engine = BacktestEngine(trade_log_path, self.sofr_file_path, books[side], side, self.portfolio_cap)
+            backtest_engine.run_backtest()
+            backtest_engine.save_results()
+        if books:
+            combiner = PortfolioCombiner(books, os.path.join(self.output_dir, f"{label}_backtest_results.csv"))
+            combiner.load_data()
+            combiner.combine()
+            summary.update(combiner.calculate_metrics())
+            summary["Cumulative_Net_PnL"] = combiner.results['Cumulative_Net_PnL'].iloc[-1]
+            combiner.save_results()
+        print(f"Walk-forward {label}: {summary['Rebalances']} rebalances, {summary['Long_Trades']} long and {summary['Short_Trades']} short trades")
+        return summary
+
+    def sweep(self, train_windows, rebalance_frequencies):
+        self.results = pd.DataFrame([self.run(train_sessions, test_sessions)
+                                     for train_sessions in train_windows for test_sessions in rebalance_frequencies])
+        return self.results
+
+    def save_results(self, output_path):
+        self.results.to_csv(output_path, index=False)
+        print(f"Walk-forward sweep results saved to {output_path}")
+
+# Usage Example
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    engine = WalkForwardEngine(os.path.join(base_dir, "strategy_2", "strategy_2_returns.csv"),
+                               os.path.join(base_dir, "Overnight_Costs", "Cleaned_SOFR.csv"),
+                               os.path.join(base_dir, "strategy_2", "walk_forward"))
+    engine.load_data()
+    engine.sweep(train_windows=[252, 504], rebalance_frequencies=[21, 63])
+    engine.save_results(os.path.join(base_dir, "strategy_2", "walk_forward", "walk_forward_summary.csv"))